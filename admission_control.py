@@ -0,0 +1,235 @@
+# admission_control.py — Pahalı uç noktalar için eş zamanlılık sınırı (süreç başına)
+#
+# Her sınıf (upload / analiz / export) bir sayaçlı semafor + sınırlı bekleme kuyruğudur:
+#   - boş slot varsa istek hemen girer
+#   - yoksa en fazla `kuyruk` istek `bekleme_sn` kadar sırada bekler (FIFO: slot sıranın başına verilir)
+#   - kuyruk doluysa veya süre dolarsa hemen 503 + Retry-After döner
+#   - aynı kullanıcı sınıfta `kullanici_limiti`'nden fazla istek tutamaz -> 429
+# Böylece giriş / dashboard gibi hafif istekler pahalı işlerin arkasında worker beklemez.
+# Sınırlar süreç başınadır (gunicorn: worker sayısı × limit).
+#
+# Ayar (env): ADMISSION_<SINIF>="eşzamanlı,kuyruk,bekleme_sn,kullanıcı_başı"
+#   örn: ADMISSION_ANALIZ="2,6,10,1"; ADMISSION_ENABLED=0 ile kapatılır.
+
+import math
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from functools import wraps
+
+from flask import current_app, make_response, render_template, request
+from flask_login import current_user
+
+UPLOAD = "upload"
+ANALIZ = "analiz"
+EXPORT = "export"
+
+# eşzamanlı, kuyruk, bekleme_sn, kullanıcı başı
+VARSAYILAN_SINIRLAR = {
+    UPLOAD: (2, 4, 15.0, 1),
+    ANALIZ: (max(1, min(4, (os.cpu_count() or 2) // 2)), 8, 10.0, 1),
+    EXPORT: (2, 4, 5.0, 1),
+}
+
+_EXTENSION = "giris_kontrolu"
+
+
+class SinifDolu(Exception):
+    """İstek kabul edilmedi; durum kodu ve tahmini bekleme (sn) taşır."""
+
+    def __init__(self, sinif: str, durum: int, neden: str, retry_after: int):
+        self.sinif = sinif
+        self.durum = durum
+        self.neden = neden
+        self.retry_after = retry_after
+        super().__init__(f"{sinif}: {neden}")
+
+
+class GirisSinifi:
+    """Tek bir uç nokta sınıfının semaforu, kuyruğu ve sayaçları."""
+
+    def __init__(self, ad: str, limit: int, kuyruk: int, bekleme_sn: float, kullanici_limiti: int):
+        self.ad = ad
+        self.limit = max(1, int(limit))
+        self.kuyruk = max(0, int(kuyruk))
+        self.bekleme_sn = max(0.0, float(bekleme_sn))
+        self.kullanici_limiti = max(0, int(kullanici_limiti))  # 0: sınırsız
+
+        self._kosul = threading.Condition()
+        self.aktif = 0
+        self.bekleyen = 0
+        self._sira = deque()  # bekleyenlerin biletleri; slot yalnızca baştakine verilir
+        self._kullanici = defaultdict(int)  # içeride + sırada
+
+        # Metrikler
+        self.kabul = 0
+        self.red_kuyruk = 0
+        self.red_zaman_asimi = 0
+        self.red_kullanici = 0
+        self.en_yuksek_kuyruk = 0
+        self.toplam_bekleme_ms = 0.0
+        self.ortalama_sure_ms = 0.0  # üssel hareketli ortalama
+
+    def _retry_after(self) -> int:
+        # Önündeki işlerin bitmesi için kaba tahmin; en az 1 sn
+        tahmin = self.ortalama_sure_ms / 1000.0 * (self.bekleyen + 1) / self.limit
+        return max(1, int(math.ceil(tahmin)))
+
+    def gir(self, kullanici) -> float:
+        """Slot alır (gerekirse sırada bekler). Dönüş: bekleme (ms); alamazsa SinifDolu."""
+        t0 = time.monotonic()
+        with self._kosul:
+            if self.kullanici_limiti and self._kullanici.get(kullanici, 0) >= self.kullanici_limiti:
+                self.red_kullanici += 1
+                raise SinifDolu(self.ad, 429, "aynı kullanıcının isteği sürüyor", self._retry_after())
+
+            # Sırada bekleyen varsa yeni gelen öne geçmez
+            if self.aktif >= self.limit or self.bekleyen:
+                if self.bekleyen >= self.kuyruk:
+                    self.red_kuyruk += 1
+                    raise SinifDolu(self.ad, 503, "kuyruk dolu", self._retry_after())
+
+                bilet = object()
+                self._sira.append(bilet)
+                self.bekleyen += 1
+                self._kullanici[kullanici] += 1
+                self.en_yuksek_kuyruk = max(self.en_yuksek_kuyruk, self.bekleyen)
+                son = t0 + self.bekleme_sn
+                try:
+                    while self.aktif >= self.limit or self._sira[0] is not bilet:
+                        kalan = son - time.monotonic()
+                        if kalan <= 0:
+                            self.red_zaman_asimi += 1
+                            self._kullanici_birak(kullanici)
+                            raise SinifDolu(self.ad, 503, "bekleme süresi doldu", self._retry_after())
+                        self._kosul.wait(kalan)
+                finally:
+                    self._sira.remove(bilet)
+                    self.bekleyen -= 1
+                    # Sıranın başı değişti: boş slot varsa yeni baştaki de uyanmalı
+                    self._kosul.notify_all()
+            else:
+                self._kullanici[kullanici] += 1
+
+            self.aktif += 1
+            self.kabul += 1
+            bekleme_ms = (time.monotonic() - t0) * 1000.0
+            self.toplam_bekleme_ms += bekleme_ms
+            return bekleme_ms
+
+    def cik(self, kullanici, sure_ms: float) -> None:
+        with self._kosul:
+            self.aktif -= 1
+            self._kullanici_birak(kullanici)
+            self.ortalama_sure_ms = sure_ms if not self.ortalama_sure_ms else (
+                0.8 * self.ortalama_sure_ms + 0.2 * sure_ms
+            )
+            # Hepsi uyanır, slotu sadece sıranın başındaki alır (kuyruk kısa)
+            self._kosul.notify_all()
+
+    def _kullanici_birak(self, kullanici) -> None:
+        self._kullanici[kullanici] -= 1
+        if self._kullanici[kullanici] <= 0:
+            del self._kullanici[kullanici]
+
+    def metrik(self) -> dict:
+        with self._kosul:
+            return {
+                "sinif": self.ad,
+                "limit": self.limit,
+                "kuyruk_kapasitesi": self.kuyruk,
+                "bekleme_sn": self.bekleme_sn,
+                "kullanici_limiti": self.kullanici_limiti,
+                "aktif": self.aktif,
+                "kuyrukta": self.bekleyen,
+                "en_yuksek_kuyruk": self.en_yuksek_kuyruk,
+                "kabul": self.kabul,
+                "red_kuyruk": self.red_kuyruk,
+                "red_zaman_asimi": self.red_zaman_asimi,
+                "red_kullanici": self.red_kullanici,
+                "ortalama_bekleme_ms": round(self.toplam_bekleme_ms / self.kabul, 1) if self.kabul else 0.0,
+                "ortalama_sure_ms": round(self.ortalama_sure_ms, 1),
+            }
+
+
+def _sinir_oku(sinif: str, varsayilan: tuple) -> tuple:
+    deger = os.environ.get(f"ADMISSION_{sinif.upper()}")
+    if not deger:
+        return varsayilan
+    parcalar = [p.strip() for p in deger.split(",")]
+    return tuple(
+        tip(p) if p else v
+        for p, v, tip in zip(parcalar + [""] * 4, varsayilan, (int, int, float, int))
+    )
+
+
+def init_admission_control(app) -> None:
+    """Sınıfları app.config'e göre kurar (ADMISSION_SINIRLARI dict ile de verilebilir)."""
+    app.config.setdefault("ADMISSION_ENABLED", os.environ.get("ADMISSION_ENABLED", "1") != "0")
+    app.config.setdefault("ADMISSION_SINIRLARI", {
+        sinif: _sinir_oku(sinif, varsayilan) for sinif, varsayilan in VARSAYILAN_SINIRLAR.items()
+    })
+    app.extensions[_EXTENSION] = {
+        sinif: GirisSinifi(sinif, *sinirlar) for sinif, sinirlar in app.config["ADMISSION_SINIRLARI"].items()
+    }
+
+
+def metrikler(app) -> list[dict]:
+    return [s.metrik() for s in app.extensions.get(_EXTENSION, {}).values()]
+
+
+def _red_yaniti(hata: SinifDolu):
+    mesaj = (
+        "Bu işlem için zaten devam eden bir isteğiniz var; bitmesini bekleyin."
+        if hata.durum == 429 else
+        "Sunucu şu anda bu tür işlemlerle meşgul. Lütfen birkaç saniye sonra tekrar deneyin."
+    )
+    if request.accept_mimetypes.best == "application/json":
+        yanit = make_response({"hata": mesaj, "sinif": hata.sinif, "neden": hata.neden}, hata.durum)
+    else:
+        yanit = make_response(
+            render_template("errors/busy.html", title="Meşgul", mesaj=mesaj, retry_after=hata.retry_after),
+            hata.durum,
+        )
+    yanit.headers["Retry-After"] = str(hata.retry_after)
+    return yanit
+
+
+def sinirla(sinif: str, yontemler: tuple[str, ...] | None = None):
+    """
+    Route dekoratörü: görünüm, sınıfın slotunu tutarken çalışır.
+    yontemler verilirse sadece o HTTP yöntemleri sınırlanır (örn: reports sayfası GET serbest).
+    Akışlı yanıtlarda slot, gövde gönderilip kapanınca bırakılır.
+    """
+    def dekorator(gorunum):
+        @wraps(gorunum)
+        def sarmal(*args, **kwargs):
+            kontrol = current_app.extensions.get(_EXTENSION, {}).get(sinif)
+            if (
+                kontrol is None
+                or not current_app.config.get("ADMISSION_ENABLED")
+                or (yontemler and request.method not in yontemler)
+            ):
+                return gorunum(*args, **kwargs)
+
+            kullanici = current_user.get_id() if current_user.is_authenticated else request.remote_addr
+            try:
+                kontrol.gir(kullanici)
+            except SinifDolu as e:
+                return _red_yaniti(e)
+
+            t0 = time.monotonic()
+            birak = lambda: kontrol.cik(kullanici, (time.monotonic() - t0) * 1000.0)
+            try:
+                yanit = make_response(gorunum(*args, **kwargs))
+            except BaseException:
+                birak()
+                raise
+            if yanit.is_streamed:
+                yanit.call_on_close(birak)
+            else:
+                birak()
+            return yanit
+        return sarmal
+    return dekorator
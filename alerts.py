@@ -0,0 +1,166 @@
+# alerts.py — Olay güdümlü marj uyarıları
+#
+# Kurallar (eskiden dashboard önerilerinde her istekte hesaplanırdı), şube × ürün başına son PENCERE_GUN gün
+# satış hacmi ve ürünün GÜNCEL maliyetiyle değerlendirilir:
+#   - zarar:        ciro - adet × maliyet < 0
+#   - dusuk_marj:   marj < %DUSUK_MARJ_YUZDE ve adet >= DUSUK_MARJ_MIN_ADET (zarar değilse)
+#   - maliyet_yok:  satılıyor ama maliyeti 0 (reçete eksik olabilir)
+# Değerlendirme sadece değişen ürünler için yapılır:
+#   - satış yükleme / silme: o şubede dokunulan ürünler (çağıran: app.py)
+#   - maliyet yeniden hesabı: maliyeti değişen ürünler, tüm şubelerde (database.maliyet_dinleyicileri)
+# Sorgu ürün id'leriyle süzülür (ix_satis_sube_urun_tarih); maliyet geçmişin boyuyla değil
+# değişikliğin boyuyla ölçeklenir. Pencere zamanla kaydığı için `flask uyarilari-yenile` (gece cron)
+# tüm ürünleri bir kez değerlendirir. Commit çağırana aittir.
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+from branch_scope import sube_filtresi
+from database import db, Urun, SatisKaydi, Uyari, maliyet_dinleyicileri, surum_artir, surum_oku
+
+PENCERE_GUN = 30
+DUSUK_MARJ_YUZDE = 25.0
+DUSUK_MARJ_MIN_ADET = 10
+
+ZARAR = "zarar"
+DUSUK_MARJ = "dusuk_marj"
+MALIYET_YOK = "maliyet_yok"
+KURALLAR = (ZARAR, DUSUK_MARJ, MALIYET_YOK)
+
+YENI, GORULDU, COZULDU = "yeni", "goruldu", "cozuldu"
+AKTIF_DURUMLAR = (YENI, GORULDU)
+
+# Dashboard renkleri / sırası
+KURAL_TIPI = {ZARAR: "danger", DUSUK_MARJ: "warning", MALIYET_YOK: "info"}
+
+# IN listesi başına ürün sayısı (SQLite değişken sınırı)
+_PARCA = 500
+
+# Tüm ürünlerin ilk değerlendirmesi yapıldıysa > 0 (veri_surumleri; init-db tekrar çalıştırmaz)
+UYARI_KURULUM_SURUMU = "uyari_kurulum"
+
+
+def _tetiklenenler(adet: int, ciro: float, maliyet: float, isim: str) -> dict[str, tuple[float, str]]:
+    """Bir şube × ürün için tetiklenen kurallar: {kural: (değer, mesaj)}."""
+    sonuc = {}
+    if adet <= 0:
+        return sonuc
+    kar = ciro - adet * maliyet
+    marj = (kar / ciro * 100.0) if ciro > 0 else 0.0
+
+    if maliyet <= 0:
+        sonuc[MALIYET_YOK] = (float(adet), f"{isim} satılıyor ama maliyeti 0 görünüyor. Reçete/maliyet güncellemesi yap.")
+    if kar < 0:
+        sonuc[ZARAR] = (kar, f"{isim} son {PENCERE_GUN} günde güncel maliyetle zarar yazıyor "
+                             f"(Kâr: {kar:.2f} TL). Fiyat veya reçete kontrolü yap.")
+    elif marj < DUSUK_MARJ_YUZDE and adet >= DUSUK_MARJ_MIN_ADET:
+        sonuc[DUSUK_MARJ] = (marj, f"{isim} çok satıyor ama marj düşük (%{marj:.1f}, {adet} adet). "
+                                   f"Küçük bir fiyat artışı ciddi fark yaratabilir.")
+    return sonuc
+
+
+def uyarilari_degerlendir(urun_ids=None, sube_id: int | None = None, simdi: datetime | None = None) -> dict:
+    """
+    Verilen ürünlerin (None: tümü) kurallarını verilen şubede (None: tüm şubeler) yeniden değerlendirir;
+    uyarı kayıtlarını açar, günceller veya çözer. Dönüş: {'acilan', 'guncellenen', 'cozulen'} sayaçları.
+    """
+    simdi = simdi or datetime.utcnow()
+    sayac = {"acilan": 0, "guncellenen": 0, "cozulen": 0}
+    if urun_ids is None:
+        ids = db.session.scalars(db.select(Urun.id)).all()
+    else:
+        ids = sorted({int(u) for u in urun_ids})
+    for i in range(0, len(ids), _PARCA):
+        _parcayi_degerlendir(ids[i:i + _PARCA], sube_id, simdi, sayac)
+    return sayac
+
+
+def _parcayi_degerlendir(ids, sube_id, simdi, sayac) -> None:
+    since_dt = datetime.now() - timedelta(days=PENCERE_GUN)
+    q = db.select(
+        SatisKaydi.sube_id, SatisKaydi.urun_id,
+        func.coalesce(func.sum(SatisKaydi.adet), 0),
+        func.coalesce(func.sum(SatisKaydi.toplam_tutar), 0.0),
+    ).where(SatisKaydi.urun_id.in_(ids), SatisKaydi.tarih >= since_dt)
+    if sube_id is not None:
+        q = q.where(SatisKaydi.sube_id == sube_id)
+    hacimler = db.session.execute(q.group_by(SatisKaydi.sube_id, SatisKaydi.urun_id)).all()
+
+    urunler = {
+        u.id: (float(u.hesaplanan_maliyet or 0.0), u.isim)
+        for u in db.session.execute(db.select(Urun.id, Urun.isim, Urun.hesaplanan_maliyet).where(Urun.id.in_(ids)))
+    }
+
+    tetiklenen = {}
+    for s_id, u_id, adet, ciro in hacimler:
+        if u_id not in urunler:
+            continue
+        maliyet, isim = urunler[u_id]
+        for kural, (deger, mesaj) in _tetiklenenler(int(adet or 0), float(ciro or 0.0), maliyet, isim).items():
+            tetiklenen[(s_id, u_id, kural)] = (deger, mesaj)
+
+    mevcut_q = db.select(Uyari).where(Uyari.urun_id.in_(ids))
+    if sube_id is not None:
+        mevcut_q = mevcut_q.where(Uyari.sube_id == sube_id)
+    mevcut = {(u.sube_id, u.urun_id, u.kural): u for u in db.session.scalars(mevcut_q)}
+
+    for anahtar, (deger, mesaj) in tetiklenen.items():
+        uyari = mevcut.get(anahtar)
+        if uyari is None:
+            s_id, u_id, kural = anahtar
+            db.session.add(Uyari(sube_id=s_id, urun_id=u_id, kural=kural, durum=YENI, mesaj=mesaj,
+                                 deger=deger, olusturuldu=simdi, guncellendi=simdi))
+            sayac["acilan"] += 1
+        elif uyari.durum == COZULDU:
+            uyari.durum, uyari.cozuldu = YENI, None
+            uyari.mesaj, uyari.deger, uyari.olusturuldu, uyari.guncellendi = mesaj, deger, simdi, simdi
+            sayac["acilan"] += 1
+        elif uyari.mesaj != mesaj:
+            # Onaylanmış uyarı onaylı kalır; sadece güncel değer yazılır
+            uyari.mesaj, uyari.deger, uyari.guncellendi = mesaj, deger, simdi
+            sayac["guncellenen"] += 1
+
+    for anahtar, uyari in mevcut.items():
+        if anahtar not in tetiklenen and uyari.durum in AKTIF_DURUMLAR:
+            uyari.durum, uyari.cozuldu, uyari.guncellendi = COZULDU, simdi, simdi
+            sayac["cozulen"] += 1
+
+
+def _maliyet_degisti(urun_ids) -> None:
+    # Satış geçmişi aynı, maliyet değişti: bu ürünler tüm şubelerde yeniden değerlendirilir
+    uyarilari_degerlendir(urun_ids)
+
+
+maliyet_dinleyicileri.append(_maliyet_degisti)
+
+
+def aktif_uyarilar(limit: int = 20) -> list[Uyari]:
+    """Aktif şubenin (tüm şubelerde: hepsinin) açık uyarıları; yeni olanlar ve zarar önce."""
+    oncelik = db.case({ZARAR: 0, DUSUK_MARJ: 1, MALIYET_YOK: 2}, value=Uyari.kural, else_=3)
+    q = sube_filtresi(
+        db.select(Uyari).where(Uyari.durum.in_(AKTIF_DURUMLAR)),
+        Uyari.sube_id,
+    ).order_by(db.case((Uyari.durum == YENI, 0), else_=1), oncelik, Uyari.guncellendi.desc()).limit(limit)
+    return db.session.scalars(q).all()
+
+
+def uyari_onayla(uyari_id: int) -> bool:
+    """Yeni uyarıyı 'görüldü' yapar (kural tetiklenmeye devam ettikçe açık kalır)."""
+    uyari = db.session.get(Uyari, uyari_id)
+    if uyari is None or uyari.durum != YENI:
+        return False
+    uyari.durum, uyari.guncellendi = GORULDU, datetime.utcnow()
+    return True
+
+
+def uyari_kurulumu_gerekli() -> bool:
+    """Uyarılar hiç tüm ürünler için değerlendirilmemişse (yeni kurulum / eski şema) True."""
+    return surum_oku(UYARI_KURULUM_SURUMU) == 0
+
+
+def uyarilari_yenile() -> dict:
+    """Tüm ürünleri değerlendirir ve ilk kurulumu kaydeder (commit çağırana aittir)."""
+    sayac = uyarilari_degerlendir()
+    surum_artir(UYARI_KURULUM_SURUMU)
+    return sayac
@@ -1,9 +1,16 @@
 # analysis_engine.py — sağlamlaştırılmış sürüm (OPTIMUM FIX + PRICE BUCKETING)
 import pandas as pd
 import numpy as np
+from scipy import sparse
 from sklearn.linear_model import LinearRegression
 from datetime import datetime, timedelta
-from database import db, Urun, SatisKaydi
+from database import (
+    db, Urun, SatisKaydi, GunlukSatisOzeti, Hammadde, Recete, AltRecete, replika_okuma, OZET_FIYAT_ADIMI
+)
+from sqlalchemy import func
+from branch_scope import sube_filtresi
+from catalog_cache import katalog
+from dashboard_stats import _product_stats_last_days
 import warnings
 import json
 
@@ -72,68 +79,164 @@ def _get_daily_sales_data(urun_id, price_step=1.0, lookback_days=None):
       None => tüm veri
       int => son N gün
     """
+    return _get_daily_sales_data_toplu([urun_id], price_step, lookback_days).get(urun_id)
+
+def _get_daily_sales_data_toplu(urun_ids, price_step=1.0, lookback_days=None):
+    """
+    _get_daily_sales_data'nın çok ürünlü hali: tek sorgu, tek groupby.
+    1 TL bucket'ta bucket istatistikleri günlük satış özetinden (gunluk_satis_ozetleri)
+    okunur; ham satış geçmişi taranmaz. Diğer adımlarda ham kayıtlar gruplanır.
+    Dönüş: {urun_id: tablo}; en az 2 farklı fiyat noktası olmayan ürünler yer almaz.
+    """
+    if price_step == OZET_FIYAT_ADIMI:
+        grp = _ozetten_bucket_tablosu(urun_ids, lookback_days)
+    else:
+        grp = _ham_bucket_tablosu(urun_ids, price_step, lookback_days)
+    if grp is None or grp.empty:
+        return {}
+
+    grp = grp[grp['gun_sayisi'] > 0]
+    if grp.empty:
+        return {}
+
+    grp['ortalama_adet'] = grp['toplam_adet'] / grp['gun_sayisi']
+    grp['ortalama_fiyat'] = grp['fiyat_bucket'].astype(float)
+
+    sonuc = {}
+    for urun_id, g in grp.groupby('urun_id'):
+        # En az 2 farklı fiyat noktası şart
+        if g['ortalama_fiyat'].nunique() < 2:
+            continue
+        # Çok küçük örnekleri at (tek gün/tek satış gibi)
+        # İstersen bu eşiği artırabilirsin.
+        g = g[g['gun_sayisi'] >= 1].drop(columns='urun_id')
+        sonuc[int(urun_id)] = g.sort_values('ortalama_fiyat').reset_index(drop=True)
+    return sonuc
+
+def _ozetten_bucket_tablosu(urun_ids, lookback_days=None):
+    """Bucket başına toplam adet ve gün sayısı, günlük satış özetinden (SQL'de toplanır)."""
+    q = (db.session.query(
+            GunlukSatisOzeti.urun_id,
+            GunlukSatisOzeti.fiyat_bucket,
+            func.sum(GunlukSatisOzeti.toplam_adet).label('toplam_adet'),
+            func.count(GunlukSatisOzeti.id).label('gun_sayisi')
+        )
+        .filter(GunlukSatisOzeti.urun_id.in_(list(urun_ids))))
+
+    # Son N gün: özet gün bazında tutulur (gün sayısı da gün bazındadır)
+    if lookback_days is not None:
+        q = q.filter(GunlukSatisOzeti.gun > (datetime.now() - timedelta(days=int(lookback_days))).date())
+    # Tüm şubelerde gün sayısı şube-gün sayısıdır: ortalama adet şube başınadır
+    q = sube_filtresi(q, GunlukSatisOzeti.sube_id)
+
+    with replika_okuma():
+        rows = q.group_by(GunlukSatisOzeti.urun_id, GunlukSatisOzeti.fiyat_bucket).all()
+    if not rows:
+        return None
+
+    grp = pd.DataFrame(rows, columns=['urun_id', 'fiyat_bucket', 'toplam_adet', 'gun_sayisi'])
+    grp['toplam_adet'] = grp['toplam_adet'].astype(float)
+    return grp
+
+def _ham_bucket_tablosu(urun_ids, price_step, lookback_days=None):
+    """Özet dışındaki bucket adımları için ham satış kayıtlarını gruplar."""
     q = (db.session.query(
+            SatisKaydi.urun_id,
+            SatisKaydi.sube_id,
             SatisKaydi.tarih,
             SatisKaydi.adet,
             SatisKaydi.hesaplanan_birim_fiyat
         )
-        .filter_by(urun_id=urun_id))
+        .filter(SatisKaydi.urun_id.in_(list(urun_ids))))
 
-    rows = q.all()
-    if not rows or len(rows) < 2:
+    # Son N gün filtresi (opsiyonel) SQL'de: eski satırlar hiç okunmaz
+    if lookback_days is not None:
+        q = q.filter(SatisKaydi.tarih >= datetime.now() - timedelta(days=int(lookback_days)))
+    q = sube_filtresi(q, SatisKaydi.sube_id)
+
+    with replika_okuma():
+        rows = q.all()
+    if not rows:
         return None
 
-    df = pd.DataFrame(rows, columns=['tarih', 'adet', 'hesaplanan_birim_fiyat'])
+    df = pd.DataFrame(rows, columns=['urun_id', 'sube_id', 'tarih', 'adet', 'hesaplanan_birim_fiyat'])
     df['tarih'] = pd.to_datetime(df['tarih'], errors='coerce')
     df = df.dropna(subset=['tarih', 'adet', 'hesaplanan_birim_fiyat'])
-
     if df.empty:
         return None
 
-    # Son N gün filtresi (opsiyonel)
-    if lookback_days is not None:
-        cutoff = pd.Timestamp(datetime.now() - timedelta(days=int(lookback_days)))
-        df = df[df['tarih'] >= cutoff]
-        if df.empty:
-            return None
-
-    # Fiyat bucket: float gürültüsünü temizler
-    df['fiyat_bucket'] = df['hesaplanan_birim_fiyat'].apply(lambda v: _round_to_step(v, price_step))
+    # Fiyat bucket: float gürültüsünü temizler (_round_to_step'in vektör hali)
+    fiyat = df['hesaplanan_birim_fiyat'].astype(float)
+    df['fiyat_bucket'] = np.floor(fiyat / price_step + 0.5) * price_step if price_step > 0 else fiyat
 
-    # Günlük ortalama adet: aynı bucket kaç gün satılmış?
-    grp = df.groupby('fiyat_bucket').agg(
+    # Günlük ortalama adet: aynı bucket kaç (şube, gün) satılmış? (özetteki satır sayısı ile aynı)
+    df['gun'] = df['tarih'].dt.normalize()
+    gunluk = df.groupby(['urun_id', 'fiyat_bucket', 'sube_id', 'gun'], sort=False)['adet'].sum().reset_index()
+    return gunluk.groupby(['urun_id', 'fiyat_bucket']).agg(
         toplam_adet=('adet', 'sum'),
-        gun_sayisi=('tarih', 'nunique')
+        gun_sayisi=('gun', 'size')
     ).reset_index()
 
-    grp = grp[grp['gun_sayisi'] > 0]
-    if grp.empty:
-        return None
-
-    grp['ortalama_adet'] = grp['toplam_adet'] / grp['gun_sayisi']
-    grp['ortalama_fiyat'] = grp['fiyat_bucket'].astype(float)
-
-    # En az 2 farklı fiyat noktası şart
-    if grp['ortalama_fiyat'].nunique() < 2:
-        return None
-
-    # Çok küçük örnekleri at (tek gün/tek satış gibi)
-    # İstersen bu eşiği artırabilirsin.
-    grp = grp[grp['gun_sayisi'] >= 1].copy()
-    return grp.sort_values('ortalama_fiyat')
-
 # -----------------------------------------
 # Yardımcı: çizim için fiyat eğrisi üret
 # -----------------------------------------
 def _generate_price_curve_data_from_results(df_res):
     return _as_chartjs_line(df_res['test_fiyati'].tolist(), df_res['tahmini_kar'].tolist())
 
+def _as_chartjs_band(labels, y_values, alt, ust, label="Tahmini Toplam Kâr (TL)", band_label="%95 Aralık"):
+    """Kâr eğrisi + altında/üstünde güven bandı (üst seri alt seriye kadar doldurulur)."""
+    veri = json.loads(_as_chartjs_line(labels, y_values, label))
+    veri["datasets"][0]["fill"] = False
+    band = dict(borderColor="rgba(13,110,253,.25)", backgroundColor="rgba(13,110,253,.12)",
+                pointRadius=0, borderWidth=1, tension=0.1)
+    veri["datasets"] += [
+        {**band, "label": f"{band_label} (üst)", "data": [round(float(v), 2) for v in ust], "fill": "+1"},
+        {**band, "label": f"{band_label} (alt)", "data": [round(float(v), 2) for v in alt], "fill": False},
+    ]
+    return json.dumps(veri)
+
+# -----------------------------------------
+# Yardımcı: bootstrap kâr eğrileri (tek seferde, döngüsüz)
+# -----------------------------------------
+def _bootstrap_kar_egrileri(x, y, test_prices, maliyet, B=1000, seed=None):
+    """
+    Fiyat bucket'ları (x, y) B kez yerine koyarak yeniden örneklenir; her örneklemde
+    ortalama_adet ~ ortalama_fiyat doğrusu kapalı formdan, hepsi aynı anda (B × n) çözülür.
+    Dönüş: optimum fiyat / maks. kâr dağılımları ve fiyat başına kâr yüzdelikleri.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, len(x), size=(int(B), len(x)))
+    xs, ys = x[idx], y[idx]
+
+    dx = xs - xs.mean(axis=1, keepdims=True)
+    sxx = (dx * dx).sum(axis=1)
+    # Tek fiyat noktasına düşen örneklemlerde eğim tanımsız: atılır
+    gecerli = sxx > 0
+    dx, ys, sxx, xs = dx[gecerli], ys[gecerli], sxx[gecerli], xs[gecerli]
+    egim = (dx * (ys - ys.mean(axis=1, keepdims=True))).sum(axis=1) / sxx
+    kesisim = ys.mean(axis=1) - egim * xs.mean(axis=1)
+
+    talep = np.maximum(kesisim[:, None] + egim[:, None] * test_prices[None, :], 0.0)
+    karlar = (test_prices[None, :] - maliyet) * talep
+    en_iyi = karlar.argmax(axis=1)
+
+    return {
+        "orneklem": int(gecerli.sum()),
+        "pozitif_egim_orani": float((egim >= 0).mean()) if len(egim) else 0.0,
+        "optimum_fiyat": test_prices[en_iyi],
+        "maks_kar": karlar[np.arange(len(karlar)), en_iyi],
+        "kar_alt": np.percentile(karlar, 2.5, axis=0),
+        "kar_ust": np.percentile(karlar, 97.5, axis=0),
+    }
+
 # ----------------------------------
 # Motor 1: Hedef Marj
 # ----------------------------------
 def hesapla_hedef_marj(urun_ismi, hedef_marj_yuzdesi):
     try:
-        urun = Urun.query.filter_by(isim=urun_ismi).first()
+        urun = katalog().urun(urun_ismi)
         if not urun:
             return False, f"HATA: '{urun_ismi}' adında bir ürün bulunamadı.", None
 
@@ -165,7 +268,7 @@ def simule_et_fiyat_degisikligi(urun_ismi, test_edilecek_yeni_fiyat):
     with warnings.catch_warnings():
         warnings.simplefilter("ignore")
         try:
-            urun = Urun.query.filter_by(isim=urun_ismi).first()
+            urun = katalog().urun(urun_ismi)
             if not urun:
                 return False, f"HATA: '{urun_ismi}' adında bir ürün bulunamadı.", None
 
@@ -230,11 +333,11 @@ def simule_et_fiyat_degisikligi(urun_ismi, test_edilecek_yeni_fiyat):
 # ----------------------------------
 # Motor 3: Optimum Fiyat (FIX + GUARDRAIL)
 # ----------------------------------
-def bul_optimum_fiyat(urun_ismi):
+def bul_optimum_fiyat(urun_ismi, guven_araligi=False, bootstrap_sayisi=1000, seed=None):
     with warnings.catch_warnings():
         warnings.simplefilter("ignore")
         try:
-            urun = Urun.query.filter_by(isim=urun_ismi).first()
+            urun = katalog().urun(urun_ismi)
             if not urun:
                 return False, f"HATA: '{urun_ismi}' adında bir ürün bulunamadı.", None
 
@@ -328,7 +431,37 @@ def bul_optimum_fiyat(urun_ismi):
                 f"  Tahmini Maks. Kâr: {float(optimum['tahmini_kar']):.2f} TL/gün"
             )
 
-            chart_data = _generate_price_curve_data_from_results(df_res)
+            if not guven_araligi:
+                chart_data = _generate_price_curve_data_from_results(df_res)
+                return True, rapor, chart_data
+
+            bs = _bootstrap_kar_egrileri(
+                df_g['ortalama_fiyat'], df_g['ortalama_adet'], test_prices, maliyet,
+                B=bootstrap_sayisi, seed=seed
+            )
+            if bs["orneklem"] < 2:
+                rapor += "\n\n⚠️ UYARI: Güven aralığı için yeterli fiyat çeşitliliği yok."
+                return True, rapor, _generate_price_curve_data_from_results(df_res)
+
+            fiyat_alt, fiyat_ust = np.percentile(bs["optimum_fiyat"], [2.5, 97.5])
+            kar_alt, kar_ust = np.percentile(bs["maks_kar"], [2.5, 97.5])
+            rapor += (
+                f"\n\n--- GÜVEN ARALIĞI (Bootstrap, {bs['orneklem']} örneklem, %95) ---\n"
+                f"  Optimum Fiyat: {fiyat_alt:.2f} – {fiyat_ust:.2f} TL\n"
+                f"  Maks. Günlük Kâr: {kar_alt:.2f} – {kar_ust:.2f} TL\n"
+                f"  Fiyat Noktası (Bucket): {len(df_g)}"
+            )
+            if bs["pozitif_egim_orani"] > 0.05:
+                rapor += (
+                    f"\n⚠️ UYARI: Örneklemlerin %{bs['pozitif_egim_orani'] * 100:.0f}'inde eğim pozitif; "
+                    f"talep eğrisi veriye göre belirsiz."
+                )
+            if (fiyat_ust - fiyat_alt) > 0.25 * float(optimum['test_fiyati']):
+                rapor += "\n⚠️ UYARI: Aralık geniş; önerilen fiyatı kesin bir hedef değil, yön olarak okuyun."
+
+            chart_data = _as_chartjs_band(
+                test_prices.tolist(), profits.tolist(), bs["kar_alt"].tolist(), bs["kar_ust"].tolist()
+            )
             return True, rapor, chart_data
 
         except Exception as e:
@@ -355,8 +488,10 @@ def _get_sales_by_filter(column_name, value):
         q = q.filter(Urun.kategori_grubu == value)
     else:
         return None
+    q = sube_filtresi(q, SatisKaydi.sube_id)
 
-    rows = q.all()
+    with replika_okuma():
+        rows = q.all()
     if not rows:
         return None
 
@@ -431,3 +566,694 @@ def analiz_et_kategori_veya_grup(tip, isim, gun_sayisi=7):
 
     except Exception as e:
         return False, f"Stratejik analiz hatası: {e}", None
+
+# ---------------------------------------------------------
+# Motor 6: Hammadde Fiyat Şoku (what-if, DB'ye yazmaz)
+# ---------------------------------------------------------
+def _recete_matrisi(urun_ids, hammadde_ids):
+    """
+    Alt reçeteler düzleştirilmiş ürün × hammadde miktar matrisi (CSR).
+      E = R + S·E   (R: doğrudan reçete, S: ürün × alt ürün porsiyon matrisi)
+    Alt reçete grafı DAG olduğu için en fazla derinlik+1 adımda sabitlenir.
+    """
+    u_idx = {u: i for i, u in enumerate(urun_ids)}
+    h_idx = {h: j for j, h in enumerate(hammadde_ids)}
+
+    rec = db.session.execute(
+        db.select(Recete.urun_id, Recete.hammadde_id, Recete.miktar).where(Recete.miktar > 0)
+    ).all()
+    rec = [r for r in rec if r[0] in u_idx and r[1] in h_idx]
+    R = sparse.csr_matrix(
+        ([float(r[2]) for r in rec], ([u_idx[r[0]] for r in rec], [h_idx[r[1]] for r in rec])),
+        shape=(len(urun_ids), len(hammadde_ids))
+    )
+
+    alt = db.session.execute(
+        db.select(AltRecete.urun_id, AltRecete.alt_urun_id, AltRecete.miktar).where(AltRecete.miktar > 0)
+    ).all()
+    alt = [a for a in alt if a[0] in u_idx and a[1] in u_idx]
+    if not alt:
+        return R
+
+    S = sparse.csr_matrix(
+        ([float(a[2]) for a in alt], ([u_idx[a[0]] for a in alt], [u_idx[a[1]] for a in alt])),
+        shape=(len(urun_ids), len(urun_ids))
+    )
+    E = R
+    for _ in range(len(urun_ids) + 1):
+        E_yeni = (R + S @ E).tocsr()
+        if abs(E_yeni - E).max() <= 1e-12:
+            return E_yeni
+        E = E_yeni
+    raise ValueError("Alt reçetelerde döngü var; maliyet matrisi hesaplanamadı.")
+
+
+def hammadde_fiyat_soku_tablosu(degisiklikler, gun_sayisi=30):
+    """
+    degisiklikler: {hammadde_ismi: ('yuzde', 12.0) | ('fiyat', 145.0)}
+    Dönüş: (ürün başına DataFrame, bilinmeyen hammadde isimleri)
+    Kolonlar: urun, fiyat, adet, maliyet, yeni_maliyet, marj, yeni_marj, donem_kar, yeni_donem_kar, kar_farki
+    """
+    hammaddeler = db.session.execute(
+        db.select(Hammadde.id, Hammadde.isim, Hammadde.maliyet_fiyati).order_by(Hammadde.id)
+    ).all()
+    h_ids = [h.id for h in hammaddeler]
+    fiyat_eski = np.array([float(h.maliyet_fiyati or 0.0) for h in hammaddeler])
+    fiyat_yeni = fiyat_eski.copy()
+
+    isimden = {h.isim: j for j, h in enumerate(hammaddeler)}
+    bilinmeyen = []
+    for isim, (tip, deger) in degisiklikler.items():
+        j = isimden.get(isim)
+        if j is None:
+            bilinmeyen.append(isim)
+        elif tip == 'yuzde':
+            fiyat_yeni[j] = fiyat_eski[j] * (1.0 + float(deger) / 100.0)
+        else:
+            fiyat_yeni[j] = float(deger)
+
+    # Ara ürün başka şubenin menüsünde olabilir: matris tüm katalogla kurulur, satırlar şubeye süzülür
+    tum_ids = [u.id for u in katalog(tum_subeler=True).urunler]
+    satir = {u: i for i, u in enumerate(tum_ids)}
+    urunler = katalog().urunler
+    u_ids = [u.id for u in urunler]
+    E = _recete_matrisi(tum_ids, h_ids)[[satir[u] for u in u_ids]]
+
+    # Tek matris çarpımı: tüm menünün eski/yeni maliyeti
+    maliyet = E @ fiyat_eski
+    yeni_maliyet = E @ fiyat_yeni
+
+    # Son X gün satış hacmi ve gerçekleşen ortalama fiyat
+    stats = {s['urun_id']: s for s in _product_stats_last_days(gun_sayisi)}
+    adet = np.array([float(stats[u]['adet']) if u in stats else 0.0 for u in u_ids])
+    ciro = np.array([float(stats[u]['ciro']) if u in stats else 0.0 for u in u_ids])
+    liste_fiyati = np.array([float(u.mevcut_satis_fiyati or 0.0) for u in urunler])
+    fiyat = np.where(adet > 0, ciro / np.maximum(adet, 1.0), liste_fiyati)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        marj = np.where(fiyat > 0, (fiyat - maliyet) / fiyat * 100.0, 0.0)
+        yeni_marj = np.where(fiyat > 0, (fiyat - yeni_maliyet) / fiyat * 100.0, 0.0)
+
+    df = pd.DataFrame({
+        'urun': [u.isim for u in urunler],
+        'fiyat': fiyat,
+        'adet': adet,
+        'maliyet': maliyet,
+        'yeni_maliyet': yeni_maliyet,
+        'marj': marj,
+        'yeni_marj': yeni_marj,
+        'donem_kar': ciro - adet * maliyet,
+        'yeni_donem_kar': ciro - adet * yeni_maliyet,
+    })
+    df['kar_farki'] = df['yeni_donem_kar'] - df['donem_kar']
+    return df, bilinmeyen
+
+
+def simule_et_hammadde_fiyat_soku(degisiklikler, gun_sayisi=30):
+    try:
+        if not degisiklikler:
+            return False, "HATA: En az bir hammadde fiyat değişikliği girin.", None
+
+        df, bilinmeyen = hammadde_fiyat_soku_tablosu(degisiklikler, gun_sayisi)
+        if bilinmeyen and len(bilinmeyen) == len(degisiklikler):
+            return False, f"HATA: Hammadde bulunamadı: {', '.join(bilinmeyen)}", None
+        if df.empty:
+            return False, "HATA: Menüde ürün yok.", None
+
+        etkilenen = df[(df['yeni_maliyet'] - df['maliyet']).abs() > 1e-9]
+        etkilenen = etkilenen.sort_values('kar_farki')
+
+        toplam_eski = float(df['donem_kar'].sum())
+        toplam_yeni = float(df['yeni_donem_kar'].sum())
+        fark = toplam_yeni - toplam_eski
+
+        rapor = (
+            f"--- FİYAT ŞOKU ÖZETİ (Son {gun_sayisi} gün hacmiyle) ---\n"
+            f"  Değişen Hammadde: {len(degisiklikler) - len(bilinmeyen)}\n"
+            f"  Etkilenen Ürün: {len(etkilenen)} / {len(df)}\n"
+            f"  Dönem Kârı (Mevcut): {toplam_eski:.2f} TL\n"
+            f"  Dönem Kârı (Yeni): {toplam_yeni:.2f} TL\n"
+        )
+        if bilinmeyen:
+            rapor += f"  Bulunamayan: {', '.join(bilinmeyen)}\n"
+        rapor += "\n--- ÜRÜN BAZINDA (en çok etkilenen başta) ---\n"
+        for r in etkilenen.itertuples():
+            rapor += (
+                f"  {r.urun}: maliyet {r.maliyet:.2f} → {r.yeni_maliyet:.2f} TL | "
+                f"marj %{r.marj:.1f} → %{r.yeni_marj:.1f} | "
+                f"dönem kârı {r.donem_kar:.2f} → {r.yeni_donem_kar:.2f} TL (Δ={r.kar_farki:.2f})\n"
+            )
+        rapor += "\n" + "=" * 50 + "\n"
+        if abs(fark) < 0.005:
+            rapor += "Aynı satış hacmiyle dönem kârı değişmez."
+        elif fark < 0:
+            rapor += f"❌ DİKKAT: Aynı satış hacmiyle dönem kârı {abs(fark):.2f} TL azalır."
+        else:
+            rapor += f"✅ BAŞARILI: Aynı satış hacmiyle dönem kârı {fark:.2f} TL artar."
+
+        grafik = etkilenen.head(15)
+        chart_data = None if grafik.empty else _as_chartjs_bar(
+            grafik['urun'].tolist(),
+            grafik['donem_kar'].tolist(), "Mevcut Dönem Kârı (TL)",
+            grafik['yeni_donem_kar'].tolist(), "Yeni Dönem Kârı (TL)"
+        )
+        return True, rapor, chart_data
+
+    except Exception as e:
+        return False, f"Fiyat şoku analizi hatası: {e}", None
+
+# ---------------------------------------------------------
+# Motor 7: Çok Ürünlü Fiyat Taraması (ürün × aday fiyat ızgarası)
+# ---------------------------------------------------------
+def _talep_modelleri(tablolar):
+    """
+    Her ürün için ortalama_adet ~ ortalama_fiyat doğrusu (LinearRegression ile aynı sonuç).
+    Tüm ürünler tek groupby ile kapalı formdan çözülür. Dönüş: DataFrame[kesisim, egim] (index: urun_id)
+    """
+    df = pd.concat(
+        {u: t[['ortalama_fiyat', 'ortalama_adet']] for u, t in tablolar.items()},
+        names=['urun_id', None]
+    ).reset_index(level=0)
+
+    g = df.groupby('urun_id')
+    dx = df['ortalama_fiyat'] - g['ortalama_fiyat'].transform('mean')
+    dy = df['ortalama_adet'] - g['ortalama_adet'].transform('mean')
+    ozet = pd.DataFrame({'sxy': dx * dy, 'sxx': dx * dx, 'urun_id': df['urun_id']}).groupby('urun_id').sum()
+    ortalama = g[['ortalama_fiyat', 'ortalama_adet']].mean()
+
+    egim = ozet['sxy'] / ozet['sxx'].where(ozet['sxx'] > 0)
+    kesisim = ortalama['ortalama_adet'] - egim * ortalama['ortalama_fiyat']
+    return pd.DataFrame({'kesisim': kesisim, 'egim': egim}).dropna()
+
+
+def fiyat_taramasi_tablosu(urun_isimleri, yuzde_adaylari, lookback_days=180):
+    """
+    Seçili ürünlerin her biri için mevcut fiyatın yuzde_adaylari kadar değiştirilmiş hallerini dener.
+    Satış verisi tek sorguda gelir, talep modelleri bir kez kurulur, ızgara NumPy ile hesaplanır.
+    Dönüş: (ürün tablosu, günlük kâr matrisi, aday fiyat matrisi, {atlanan ürün: sebep})
+    """
+    ref = katalog()
+    atlanan = {}
+    if urun_isimleri:
+        urunler = []
+        for isim in urun_isimleri:
+            u = ref.urun(isim)
+            if u is None:
+                atlanan[isim] = "ürün bulunamadı"
+            else:
+                urunler.append(u)
+    else:
+        urunler = list(ref.urunler)
+
+    adaylar = []
+    for u in urunler:
+        if float(u.hesaplanan_maliyet or 0.0) <= 0:
+            atlanan[u.isim] = "maliyet 0 TL"
+        elif float(u.mevcut_satis_fiyati or 0.0) <= 0:
+            atlanan[u.isim] = "satış fiyatı 0 TL"
+        else:
+            adaylar.append(u)
+
+    tablolar = _get_daily_sales_data_toplu([u.id for u in adaylar], price_step=1.0, lookback_days=lookback_days)
+    modeller = _talep_modelleri(tablolar) if tablolar else pd.DataFrame(columns=['kesisim', 'egim'])
+
+    secilen = []
+    for u in adaylar:
+        if u.id not in tablolar:
+            atlanan[u.isim] = "en az 2 farklı fiyatta satış yok"
+        elif u.id not in modeller.index or float(modeller.at[u.id, 'egim']) >= 0:
+            atlanan[u.isim] = "talep eğimi pozitif (güvenilmez)"
+        else:
+            secilen.append(u)
+
+    df = pd.DataFrame({
+        'urun_id': [u.id for u in secilen],
+        'urun': [u.isim for u in secilen],
+        'maliyet': [float(u.hesaplanan_maliyet) for u in secilen],
+        'mevcut_fiyat': [float(u.mevcut_satis_fiyati) for u in secilen],
+    })
+    if df.empty:
+        bos = np.zeros((0, len(yuzde_adaylari)))
+        return df, bos, bos, atlanan
+
+    a = modeller.loc[df['urun_id'], 'kesisim'].to_numpy()[:, None]
+    b = modeller.loc[df['urun_id'], 'egim'].to_numpy()[:, None]
+    maliyet = df['maliyet'].to_numpy()[:, None]
+    mevcut = df['mevcut_fiyat'].to_numpy()[:, None]
+
+    # (ürün × aday) ızgarası
+    fiyatlar = mevcut * (1.0 + np.asarray(yuzde_adaylari, dtype=float)[None, :] / 100.0)
+    talep = np.maximum(a + b * fiyatlar, 0.0)
+    karlar = (fiyatlar - maliyet) * talep
+    mevcut_kar = ((mevcut - maliyet) * np.maximum(a + b * mevcut, 0.0))[:, 0]
+
+    en_iyi = karlar.argmax(axis=1)
+    satir = np.arange(len(df))
+    df['mevcut_kar'] = mevcut_kar
+    df['en_iyi_yuzde'] = np.asarray(yuzde_adaylari, dtype=float)[en_iyi]
+    df['en_iyi_fiyat'] = fiyatlar[satir, en_iyi]
+    df['en_iyi_kar'] = karlar[satir, en_iyi]
+    df['kar_farki'] = df['en_iyi_kar'] - df['mevcut_kar']
+    return df, karlar, fiyatlar, atlanan
+
+
+def _as_heatmap(satirlar, kolonlar, degerler, etiket, ekler=None):
+    return json.dumps({
+        "tip": "isi_haritasi",
+        "etiket": etiket,
+        "satirlar": satirlar,
+        "kolonlar": kolonlar,
+        "degerler": [[round(float(v), 2) for v in satir] for satir in degerler],
+        "ekler": [[round(float(v), 2) for v in satir] for satir in ekler] if ekler is not None else None,
+    })
+
+
+def simule_et_fiyat_taramasi(urun_isimleri, yuzde_adaylari, lookback_days=180):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        try:
+            if not yuzde_adaylari:
+                return False, "HATA: En az bir aday fiyat değişimi (%) girin.", None
+
+            yuzde_adaylari = sorted(set(float(y) for y in yuzde_adaylari))
+            df, karlar, fiyatlar, atlanan = fiyat_taramasi_tablosu(urun_isimleri, yuzde_adaylari, lookback_days)
+            if df.empty:
+                detay = "; ".join(f"{k}: {v}" for k, v in list(atlanan.items())[:10])
+                return False, f"HATA: Taranabilecek ürün yok. {detay}", None
+
+            sira = np.argsort(-df['kar_farki'].to_numpy(), kind='stable')
+            df = df.iloc[sira].reset_index(drop=True)
+            karlar, fiyatlar = karlar[sira], fiyatlar[sira]
+            kolonlar = [f"{y:+g}%" if y else "0%" for y in yuzde_adaylari]
+
+            toplam_fark = float(df['kar_farki'].sum())
+            rapor = (
+                f"--- FİYAT TARAMASI (Son {lookback_days} gün talep modeli) ---\n"
+                f"  Taranan Ürün: {len(df)}\n"
+                f"  Aday Değişimler: {', '.join(kolonlar)}\n"
+                f"  Günlük Kâr (Mevcut Fiyatlar, Model): {float(df['mevcut_kar'].sum()):.2f} TL\n"
+                f"  Günlük Kâr (En İyi Adaylar, Model): {float(df['en_iyi_kar'].sum()):.2f} TL\n"
+            )
+            if atlanan:
+                rapor += f"  Atlanan Ürün: {len(atlanan)}\n"
+
+            rapor += "\n--- ÜRÜN BAZINDA EN İYİ ADAY ---\n"
+            for r in df.itertuples():
+                if r.kar_farki < 0.005:
+                    rapor += f"  {r.urun}: mevcut fiyat ({r.mevcut_fiyat:.2f} TL) adaylardan iyi veya eşit\n"
+                else:
+                    rapor += (
+                        f"  {r.urun}: {r.mevcut_fiyat:.2f} → {r.en_iyi_fiyat:.2f} TL ({r.en_iyi_yuzde:+g}%) | "
+                        f"günlük kâr {r.mevcut_kar:.2f} → {r.en_iyi_kar:.2f} TL (Δ={r.kar_farki:.2f})\n"
+                    )
+            if atlanan:
+                rapor += "\n--- ATLANAN ÜRÜNLER ---\n"
+                for isim, sebep in list(atlanan.items())[:20]:
+                    rapor += f"  {isim}: {sebep}\n"
+
+            rapor += "\n" + "=" * 50 + "\n"
+            if toplam_fark < 0.005:
+                rapor += "Mevcut fiyatlar denenen adaylardan daha kârlı görünüyor."
+            else:
+                rapor += f"✅ En iyi adaylarla tahmini günlük kâr artışı: {toplam_fark:.2f} TL (model tahmini)."
+
+            # Isı haritası: mevcut fiyata göre günlük kâr farkı
+            chart_data = _as_heatmap(
+                df['urun'].tolist(), kolonlar,
+                karlar - df['mevcut_kar'].to_numpy()[:, None],
+                "Günlük kâr farkı (TL)",
+                ekler=fiyatlar
+            )
+            return True, rapor, chart_data
+
+        except Exception as e:
+            return False, f"Fiyat taraması hatası: {e}", None
+
+# ---------------------------------------------------------
+# Motor 8: Menü Mühendisliği (popülerlik × katkı marjı, Kasavana–Smith)
+# ---------------------------------------------------------
+# Star / Plowhorse / Puzzle / Dog
+MENU_SINIFLARI = ("Yıldız", "İş Atı", "Bilmece", "Köpek")
+_MENU_RENKLERI = {
+    "Yıldız": "rgb(25, 135, 84)",
+    "İş Atı": "rgb(13, 110, 253)",
+    "Bilmece": "rgb(255, 193, 7)",
+    "Köpek": "rgb(220, 53, 69)",
+}
+_MENU_ONERILERI = {
+    "Yıldız": "Koruyun; görünür yerde tutun, fiyatı dikkatli artırın.",
+    "İş Atı": "Çok satıyor ama az kazandırıyor; porsiyon/reçete maliyetini veya fiyatı gözden geçirin.",
+    "Bilmece": "İyi kazandırıyor ama az satıyor; menüde öne çıkarın, personel önerisi isteyin.",
+    "Köpek": "Az satıyor ve az kazandırıyor; menüden çıkarmayı veya yeniden tasarlamayı düşünün.",
+}
+
+
+def menu_muhendisligi_tablosu(gun_sayisi=30, kategori=None, populerlik_orani=0.70):
+    """
+    Menüdeki her ürünü kendi kategorisi içinde sınıflandırır.
+    - Popülerlik eşiği: (1 / kategorideki ürün sayısı) × populerlik_orani satış payı
+    - Katkı marjı eşiği: kategorinin ağırlıklı ortalama birim kârı (toplam kâr / toplam adet)
+    Satışlar tek toplama sorgusuyla gelir; sınıflandırma tüm kategoriler için tek vektörel geçiştir.
+    Kolonlar: urun, kategori, adet, ciro, kar, pay, pay_esik, kb, kb_esik, sinif
+    """
+    urunler = katalog().urunler
+    if kategori:
+        urunler = [u for u in urunler if u.kategori == kategori]
+    if not urunler:
+        return pd.DataFrame()
+
+    since_dt = datetime.now() - timedelta(days=int(gun_sayisi))
+    q = sube_filtresi(
+        db.select(
+            SatisKaydi.urun_id,
+            func.coalesce(func.sum(SatisKaydi.adet), 0),
+            func.coalesce(func.sum(SatisKaydi.toplam_tutar), 0.0),
+            func.coalesce(func.sum(SatisKaydi.hesaplanan_kar), 0.0),
+        ).where(SatisKaydi.tarih >= since_dt),
+        SatisKaydi.sube_id,
+    ).group_by(SatisKaydi.urun_id)
+    if kategori:
+        q = q.join(Urun, Urun.id == SatisKaydi.urun_id).where(Urun.kategori == kategori)
+    with replika_okuma():
+        satis = pd.DataFrame(db.session.execute(q).all(), columns=['urun_id', 'adet', 'ciro', 'kar'])
+
+    df = pd.DataFrame({
+        'urun_id': [u.id for u in urunler],
+        'urun': [u.isim for u in urunler],
+        'kategori': [u.kategori or "Kategorisiz" for u in urunler],
+        'liste_fiyati': [float(u.mevcut_satis_fiyati or 0.0) for u in urunler],
+        'maliyet': [float(u.hesaplanan_maliyet or 0.0) for u in urunler],
+    }).merge(satis, on='urun_id', how='left')
+    df[['adet', 'ciro', 'kar']] = df[['adet', 'ciro', 'kar']].fillna(0.0).astype(float)
+
+    # Birim katkı marjı; dönemde satışı olmayan ürün için liste fiyatı - maliyet
+    df['kb'] = np.where(df['adet'] > 0, df['kar'] / df['adet'].clip(lower=1.0), df['liste_fiyati'] - df['maliyet'])
+
+    g = df.groupby('kategori')
+    kat_adet = g['adet'].transform('sum')
+    kat_kar = g['kar'].transform('sum')
+    df['pay'] = np.where(kat_adet > 0, df['adet'] / kat_adet.clip(lower=1.0), 0.0)
+    df['pay_esik'] = populerlik_orani / g['urun_id'].transform('size')
+    df['kb_esik'] = np.where(kat_adet > 0, kat_kar / kat_adet.clip(lower=1.0), g['kb'].transform('mean'))
+
+    populer = df['pay'] >= df['pay_esik']
+    karli = df['kb'] >= df['kb_esik']
+    df['sinif'] = np.select(
+        [populer & karli, populer & ~karli, ~populer & karli],
+        list(MENU_SINIFLARI[:3]),
+        default=MENU_SINIFLARI[3],
+    )
+    return df.drop(columns=['urun_id', 'liste_fiyati', 'maliyet'])
+
+
+def _as_menu_scatter(df):
+    """
+    Tüm kategoriler tek grafikte: x = satış payı / popülerlik eşiği (1 = eşik),
+    y = birim katkı marjı - kategori ortalaması (0 = eşik). Her sınıf ayrı dataset.
+    """
+    x = (df['pay'] / df['pay_esik']).round(3).tolist()
+    y = (df['kb'] - df['kb_esik']).round(2).tolist()
+    datasets = []
+    for sinif in MENU_SINIFLARI:
+        idx = np.flatnonzero(df['sinif'].to_numpy() == sinif)
+        datasets.append({
+            "label": sinif,
+            "data": [{"x": x[i], "y": y[i], "u": df['urun'].iat[i], "k": df['kategori'].iat[i]} for i in idx],
+            "backgroundColor": _MENU_RENKLERI[sinif],
+        })
+    return json.dumps({"tip": "menu_matrisi", "datasets": datasets}, ensure_ascii=False)
+
+
+def menu_muhendisligi(gun_sayisi=30, kategori=None):
+    try:
+        df = menu_muhendisligi_tablosu(gun_sayisi, kategori)
+        if df.empty:
+            return False, "HATA: Menüde ürün yok." if not kategori else f"HATA: '{kategori}' kategorisinde ürün yok.", None
+        if df['adet'].sum() <= 0:
+            return False, f"UYARI: Son {gun_sayisi} günde satış verisi yok.", None
+
+        sayilar = df['sinif'].value_counts()
+        rapor = (
+            f"--- MENÜ MÜHENDİSLİĞİ (Son {gun_sayisi} gün) ---\n"
+            f"  Ürün: {len(df)} ({df['kategori'].nunique()} kategori)\n"
+            f"  Toplam Kâr: {df['kar'].sum():.2f} TL\n"
+        )
+        for sinif in MENU_SINIFLARI:
+            rapor += f"  {sinif}: {int(sayilar.get(sinif, 0))} ürün\n"
+
+        for sinif in MENU_SINIFLARI:
+            grup = df[df['sinif'] == sinif]
+            if grup.empty:
+                continue
+            grup = grup.nlargest(10, 'kar') if sinif != "Köpek" else grup.nsmallest(10, 'kar')
+            rapor += f"\n--- {sinif.upper()} ---\n{_MENU_ONERILERI[sinif]}\n"
+            for r in grup.itertuples():
+                rapor += (
+                    f"  {r.urun} ({r.kategori}): {int(r.adet)} adet, satış payı %{r.pay * 100:.1f} "
+                    f"(eşik %{r.pay_esik * 100:.1f}) | birim kâr {r.kb:.2f} TL (ort. {r.kb_esik:.2f})\n"
+                )
+            if int(sayilar.get(sinif, 0)) > len(grup):
+                rapor += f"  … ve {int(sayilar.get(sinif, 0)) - len(grup)} ürün daha\n"
+
+        yildiz_payi = df.loc[df['sinif'] == "Yıldız", 'kar'].sum() / df['kar'].sum() * 100.0 if df['kar'].sum() else 0.0
+        rapor += "\n" + "=" * 50 + "\n"
+        rapor += f"✅ Yıldız ürünlerin dönem kârındaki payı: %{yildiz_payi:.1f}"
+
+        return True, rapor, _as_menu_scatter(df)
+
+    except Exception as e:
+        return False, f"Menü mühendisliği hatası: {e}", None
+
+# ---------------------------------------------------------
+# Motor 9: Kısa Vadeli Talep Tahmini (tüm menü, Holt-Winters)
+# ---------------------------------------------------------
+# Her ürün için denenen (alfa, beta, gama); en düşük bir-adım hata karesi toplamı seçilir
+_HW_IZGARASI = [(a, b, g) for a in (0.1, 0.3, 0.5) for b in (0.0, 0.05) for g in (0.05, 0.2, 0.4)]
+_HW_SONUMLEME = 0.9  # trend sönümleme (phi): 7 günlük ufukta trend patlamasın
+HAFTA = 7
+MIN_GECMIS_GUN = 2 * HAFTA   # ilk hafta başlangıç seviyesi/mevsimsellik, ikincisi trend için
+MAKS_GECMIS_GUN = 365        # matris boyutu formdan gelir; sınırlandırılır
+
+
+def talep_matrisi(gun_sayisi=56):
+    """
+    Ürün × gün satış adedi matrisi (günlük satış özetinden, tek sorgu). Satışsız günler 0'dır.
+    Pencere, dönemdeki son satış gününde biter ve kapsamdaki ilk satış gününden önce başlamaz
+    (yeni şubede 7 günlük veri 56 günlük sıfır dolgusuyla trend üretmesin).
+    Dönüş: (urunler, gunler, Y) ya da veri yoksa (urunler, [], None)
+    """
+    urunler = katalog().urunler
+    since = (datetime.now() - timedelta(days=int(gun_sayisi) + HAFTA)).date()
+    q = sube_filtresi(
+        db.session.query(
+            GunlukSatisOzeti.urun_id,
+            GunlukSatisOzeti.gun,
+            func.sum(GunlukSatisOzeti.toplam_adet),
+        ).filter(GunlukSatisOzeti.gun > since),
+        GunlukSatisOzeti.sube_id,
+    )
+    with replika_okuma():
+        rows = q.group_by(GunlukSatisOzeti.urun_id, GunlukSatisOzeti.gun).all()
+    if not urunler or not rows:
+        return urunler, [], None
+
+    son_gun = max(r[1] for r in rows)
+    ilk_gun = max(min(r[1] for r in rows), son_gun - timedelta(days=int(gun_sayisi) - 1))
+    gunler = [ilk_gun + timedelta(days=j) for j in range((son_gun - ilk_gun).days + 1)]
+
+    u_idx = {u.id: i for i, u in enumerate(urunler)}
+    rows = [r for r in rows if r[0] in u_idx and r[1] >= ilk_gun]
+    Y = np.zeros((len(urunler), len(gunler)))
+    if rows:
+        np.add.at(
+            Y,
+            (np.array([u_idx[r[0]] for r in rows]), np.array([(r[1] - ilk_gun).days for r in rows])),
+            np.array([float(r[2] or 0) for r in rows]),
+        )
+    return urunler, gunler, Y
+
+
+def _holt_winters(Y, baslangic, ufuk=7, m=HAFTA, phi=_HW_SONUMLEME):
+    """
+    Toplamsal Holt-Winters (sönümlü trend + haftalık mevsimsellik), tüm satırlar aynı anda.
+    Zaman döngüsü gün sayısı kadardır; her adım ürün ekseninde NumPy vektör işlemidir.
+    Her ürün kendi ilk satış gününden (`baslangic`, T - 2m'den büyük olmamalı) başlatılır; öncesindeki
+    sıfırlar modeli güncellemez. Mevsim indeksi takvim gününe (t % m) bağlıdır.
+    Parametre ızgarası her ürün için ayrı seçilir. Dönüş: (tahmin [P × ufuk], bir-adım RMSE [P])
+    """
+    P, T = Y.shape
+    satir = np.arange(P)[:, None]
+    ilk_hafta = baslangic[:, None] + np.arange(m)
+    l0 = Y[satir, ilk_hafta].mean(axis=1)
+    b0 = (Y[satir, ilk_hafta + m].mean(axis=1) - l0) / m
+    s0 = np.zeros((P, m))
+    s0[satir, ilk_hafta % m] = Y[satir, ilk_hafta] - l0[:, None]
+
+    h = np.arange(1, ufuk + 1)
+    sonum = np.cumsum(phi ** h)
+    mevsim_idx = (T - 1 + h) % m
+
+    en_iyi_sse = np.full(P, np.inf)
+    tahmin = np.zeros((P, ufuk))
+    for a, b, g in _HW_IZGARASI:
+        l, tr, s = l0.copy(), b0.copy(), s0.copy()
+        sse = np.zeros(P)
+        for t in range(int(baslangic.min()) + m, T):
+            k = t % m
+            y = Y[:, t]
+            aktif = t >= baslangic + m
+            e = y - (l + phi * tr + s[:, k])
+            sse += np.where(aktif, e * e, 0.0)
+            l_yeni = a * (y - s[:, k]) + (1 - a) * (l + phi * tr)
+            tr = np.where(aktif, b * (l_yeni - l) + (1 - b) * phi * tr, tr)
+            s[:, k] = np.where(aktif, g * (y - l_yeni) + (1 - g) * s[:, k], s[:, k])
+            l = np.where(aktif, l_yeni, l)
+
+        f = l[:, None] + tr[:, None] * sonum[None, :] + s[:, mevsim_idx]
+        daha_iyi = sse < en_iyi_sse
+        tahmin[daha_iyi] = f[daha_iyi]
+        en_iyi_sse = np.where(daha_iyi, sse, en_iyi_sse)
+
+    return np.clip(tahmin, 0.0, None), np.sqrt(en_iyi_sse / np.maximum(T - baslangic - m, 1))
+
+
+def talep_tahmini_tablosu(ufuk=7, gun_sayisi=56):
+    """
+    Tüm menü için önümüzdeki `ufuk` günün adet tahmini ve reçetelerin gerektirdiği hammadde miktarı.
+    Dönüş: (ürün DataFrame'i, hammadde DataFrame'i, geçmiş günler, tahmin günleri, geçmiş matris) ya da None
+    Ürün kolonları: urun, kategori, gecmis_ort, gecmis_gun, rmse, toplam, g0..g{ufuk-1}
+    Hammadde kolonları: hammadde, birim, toplam, maliyet, g0..g{ufuk-1}
+    """
+    gun_sayisi = max(MIN_GECMIS_GUN, min(int(gun_sayisi), MAKS_GECMIS_GUN))
+    urunler, gunler, Y = talep_matrisi(gun_sayisi)
+    if Y is None:
+        return None
+
+    # Ürün başına ilk satış günü: öncesi (menüye girmeden önceki sıfırlar) ne modele ne ortalamaya girer
+    T = Y.shape[1]
+    satan = Y.sum(axis=1) > 0
+    ilk = np.where(satan, (Y > 0).argmax(axis=1), T)
+    gecmis_gun = T - ilk
+    gecmis_ort = np.where(satan, Y.sum(axis=1) / np.maximum(gecmis_gun, 1), 0.0)
+
+    # En az iki haftalık geçmişi olan ürünler Holt-Winters; daha yeniler geçmiş ortalamasıyla
+    tahmin = np.repeat(gecmis_ort[:, None], ufuk, axis=1)
+    rmse = np.zeros(len(urunler))
+    hw = satan & (gecmis_gun >= MIN_GECMIS_GUN)
+    if hw.any():
+        tahmin[hw], rmse[hw] = _holt_winters(Y[hw], ilk[hw], ufuk)
+    yeni = satan & ~hw
+    if yeni.any():
+        fark = np.where(np.arange(T)[None, :] >= ilk[yeni, None], Y[yeni] - gecmis_ort[yeni, None], 0.0)
+        rmse[yeni] = np.sqrt((fark ** 2).sum(axis=1) / gecmis_gun[yeni])
+
+    tahmin_gunleri = [gunler[-1] + timedelta(days=j) for j in range(1, ufuk + 1)]
+    gun_kolonlari = [f"g{j}" for j in range(ufuk)]
+    df = pd.DataFrame(tahmin, columns=gun_kolonlari)
+    df.insert(0, 'urun', [u.isim for u in urunler])
+    df.insert(1, 'kategori', [u.kategori or "" for u in urunler])
+    df.insert(2, 'gecmis_ort', gecmis_ort)
+    df.insert(3, 'gecmis_gun', np.where(satan, gecmis_gun, 0))
+    df.insert(4, 'rmse', rmse)
+    df.insert(5, 'toplam', tahmin.sum(axis=1))
+
+    # Hammadde ihtiyacı: alt reçeteler düzleştirilmiş matrisin transpozu × tahmin
+    hammaddeler = db.session.execute(
+        db.select(Hammadde.id, Hammadde.isim, Hammadde.maliyet_birimi, Hammadde.maliyet_fiyati).order_by(Hammadde.id)
+    ).all()
+    if hammaddeler:
+        tum_ids = [u.id for u in katalog(tum_subeler=True).urunler]
+        satir = {u: i for i, u in enumerate(tum_ids)}
+        E = _recete_matrisi(tum_ids, [h.id for h in hammaddeler])[[satir[u.id] for u in urunler]]
+        ihtiyac = np.asarray(E.T @ tahmin)
+    else:
+        ihtiyac = np.zeros((0, ufuk))
+    hdf = pd.DataFrame(ihtiyac, columns=gun_kolonlari)
+    hdf.insert(0, 'hammadde', [h.isim for h in hammaddeler])
+    hdf.insert(1, 'birim', [h.maliyet_birimi for h in hammaddeler])
+    hdf.insert(2, 'toplam', ihtiyac.sum(axis=1))
+    hdf.insert(3, 'maliyet', hdf['toplam'] * np.array([float(h.maliyet_fiyati or 0.0) for h in hammaddeler]))
+    hdf = hdf[hdf['toplam'] > 1e-9]
+
+    return df, hdf, gunler, tahmin_gunleri, Y
+
+
+def tahmin_et_talep(ufuk=7, gun_sayisi=56):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        try:
+            sonuc = talep_tahmini_tablosu(ufuk, gun_sayisi)
+            if sonuc is None:
+                return False, "HATA: Tahmin için satış verisi yok.", None
+            df, hdf, gunler, tahmin_gunleri, Y = sonuc
+            if len(gunler) < MIN_GECMIS_GUN:
+                return False, (
+                    f"UYARI: Haftalık mevsimsellik için en az {MIN_GECMIS_GUN} günlük geçmiş gerekir "
+                    f"(şu an {len(gunler)} gün: {gunler[0]:%d.%m.%Y} – {gunler[-1]:%d.%m.%Y})."
+                ), None
+
+            aralik = f"{tahmin_gunleri[0]:%d.%m.%Y} – {tahmin_gunleri[-1]:%d.%m.%Y}"
+            rapor = (
+                f"--- TALEP TAHMİNİ ({aralik}) ---\n"
+                f"  Geçmiş: {len(gunler)} gün (son satış günü {gunler[-1]:%d.%m.%Y})\n"
+                f"  Ürün: {len(df)} ({int((df['gecmis_ort'] > 0).sum())} tanesi satılmış)\n"
+                f"  Toplam Tahmini Adet: {df['toplam'].sum():.0f}\n"
+                f"  Tahmini Hammadde Maliyeti: {hdf['maliyet'].sum():.2f} TL\n"
+            )
+            if tahmin_gunleri[0] < datetime.now().date():
+                rapor += (
+                    f"  ⚠️ Tahmin bugünden değil, son satış gününün ertesinden ({tahmin_gunleri[0]:%d.%m.%Y}) başlar. "
+                    f"Eksik günlerin satışlarını yükleyip tekrar çalıştırın.\n"
+                )
+            yeni_urun = int(((df['gecmis_gun'] > 0) & (df['gecmis_gun'] < MIN_GECMIS_GUN)).sum())
+            if yeni_urun:
+                rapor += f"  {yeni_urun} yeni ürün ({MIN_GECMIS_GUN} günden kısa geçmiş) günlük ortalamasıyla tahmin edildi.\n"
+
+            rapor += "\n--- ÜRÜN BAZINDA (en çok satılacaklar) ---\n"
+            for r in df.nlargest(20, 'toplam').itertuples():
+                if r.toplam <= 0:
+                    break
+                rapor += (
+                    f"  {r.urun}: {r.toplam:.0f} adet / {ufuk} gün "
+                    f"(günlük ort. {r.toplam / ufuk:.1f}, geçmiş {r.gecmis_ort:.1f}, ±{r.rmse:.1f})\n"
+                )
+
+            if not hdf.empty:
+                rapor += "\n--- HAMMADDE İHTİYACI (maliyete göre) ---\n"
+                gosterilen = hdf.nlargest(30, 'maliyet')
+                for r in gosterilen.itertuples():
+                    rapor += f"  {r.hammadde}: {r.toplam:.2f} {r.birim} ({r.maliyet:.2f} TL)\n"
+                if len(hdf) > len(gosterilen):
+                    rapor += f"  … ve {len(hdf) - len(gosterilen)} hammadde daha\n"
+
+            rapor += "\n" + "=" * 50 + "\n"
+            rapor += "⚠️ Tahminler son haftaların seyri ve haftanın günü etkisine dayanır; kampanya ve tatilleri hesaba katmaz."
+
+            # Menü toplamı: son 4 hafta gerçekleşen + tahmin
+            gecmis = Y.sum(axis=0)[-4 * HAFTA:]
+            gecmis_gunleri = gunler[-4 * HAFTA:]
+            tahmin_toplam = df[[f"g{j}" for j in range(ufuk)]].sum(axis=0).to_numpy()
+            chart_data = json.dumps({
+                "labels": [f"{g:%d.%m}" for g in [*gecmis_gunleri, *tahmin_gunleri]],
+                "datasets": [
+                    {
+                        "label": "Gerçekleşen (adet)",
+                        "data": [round(float(v), 1) for v in gecmis] + [None] * ufuk,
+                        "borderColor": "#0d6efd",
+                        "backgroundColor": "rgba(13,110,253,.15)",
+                        "tension": 0.1
+                    },
+                    {
+                        "label": "Tahmin (adet)",
+                        "data": [None] * (len(gecmis) - 1) + [round(float(gecmis[-1]), 1)]
+                                + [round(float(v), 1) for v in tahmin_toplam],
+                        "borderColor": "#fd7e14",
+                        "borderDash": [6, 4],
+                        "tension": 0.1
+                    }
+                ]
+            })
+            return True, rapor, chart_data
+
+        except Exception as e:
+            return False, f"Talep tahmini hatası: {e}", None
@@ -2,47 +2,73 @@
 # NOT: Bu sürümde /add-recipe endpoint'i "çoklu satır" (r_hammadde_id[] / r_miktar[]) destekler.
 # ✅ EK: Dashboard'da son X güne göre en iyi / en kötü 3 ürün (marj) listesi
 # ✅ EK: Dashboard "Bugün Ne Yapmalıyım?" (insights) kartı için öneriler
+# NOT: Modül import'u hafiftir; pandas/sklearn ilk analiz/upload isteğinde yüklenir.
+#      Tablolar ve ilk admin: `flask --app app init-db` (gunicorn --preload ile uyumlu).
 
+import base64
+import json
 import os
 import re
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
-import pandas as pd
 from flask import (
     Flask, render_template, render_template_string, request,
-    redirect, url_for, flash, send_from_directory
+    redirect, url_for, flash, send_from_directory, jsonify
 )
+import click
 from flask_bcrypt import Bcrypt
 from flask_login import (
     LoginManager, login_user, logout_user, login_required, current_user
 )
-from sqlalchemy import func, text
+from sqlalchemy import func, text, tuple_
 from sqlalchemy.orm import joinedload
 
 # --- database.py içe aktarımları ---
 try:
     from database import (
-        db, init_db, Hammadde, Urun, Recete, SatisKaydi, User,
-        guncelle_tum_urun_maliyetleri
+        db, init_db, Hammadde, Urun, Recete, AltRecete, SatisKaydi, User,
+        ReceteDongusuHatasi, guncelle_tum_urun_maliyetleri, surum_artir, KATALOG_SURUMU, replika_okuma,
+        toplu_upsert, satis_ozeti_ekle, satis_ozeti_gun_sil, satis_ozeti_yenile, satis_ozeti_eksik_mi,
+        SATIS_SURUMU, Sube, sube_semasini_guncelle
     )
 except ImportError:
     from database import (
-        db, Hammadde, Urun, Recete, SatisKaydi, User,
-        guncelle_tum_urun_maliyetleri
+        db, Hammadde, Urun, Recete, AltRecete, SatisKaydi, User,
+        ReceteDongusuHatasi, guncelle_tum_urun_maliyetleri, surum_artir, KATALOG_SURUMU, replika_okuma,
+        toplu_upsert, satis_ozeti_ekle, satis_ozeti_gun_sil, satis_ozeti_yenile, satis_ozeti_eksik_mi,
+        SATIS_SURUMU, Sube, sube_semasini_guncelle
     )
 
     def init_db(app):
         """Fallback: db.init_app"""
         db.init_app(app)
 
-
-# --- analiz motorları ---
-from analysis_engine import (
-    hesapla_hedef_marj,
-    simule_et_fiyat_degisikligi,
-    bul_optimum_fiyat,
-    analiz_et_kategori_veya_grup
+# NOT: analysis_engine (pandas/numpy/sklearn) bilerek burada import edilmez -> reports()
+from branch_scope import aktif_sube_id, sube_sec, sube_kapsami, sube_filtresi, urun_kapsami, subeler
+from catalog_cache import katalog
+from catalog_io import KOLONLAR as KATALOG_KOLONLARI, eksik_kolonlar, katalog_farki, katalog_uygula, katalog_satirlari
+import precompute_store
+from bulk_upload import dosyalari_topla, dosya_ayristir, paralel_ayristir, birlestir
+from value_parsing import safe_int, parse_decimal
+from alerts import (
+    KURAL_TIPI, aktif_uyarilar, uyarilari_degerlendir, uyarilari_yenile, uyari_kurulumu_gerekli, uyari_onayla
+)
+from ingredient_usage import TUKETIM_BASLIKLARI, GUNLUK_TUKETIM_BASLIKLARI, tuketim_satirlari
+from sales_timeseries import PERIYOTLAR, METRIKLER, VARSAYILAN_HEDEF, seri_grafigi
+from export_stream import (
+    BICIMLER, SATIS_BASLIKLARI, URUN_OZETI_BASLIKLARI, indirme_yaniti, satis_satirlari, urun_ozeti_satirlari
+)
+from dashboard_stats import (
+    _product_stats_last_days,
+    _branch_stats_last_days,
+    _top_bottom_products_by_margin,
+    _build_insights
 )
+from admission_control import UPLOAD, ANALIZ, EXPORT, init_admission_control, metrikler, sinirla
+from slow_query_log import son_kayitlar
+from sqlite_tuning import sqlite_bakim, sqlite_durumu
+
+bcrypt = Bcrypt()
 
 EMOJI_RX = re.compile(r'[\U0001F300-\U0001FAFF\U00002700-\U000027BF]+', flags=re.UNICODE)
 
@@ -53,27 +79,144 @@ def strip_emojis(text: str) -> str:
     return EMOJI_RX.sub('', text).strip()
 
 
-def parse_decimal(value: str, default=None):
-    """Virgüllü/noktalı ondalıkları güvenle float'a çevirir."""
-    if value is None:
-        return default
-    try:
-        return float(str(value).strip().replace(',', '.'))
-    except (ValueError, TypeError):
-        return default
+FIYAT_SOKU_RX = re.compile(
+    r'^\s*(?P<isim>.+?)\s*[=:]\s*(?P<deger>[+-]?\d+(?:[.,]\d+)?)\s*(?P<yuzde>%)?\s*$'
+)
 
 
-def safe_int(value, default=None):
+def parse_fiyat_soku(metin: str) -> dict:
+    """
+    Satır başına bir hammadde: 'Kıyma = +12%' (yüzde) veya 'Kıyma = 480' (yeni birim fiyat).
+    Dönüş: {isim: ('yuzde' | 'fiyat', değer)}; anlaşılamayan satırda ValueError.
+    """
+    sonuc = {}
+    for no, satir in enumerate((metin or '').splitlines(), start=1):
+        if not satir.strip():
+            continue
+        m = FIYAT_SOKU_RX.match(satir)
+        if not m:
+            raise ValueError(f"{no}. satır anlaşılamadı: '{satir.strip()}' (örn: Kıyma = +12%)")
+        deger = parse_decimal(m.group('deger'))
+        if m.group('yuzde'):
+            sonuc[m.group('isim')] = ('yuzde', deger)
+        elif deger is None or deger <= 0:
+            raise ValueError(f"{no}. satır: yeni fiyat pozitif olmalı.")
+        else:
+            sonuc[m.group('isim')] = ('fiyat', deger)
+    return sonuc
+
+
+def parse_yuzde_listesi(metin: str) -> list[float]:
+    """
+    Fiyat taraması adayları: '-10, -5, 0, +5, +10' (yüzde; '%' işareti opsiyonel).
+    Ayırıcı virgül / boşluk / noktalı virgül; ondalık için nokta kullanılır.
+    """
+    sonuc = []
+    for parca in re.split(r'[;,\s]+', (metin or '').strip()):
+        if not parca:
+            continue
+        deger = parse_decimal(parca.rstrip('%'))
+        if deger is None:
+            raise ValueError(f"Aday anlaşılamadı: '{parca}' (örn: -10, -5, 0, +5, +10)")
+        if deger <= -100:
+            raise ValueError(f"Aday %{deger:g} fiyatı sıfırın altına indirir.")
+        sonuc.append(deger)
+    return sonuc
+
+
+# Dışa aktarım / grafik için en uzun tarih aralığı (~10 yıl)
+MAKS_TARIH_ARALIGI_GUN = 3660
+
+
+def tarih_araligi(baslangic: str | None, bitis: str | None, maks_gun: int = MAKS_TARIH_ARALIGI_GUN):
+    """
+    'YYYY-AA-GG' başlangıç / bitiş (boş olabilir) -> (date | None, date | None); bitiş dahildir.
+    Sadece başlangıç verilirse aralık bugüne kadar sayılır. Geçersizse ValueError (mesaj kullanıcıya gösterilir).
+    """
     try:
-        return int(value)
+        baslangic = datetime.strptime(baslangic, '%Y-%m-%d').date() if baslangic else None
+        bitis = datetime.strptime(bitis, '%Y-%m-%d').date() if bitis else None
+    except ValueError:
+        raise ValueError('Geçersiz tarih formatı.')
+    # Sorgular bitiş + 1 gün ile sınırlar
+    if bitis and bitis >= date.max:
+        raise ValueError('Geçersiz bitiş tarihi.')
+    if baslangic and bitis and baslangic > bitis:
+        raise ValueError('Başlangıç tarihi bitişten sonra olamaz.')
+    if baslangic and ((bitis or date.today()) - baslangic).days >= maks_gun:
+        raise ValueError(f'Tarih aralığı en fazla {maks_gun} gün olabilir.')
+    return baslangic, bitis
+
+
+def islem_subesi(form_degeri=None) -> int | None:
+    """
+    Satış yükleme / silme gibi yazma işlemlerinin şubesi:
+    formda seçilen > oturumdaki aktif şube > tek şube varsa o. Belirsizse None (kullanıcı seçmeli).
+    """
+    sube_id = safe_int(form_degeri) or aktif_sube_id()
+    if sube_id is not None:
+        return sube_id if db.session.get(Sube, sube_id) else None
+    ids = db.session.scalars(db.select(Sube.id).limit(2)).all()
+    return ids[0] if len(ids) == 1 else None
+
+
+def encode_cursor(values) -> str:
+    """Keyset imlecini URL'de taşınabilir hale getirir."""
+    raw = json.dumps(list(values), ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str | None):
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw.decode('utf-8'))
+        return tuple(values) if isinstance(values, list) else None
     except (ValueError, TypeError):
-        return default
+        return None
+
+
+def keyset_page(stmt, key_columns, after=None, before=None, per=25):
+    """
+    OFFSET yerine keyset (seek) sayfalama.
+    key_columns: benzersiz sıralama anahtarı (örn: [Hammadde.isim, Hammadde.id])
+    after:  önceki sayfanın son satırının anahtarı -> sonraki sayfa
+    before: sonraki sayfanın ilk satırının anahtarı -> önceki sayfa
+    Dönüş: (satırlar, ilk_anahtar, son_anahtar, onceki_var, sonraki_var)
+    """
+    per = max(1, min(int(per or 25), 200))
+    key = tuple_(*key_columns)
+
+    if before is not None:
+        rows = db.session.execute(
+            stmt.where(key < tuple_(*before))
+                .order_by(*[c.desc() for c in key_columns])
+                .limit(per + 1)
+        ).all()
+        has_prev = len(rows) > per
+        rows = list(reversed(rows[:per]))
+        has_next = True
+    else:
+        if after is not None:
+            stmt = stmt.where(key > tuple_(*after))
+        rows = db.session.execute(stmt.order_by(*key_columns).limit(per + 1)).all()
+        has_next = len(rows) > per
+        rows = rows[:per]
+        has_prev = after is not None
+
+    n = len(key_columns)
+    first_key = tuple(rows[0][-n:]) if rows else None
+    last_key = tuple(rows[-1][-n:]) if rows else None
+    return rows, first_key, last_key, has_prev, has_next
 
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY', 'DEGISTIRIN:dev-secret-key')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16 MB
     UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', 'static/uploads')
+    # Çok dosyalı yüklemede ayrıştırma süreç sayısı (1: aynı süreçte)
+    UPLOAD_ISCI = int(os.environ.get('UPLOAD_ISCI', min(4, os.cpu_count() or 1)))
 
     SESSION_COOKIE_SECURE = True
     SESSION_COOKIE_HTTPONLY = True
@@ -96,8 +239,10 @@ def create_app():
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
     init_db(app)
+    # Upload / analiz / export için süreç başına eş zamanlılık sınırı
+    init_admission_control(app)
 
-    bcrypt = Bcrypt(app)
+    bcrypt.init_app(app)
     login_manager = LoginManager(app)
     login_manager.login_view = 'login'
     login_manager.login_message = "Bu sayfayı görüntülemek için lütfen giriş yapın."
@@ -107,23 +252,60 @@ def create_app():
     def load_user(user_id):
         return db.session.get(User, int(user_id))
 
-    with app.app_context():
-        db.create_all()
-        if not User.query.first():
-            admin_user = os.environ.get('ADMIN_USER', 'onur')
-            admin_pass = os.environ.get('ADMIN_PASS', 'RestoranSifrem!2025')
-            try:
-                hashed_password = bcrypt.generate_password_hash(admin_pass).decode('utf-8')
-                db.session.add(User(username=admin_user, password_hash=hashed_password))
-                db.session.commit()
-                print(f"[INIT] Admin oluşturuldu -> kullanıcı: {admin_user}")
-            except Exception as e:
-                db.session.rollback()
-                print(f"[INIT] Admin oluşturulamadı: {e}")
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Tabloları oluşturur ve ilk admin kullanıcısını ekler."""
+        ilk_kurulum(app)
+
+    @app.cli.command('satis-ozeti-yenile')
+    def satis_ozeti_yenile_command():
+        """Günlük satış özetini (talep modeli istatistikleri) satış kayıtlarından baştan kurar."""
+        adet = satis_ozeti_yenile()
+        db.session.commit()
+        print(f"[OZET] {adet} özet satırı yazıldı")
+
+    @app.cli.command('on-hesapla')
+    @click.option('--gunler', default='7,30,90', show_default=True, help='Dashboard pencereleri (gün)')
+    @click.option('--zorla', is_flag=True, help='Veri değişmemiş olsa da yeniden hesapla')
+    @click.option('--optimum/--optimum-yok', default=True, show_default=True, help='Ürün başına optimum fiyat')
+    def on_hesapla_command(gunler, zorla, optimum):
+        """Dashboard istatistikleri, öneriler ve optimum fiyatları önceden hesaplar (cron için)."""
+        try:
+            pencereler = sorted({int(g) for g in gunler.split(',') if g.strip()})
+        except ValueError:
+            raise click.BadParameter("Örn: --gunler 7,30,90", param_hint='--gunler')
+
+        t0 = datetime.now()
+        print(f"[ON-HESAP] imza={precompute_store.guncel_imza()}")
+        for asama in precompute_store.on_hesapla(pencereler, zorla=zorla, optimum=optimum):
+            print(f"[ON-HESAP] {asama}")
+        print(f"[ON-HESAP] toplam {(datetime.now() - t0).total_seconds() * 1000.0:.1f} ms")
+
+    @app.cli.command('uyarilari-yenile')
+    def uyarilari_yenile_command():
+        """Tüm ürünlerin marj uyarılarını yeniden değerlendirir (kayan pencere için gece cron)."""
+        sayac = uyarilari_yenile()
+        db.session.commit()
+        print(f"[UYARI] açılan={sayac['acilan']} güncellenen={sayac['guncellenen']} çözülen={sayac['cozulen']}")
+
+    @app.cli.command('sqlite-bakim')
+    def sqlite_bakim_command():
+        """SQLite: ANALYZE + PRAGMA optimize + WAL checkpoint."""
+        for ad, engine in db.engines.items():
+            if engine.dialect.name != 'sqlite':
+                print(f"[BAKIM] {ad or 'default'}: SQLite değil, atlandı")
+                continue
+            sonuc = sqlite_bakim(engine)
+            print(f"[BAKIM] {ad or 'default'}: {sonuc['sure_ms']} ms, checkpoint={sonuc['checkpoint']}")
 
     @app.context_processor
     def inject_globals():
-        return dict(current_user=current_user, site_name="RestoProfit")
+        # Navbar şube seçicisi (tek şubede gizlenir)
+        sube_listesi = subeler() if current_user.is_authenticated else []
+        return dict(
+            current_user=current_user, site_name="RestoProfit",
+            sube_listesi=sube_listesi, aktif_sube_id=aktif_sube_id()
+        )
 
     @app.after_request
     def set_security_headers(resp):
@@ -255,111 +437,6 @@ def create_app():
 
         return render_template('change_password.html', title='Şifre Değiştir')
 
-    # -------------------------
-    # DASHBOARD HELPERS
-    # -------------------------
-    def _product_stats_last_days(days: int = 30):
-        """
-        Son X gün satışlarına göre ürün bazında:
-        - toplam ciro, toplam kâr, toplam adet
-        - marj % = (toplam_kâr / toplam_ciro) * 100
-        """
-        days = max(1, min(int(days or 30), 3650))
-        since_dt = datetime.now() - timedelta(days=days)
-
-        rows = (
-            db.session.query(
-                Urun.id.label("urun_id"),
-                Urun.isim.label("urun_adi"),
-                func.coalesce(func.sum(SatisKaydi.toplam_tutar), 0.0).label("ciro"),
-                func.coalesce(func.sum(SatisKaydi.hesaplanan_kar), 0.0).label("kar"),
-                func.coalesce(func.sum(SatisKaydi.adet), 0).label("adet"),
-                func.coalesce(func.max(Urun.hesaplanan_maliyet), 0.0).label("urun_maliyet"),
-            )
-            .join(SatisKaydi, SatisKaydi.urun_id == Urun.id)
-            .filter(SatisKaydi.tarih >= since_dt)
-            .group_by(Urun.id, Urun.isim)
-            .having(func.sum(SatisKaydi.toplam_tutar) > 0)
-            .all()
-        )
-
-        out = []
-        for r in rows:
-            ciro = float(r.ciro or 0.0)
-            kar = float(r.kar or 0.0)
-            adet = int(r.adet or 0)
-            marj = (kar / ciro * 100.0) if ciro > 0 else 0.0
-            out.append({
-                "urun_id": int(r.urun_id),
-                "urun_adi": r.urun_adi,
-                "ciro": ciro,
-                "kar": kar,
-                "adet": adet,
-                "marj": float(marj),
-                "urun_maliyet": float(r.urun_maliyet or 0.0),
-            })
-        return out
-
-    def _top_bottom_products_by_margin(stats, limit: int = 3):
-        """
-        Hazır stats listesinden en iyi/en kötü ürünleri seçer.
-        Sıralama: marj, sonra kar
-        """
-        limit = max(1, min(int(limit or 3), 20))
-        best = sorted(stats, key=lambda x: (x["marj"], x["kar"]), reverse=True)[:limit]
-        worst = sorted(stats, key=lambda x: (x["marj"], x["kar"]))[:limit]
-        return best, worst
-
-    def _build_insights(stats, days_window: int):
-        """
-        Dashboard için 3-4 adet kısa aksiyon önerisi üretir.
-        """
-        insights = []
-        if not stats:
-            return [{
-                "type": "info",
-                "text": f"Son {days_window} günde satış verisi yok. Excel yüklediğinde burada öneriler çıkacak."
-            }]
-
-        # 1) Zarar yazan ürün
-        neg = sorted([x for x in stats if x["kar"] < 0], key=lambda x: x["kar"])
-        if neg:
-            x = neg[0]
-            insights.append({
-                "type": "danger",
-                "text": f"❗ {x['urun_adi']} son {days_window} günde zarar yazıyor (Kâr: {x['kar']:.2f} TL). Fiyat veya reçete kontrolü yap."
-            })
-
-        # 2) Düşük marj ama yüksek adet (sessiz kayıp)
-        low_margin = [x for x in stats if x["marj"] < 25 and x["adet"] >= 10]
-        low_margin = sorted(low_margin, key=lambda x: (x["marj"], -x["adet"]))
-        if low_margin:
-            x = low_margin[0]
-            insights.append({
-                "type": "warning",
-                "text": f"⚠️ {x['urun_adi']} çok satıyor ama marj düşük (%{x['marj']:.1f}). Küçük bir fiyat artışı ciddi fark yaratabilir."
-            })
-
-        # 3) En çok kâr getiren ürün
-        top_profit = sorted(stats, key=lambda x: x["kar"], reverse=True)
-        if top_profit and top_profit[0]["kar"] > 0:
-            x = top_profit[0]
-            insights.append({
-                "type": "success",
-                "text": f"✅ {x['urun_adi']} son {days_window} günde en çok kâr getiren ürün (Kâr: {x['kar']:.2f} TL, Marj: %{x['marj']:.1f}). Öne çıkar / stok planla."
-            })
-
-        # 4) Maliyeti 0 görünüp satılan ürün (reçete eksik olabilir)
-        missing_cost = [x for x in stats if (x.get("urun_maliyet", 0.0) <= 0.0)]
-        if missing_cost:
-            x = missing_cost[0]
-            insights.append({
-                "type": "info",
-                "text": f"ℹ️ Satılan bazı ürünlerin maliyeti 0 görünüyor. Reçete/maliyet güncellemesi yap (ör: {x['urun_adi']})."
-            })
-
-        return insights[:4]
-
     # -------------------------
     # DASHBOARD
     # -------------------------
@@ -374,8 +451,9 @@ def create_app():
         days_window = max(1, min(days_window, 3650))
 
         try:
-            toplam_satis_kaydi = db.session.query(SatisKaydi).count()
-            toplam_urun = db.session.query(Urun).count()
+            with replika_okuma():
+                toplam_satis_kaydi = sube_filtresi(db.session.query(SatisKaydi), SatisKaydi.sube_id).count()
+                toplam_urun = urun_kapsami(db.session.query(Urun)).count()
             summary = {'toplam_satis_kaydi': toplam_satis_kaydi, 'toplam_urun': toplam_urun}
         except Exception as e:
             summary = {'toplam_satis_kaydi': 0, 'toplam_urun': 0}
@@ -383,13 +461,34 @@ def create_app():
 
         best_products, worst_products, insights = [], [], []
         try:
-            stats = _product_stats_last_days(days_window)
+            # Pencere `flask on-hesapla --gunler` ile hazırlanmış olabilir (imza güncelse); yoksa canlı
+            imza = precompute_store.guncel_imza()
+            stats = precompute_store.oku(precompute_store.istatistik_anahtari(days_window), imza)
+            insights = precompute_store.oku(precompute_store.oneri_anahtari(days_window), imza)
+            if stats is None:
+                stats = _product_stats_last_days(days_window)
             best_products, worst_products = _top_bottom_products_by_margin(stats, limit=3)
-            insights = _build_insights(stats, days_window)
+            if insights is None:
+                insights = _build_insights(stats, days_window)
         except Exception as e:
             best_products, worst_products, insights = [], [], []
             flash(f"Dashboard ürün analizi hesaplanamadı: {e}", "warning")
 
+        # Merkez görünümü: şubelerin yan yana özeti
+        sube_ozeti = []
+        if aktif_sube_id() is None and len(subeler()) > 1:
+            try:
+                sube_ozeti = _branch_stats_last_days(days_window)
+            except Exception as e:
+                flash(f"Şube özeti hesaplanamadı: {e}", "warning")
+
+        # Uyarılar yükleme / maliyet değişikliğinde yazılır; burada sadece okunur
+        try:
+            uyarilar = aktif_uyarilar()
+        except Exception as e:
+            uyarilar = []
+            flash(f"Uyarılar okunamadı: {e}", "warning")
+
         return render_template(
             'dashboard.html',
             title='Ana Ekran',
@@ -397,9 +496,59 @@ def create_app():
             best_products=best_products,
             worst_products=worst_products,
             insights=insights,
-            days_window=days_window
+            sube_ozeti=sube_ozeti,
+            uyarilar=uyarilar,
+            kural_tipi=KURAL_TIPI,
+            days_window=days_window,
+            katalog_ref=katalog()
         )
 
+    @app.route('/alerts/<int:uyari_id>/ack', methods=['POST'])
+    @login_required
+    def acknowledge_alert(uyari_id):
+        try:
+            if uyari_onayla(uyari_id):
+                db.session.commit()
+            else:
+                flash('Uyarı bulunamadı veya zaten görüldü.', 'warning')
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Uyarı güncellenemedi: {e}', 'danger')
+        return redirect(url_for('dashboard', days=request.form.get('days') or None))
+
+    @app.route('/select-branch', methods=['POST'])
+    @login_required
+    def select_branch():
+        sube_id = safe_int(request.form.get('sube_id'))
+        if sube_id is not None and not db.session.get(Sube, sube_id):
+            flash('Şube bulunamadı.', 'danger')
+        else:
+            sube_sec(sube_id)
+        hedef = request.form.get('next') or ''
+        # Sadece site içi yönlendirme
+        if not hedef.startswith('/') or hedef.startswith('//'):
+            hedef = url_for('dashboard')
+        return redirect(hedef)
+
+    @app.route('/add-branch', methods=['POST'])
+    @login_required
+    def add_branch():
+        isim = (request.form.get('s_isim') or '').strip()
+        if not isim:
+            flash("Şube adı girin.", 'danger')
+            return redirect(url_for('admin_panel'))
+        try:
+            db.session.add(Sube(isim=isim))
+            db.session.commit()
+            flash(f"'{isim}' şubesi eklendi.", 'success')
+        except Exception as e:
+            db.session.rollback()
+            if 'UNIQUE' in str(e).upper():
+                flash(f"'{isim}' şubesi zaten mevcut.", 'danger')
+            else:
+                flash(f"Şube eklenemedi: {e}", 'danger')
+        return redirect(url_for('admin_panel'))
+
     # Menü Yönetimi alias
     @app.route('/menu-yonetimi')
     @login_required
@@ -409,6 +558,7 @@ def create_app():
     # Excel yükleme
     @app.route('/upload-excel', methods=['POST'])
     @login_required
+    @sinirla(UPLOAD)
     def upload_excel():
         file = request.files.get('excel_file')
         if not file or file.filename == '':
@@ -419,66 +569,53 @@ def create_app():
             flash('Desteklenmeyen dosya türü. Lütfen .xlsx / .xls yükleyin.', 'danger')
             return redirect(url_for('dashboard'))
 
-        try:
-            df = pd.read_excel(file)
-            required_columns = ['Urun_Adi', 'Adet', 'Toplam_Tutar', 'Tarih']
-            missing = [c for c in required_columns if c not in df.columns]
-            if missing:
-                raise ValueError(f"Excel'de eksik kolon(lar): {', '.join(missing)}")
+        sube_id = islem_subesi(request.form.get('sube_id'))
+        if sube_id is None:
+            flash('Satışların yükleneceği şubeyi seçin.', 'danger')
+            return redirect(url_for('dashboard'))
 
-            urunler_db = Urun.query.all()
+        try:
+            # Eşleştirme şubenin menüsüyle (ortak + şubeye özel ürünler)
+            with sube_kapsami(sube_id):
+                urunler_db = katalog().urunler
             urun_eslestirme = {u.excel_adi: u.id for u in urunler_db}
             urun_maliyet = {u.id: (u.hesaplanan_maliyet or 0.0) for u in urunler_db}
 
+            # Satır kuralları toplu yüklemeyle ortak (bulk_upload.dosya_ayristir), burada aynı süreçte
+            sonuc = dosya_ayristir(file.filename, file.read(), urun_eslestirme)
+            if sonuc.hata:
+                raise ValueError(sonuc.hata)
+
             yeni_kayitlar = []
-            taninmayan = set()
-            hatali_satirlar = []
-
-            for idx, row in df.iterrows():
-                try:
-                    excel_adi = str(row['Urun_Adi']).strip()
-                    adet = safe_int(row['Adet'])
-                    toplam_tutar = parse_decimal(row['Toplam_Tutar'])
-                    tarih = pd.to_datetime(row['Tarih'], errors='coerce')
-
-                    if excel_adi == '' or adet is None or adet <= 0 or toplam_tutar is None or toplam_tutar < 0 or pd.isna(tarih):
-                        hatali_satirlar.append(idx + 2)
-                        continue
-
-                    urun_id = urun_eslestirme.get(excel_adi)
-                    if not urun_id:
-                        taninmayan.add(excel_adi)
-                        continue
-
-                    maliyet = urun_maliyet.get(urun_id, 0.0)
-                    hesaplanan_toplam_maliyet = maliyet * adet
-                    hesaplanan_kar = toplam_tutar - hesaplanan_toplam_maliyet
-                    hesaplanan_birim_fiyat = (toplam_tutar / adet) if adet else 0.0
-
-                    yeni_kayitlar.append(SatisKaydi(
-                        urun_id=urun_id,
-                        tarih=tarih,
-                        adet=adet,
-                        toplam_tutar=toplam_tutar,
-                        hesaplanan_birim_fiyat=hesaplanan_birim_fiyat,
-                        hesaplanan_maliyet=hesaplanan_toplam_maliyet,
-                        hesaplanan_kar=hesaplanan_kar
-                    ))
-                except Exception:
-                    hatali_satirlar.append(idx + 2)
-                    continue
+            for urun_id, tarih, adet, toplam_tutar in sonuc.kayitlar:
+                hesaplanan_toplam_maliyet = urun_maliyet.get(urun_id, 0.0) * adet
+                yeni_kayitlar.append(SatisKaydi(
+                    sube_id=sube_id,
+                    urun_id=urun_id,
+                    tarih=tarih,
+                    adet=adet,
+                    toplam_tutar=toplam_tutar,
+                    hesaplanan_birim_fiyat=toplam_tutar / adet,
+                    hesaplanan_maliyet=hesaplanan_toplam_maliyet,
+                    hesaplanan_kar=toplam_tutar - hesaplanan_toplam_maliyet
+                ))
 
             if yeni_kayitlar:
                 db.session.add_all(yeni_kayitlar)
+                # Talep modeli özeti aynı transaction'da artar
+                satis_ozeti_ekle(yeni_kayitlar)
+                # Sadece dokunulan ürünlerin uyarıları yeniden değerlendirilir
+                uyarilari_degerlendir({k.urun_id for k in yeni_kayitlar}, sube_id)
+                surum_artir(SATIS_SURUMU)
                 db.session.commit()
                 flash(f'Başarılı! {len(yeni_kayitlar)} satış kaydı işlendi.', 'success')
             else:
                 flash('İşlenecek geçerli satış kaydı bulunamadı.', 'warning')
 
-            if taninmayan:
-                flash("Bulunamayan ürün(ler): " + ", ".join(sorted(taninmayan)), 'warning')
-            if hatali_satirlar:
-                flash("Atlanan satırlar: " + ", ".join(map(str, sorted(set(hatali_satirlar)))), 'warning')
+            if sonuc.taninmayan:
+                flash("Bulunamayan ürün(ler): " + ", ".join(sorted(sonuc.taninmayan)), 'warning')
+            if sonuc.hatali_satirlar:
+                flash("Atlanan satırlar: " + ", ".join(map(str, sorted(set(sonuc.hatali_satirlar)))), 'warning')
 
         except ValueError as ve:
             flash(f"Giriş hatası: {ve}", 'danger')
@@ -488,61 +625,237 @@ def create_app():
 
         return redirect(url_for('dashboard'))
 
+    # Çok dosyalı / ZIP yükleme (kasa başına günlük dosyalar)
+    @app.route('/upload-excel-batch', methods=['POST'])
+    @login_required
+    @sinirla(UPLOAD)
+    def upload_excel_batch():
+        yuklenenler = [f for f in request.files.getlist('excel_files') if f and f.filename]
+        if not yuklenenler:
+            flash('Dosya seçilmedi.', 'danger')
+            return redirect(url_for('dashboard'))
+
+        sube_id = islem_subesi(request.form.get('sube_id'))
+        if sube_id is None:
+            flash('Satışların yükleneceği şubeyi seçin.', 'danger')
+            return redirect(url_for('dashboard'))
+
+        dosyalar, reddedilen = dosyalari_topla(yuklenenler)
+        if not dosyalar:
+            for s in reddedilen:
+                flash(f"{s.ad}: {s.hata}", 'danger')
+            if not reddedilen:
+                flash('Yüklenen dosyalarda Excel bulunamadı.', 'warning')
+            return redirect(url_for('dashboard'))
+
+        with sube_kapsami(sube_id):
+            urunler_db = katalog().urunler
+        urun_eslestirme = {u.excel_adi: u.id for u in urunler_db}
+        urun_maliyet = {u.id: (u.hesaplanan_maliyet or 0.0) for u in urunler_db}
+
+        try:
+            sonuclar = paralel_ayristir(dosyalar, urun_eslestirme, app.config['UPLOAD_ISCI'])
+            kayitlar = birlestir(dosyalar, sonuclar)
+
+            if kayitlar:
+                satirlar = []
+                for urun_id, tarih, adet, toplam_tutar in kayitlar:
+                    maliyet = urun_maliyet.get(urun_id, 0.0) * adet
+                    satirlar.append(dict(
+                        sube_id=sube_id,
+                        urun_id=urun_id,
+                        tarih=tarih,
+                        adet=adet,
+                        toplam_tutar=toplam_tutar,
+                        hesaplanan_birim_fiyat=toplam_tutar / adet,
+                        hesaplanan_maliyet=maliyet,
+                        hesaplanan_kar=toplam_tutar - maliyet,
+                    ))
+                # Tüm dosyalar tek transaction: biri yazılamazsa hiçbiri yazılmaz
+                db.session.execute(db.insert(SatisKaydi), satirlar)
+                satis_ozeti_ekle(
+                    (r['sube_id'], r['urun_id'], r['tarih'], r['adet'], r['hesaplanan_birim_fiyat']) for r in satirlar
+                )
+                uyarilari_degerlendir({r['urun_id'] for r in satirlar}, sube_id)
+                surum_artir(SATIS_SURUMU)
+                db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            flash(f"Beklenmedik hata: {e}. Hiçbir dosya kaydedilmedi.", 'danger')
+            return redirect(url_for('dashboard'))
+
+        sonuclar += reddedilen
+        ozet = {
+            'dosya': len(sonuclar),
+            'kabul': sum(s.kabul for s in sonuclar),
+            'tekrar': sum(s.tekrar for s in sonuclar),
+            'taninmayan': sorted(set().union(*[s.taninmayan for s in sonuclar])),
+            'hatali': sum(len(s.hatali_satirlar) for s in sonuclar),
+            'hatali_dosya': sum(1 for s in sonuclar if s.hata),
+        }
+        return render_template(
+            'upload_report.html',
+            title='Yükleme Raporu',
+            sonuclar=sonuclar,
+            ozet=ozet,
+            sube=db.session.get(Sube, sube_id),
+        )
+
     # -------------------------
     # ADMIN PANEL
     # -------------------------
     @app.route('/admin')
     @login_required
     def admin_panel():
-        page = request.args.get('page', default=1, type=int)
         per = request.args.get('per', default=25, type=int)
+        tab = request.args.get('tab', 'mats')
+
+        def liste(prefix, stmt, key_columns, arama_kolonlari):
+            """Tek bir admin listesi için arama + keyset sayfa."""
+            q = (request.args.get(f'{prefix}_q') or '').strip()
+            if q:
+                stmt = stmt.where(db.or_(*[c.icontains(q, autoescape=True) for c in arama_kolonlari]))
+            rows, first_key, last_key, has_prev, has_next = keyset_page(
+                stmt.add_columns(*key_columns), key_columns,
+                after=decode_cursor(request.args.get(f'{prefix}_after')),
+                before=decode_cursor(request.args.get(f'{prefix}_before')),
+                per=per
+            )
+            return [r[0] for r in rows], {
+                'q': q,
+                'prev': encode_cursor(first_key) if has_prev and first_key else None,
+                'next': encode_cursor(last_key) if has_next and last_key else None,
+            }
+
+        def sayfa_url(prefix, **degisen):
+            """Bir listenin sayfasını değiştirirken diğer listelerin durumunu korur."""
+            args = request.args.to_dict()
+            args.pop(f'{prefix}_after', None)
+            args.pop(f'{prefix}_before', None)
+            args.update(degisen)
+            return url_for('admin_panel', **{k: v for k, v in args.items() if v not in (None, '')})
 
         try:
-            hammaddeler = db.session.scalars(
-                db.select(Hammadde).order_by(Hammadde.isim)
-            ).all()
+            sayilar = {
+                'hammadde': db.session.scalar(db.select(func.count()).select_from(Hammadde)),
+                'urun': db.session.scalar(urun_kapsami(db.select(func.count()).select_from(Urun))),
+                'recete': db.session.scalar(db.select(func.count()).select_from(Recete)),
+                'alt_recete': db.session.scalar(db.select(func.count()).select_from(AltRecete)),
+            }
+
+            hammaddeler, hammadde_sayfa = liste(
+                'm', db.select(Hammadde), [Hammadde.isim, Hammadde.id], [Hammadde.isim]
+            )
 
-            urunler = db.session.scalars(
-                db.select(Urun).order_by(Urun.isim)
-            ).all()
+            urunler, urun_sayfa = liste(
+                'p', urun_kapsami(db.select(Urun).options(joinedload(Urun.sube))), [Urun.isim, Urun.id],
+                [Urun.isim, Urun.excel_adi, Urun.kategori, Urun.kategori_grubu]
+            )
 
             recete_stmt = (
                 db.select(Recete)
                   .options(joinedload(Recete.urun), joinedload(Recete.hammadde))
                   .join(Urun, Urun.id == Recete.urun_id)
                   .join(Hammadde, Hammadde.id == Recete.hammadde_id)
-                  .order_by(Urun.isim, Hammadde.isim)
             )
-
-            recete_pagination = db.paginate(
-                recete_stmt,
-                page=page,
-                per_page=per,
-                error_out=False
+            receteler, recete_sayfa = liste(
+                'r', recete_stmt, [Urun.isim, Hammadde.isim, Recete.id], [Urun.isim, Hammadde.isim]
             )
-            receteler = recete_pagination.items
+
+            # Alt reçeteler (ara ürün bağlantıları) az sayıdadır: tek liste
+            ust = db.aliased(Urun)
+            alt_receteler = db.session.scalars(
+                db.select(AltRecete)
+                  .options(joinedload(AltRecete.urun), joinedload(AltRecete.alt_urun))
+                  .join(ust, ust.id == AltRecete.urun_id)
+                  .order_by(ust.isim, AltRecete.id)
+            ).all()
 
             return render_template(
                 'admin.html',
                 title='Menü Yönetimi',
+                tab=tab,
+                per=per,
+                sayilar=sayilar,
                 hammaddeler=hammaddeler,
                 urunler=urunler,
                 receteler=receteler,
-                recete_pagination=recete_pagination
+                alt_receteler=alt_receteler,
+                hammadde_sayfa=hammadde_sayfa,
+                urun_sayfa=urun_sayfa,
+                recete_sayfa=recete_sayfa,
+                sayfa_url=sayfa_url
             )
 
         except Exception as e:
             db.session.rollback()
             flash(f"Menü Yönetimi yüklenirken hata: {e}", "danger")
+            bos = {'q': '', 'prev': None, 'next': None}
             return render_template(
                 'admin.html',
                 title='Menü Yönetimi',
+                tab=tab,
+                per=per,
+                sayilar={'hammadde': 0, 'urun': 0, 'recete': 0, 'alt_recete': 0},
                 hammaddeler=[],
                 urunler=[],
                 receteler=[],
-                recete_pagination=None
+                alt_receteler=[],
+                hammadde_sayfa=bos,
+                urun_sayfa=bos,
+                recete_sayfa=bos,
+                sayfa_url=sayfa_url
             )
 
+    @app.route('/api/materials')
+    @login_required
+    def api_materials():
+        """Tarif modalı için hammadde type-ahead araması."""
+        q = (request.args.get('q') or '').strip()
+        limit = max(1, min(request.args.get('limit', default=20, type=int), 50))
+        stmt = db.select(Hammadde.id, Hammadde.isim, Hammadde.maliyet_birimi)
+        if q:
+            stmt = stmt.where(Hammadde.isim.icontains(q, autoescape=True))
+        rows = db.session.execute(stmt.order_by(Hammadde.isim).limit(limit)).all()
+        return jsonify(items=[{'id': r.id, 'isim': r.isim, 'birim': r.maliyet_birimi} for r in rows])
+
+    @app.route('/api/products')
+    @login_required
+    def api_products():
+        """Tarif modalı için ürün type-ahead araması."""
+        q = (request.args.get('q') or '').strip()
+        limit = max(1, min(request.args.get('limit', default=20, type=int), 50))
+        stmt = urun_kapsami(db.select(Urun.id, Urun.isim))
+        if q:
+            stmt = stmt.where(Urun.isim.icontains(q, autoescape=True))
+        rows = db.session.execute(stmt.order_by(Urun.isim).limit(limit)).all()
+        return jsonify(items=[{'id': r.id, 'isim': r.isim} for r in rows])
+
+    @app.route('/api/sales-series')
+    @login_required
+    @sinirla(ANALIZ)
+    def api_sales_series():
+        """Ciro / kâr zaman serisi grafiği (LTTB ile hedef nokta sayısına indirilmiş)."""
+        periyot = request.args.get('periyot', 'gun')
+        metrik = request.args.get('metrik', 'ciro')
+        if periyot not in PERIYOTLAR or metrik not in METRIKLER:
+            return jsonify(hata='Geçersiz periyot veya metrik.'), 400
+        # Aralık sınırlı: satışsız dönemler 0 ile doldurulur, döngü aralık uzunluğu kadar döner
+        try:
+            baslangic, bitis = tarih_araligi(request.args.get('baslangic'), request.args.get('bitis'))
+        except ValueError as e:
+            return jsonify(hata=str(e)), 400
+
+        return jsonify(seri_grafigi(
+            periyot,
+            hedef=request.args.get('hedef', default=VARSAYILAN_HEDEF, type=int),
+            metrik=metrik,
+            baslangic=baslangic, bitis=bitis,
+            urun_ismi=(request.args.get('urun') or '').strip() or None,
+            kategori=(request.args.get('kategori') or '').strip() or None,
+            grup=(request.args.get('grup') or '').strip() or None,
+        ))
+
     @app.route('/add-material', methods=['POST'])
     @login_required
     def add_material():
@@ -600,7 +913,7 @@ def create_app():
             h.maliyet_birimi = birim
             h.maliyet_fiyati = fiyat
             db.session.commit()
-            guncelle_tum_urun_maliyetleri()
+            guncelle_tum_urun_maliyetleri(hammadde_ids=[h.id])
             flash(f"'{h.isim}' güncellendi.", 'success')
         except Exception as e:
             db.session.rollback()
@@ -639,6 +952,7 @@ def create_app():
         fiyat = parse_decimal(request.form.get('u_fiyat'))
         kategori = (request.form.get('u_kategori') or '').strip()
         grup = (request.form.get('u_grup') or '').strip()
+        sube_id = safe_int(request.form.get('u_sube_id'))  # boş: ortak menü
 
         if not all([isim, excel_adi, fiyat is not None, kategori, grup]):
             flash("Tüm ürün alanlarını doldurun.", 'danger')
@@ -646,13 +960,17 @@ def create_app():
         if fiyat <= 0:
             flash("Ürün fiyatı pozitif olmalıdır.", 'danger')
             return redirect(url_for('admin_panel'))
+        if sube_id is not None and not db.session.get(Sube, sube_id):
+            flash('Şube bulunamadı.', 'danger')
+            return redirect(url_for('admin_panel'))
 
         try:
             urun = Urun(
                 isim=isim, excel_adi=excel_adi, mevcut_satis_fiyati=fiyat,
-                kategori=kategori, kategori_grubu=grup, hesaplanan_maliyet=0.0
+                kategori=kategori, kategori_grubu=grup, hesaplanan_maliyet=0.0, sube_id=sube_id
             )
             db.session.add(urun)
+            surum_artir(KATALOG_SURUMU)
             db.session.commit()
             flash(f"'{isim}' eklendi. Şimdi reçetesini oluşturun.", 'success')
         except Exception as e:
@@ -676,6 +994,7 @@ def create_app():
         fiyat = parse_decimal(request.form.get('fiyat'))
         kategori = (request.form.get('kategori') or '').strip()
         grup = (request.form.get('grup') or '').strip()
+        sube_id = safe_int(request.form.get('sube_id'))
 
         if not all([isim, excel_adi, fiyat is not None, kategori, grup]):
             flash("Tüm ürün alanlarını doldurun.", 'danger')
@@ -683,6 +1002,9 @@ def create_app():
         if fiyat <= 0:
             flash("Ürün fiyatı pozitif olmalıdır.", 'danger')
             return redirect(url_for('admin_panel'))
+        if sube_id is not None and not db.session.get(Sube, sube_id):
+            flash('Şube bulunamadı.', 'danger')
+            return redirect(url_for('admin_panel'))
 
         try:
             exists_name = db.session.scalar(
@@ -704,6 +1026,8 @@ def create_app():
             urun.mevcut_satis_fiyati = fiyat
             urun.kategori = kategori
             urun.kategori_grubu = grup
+            urun.sube_id = sube_id
+            surum_artir(KATALOG_SURUMU)
             db.session.commit()
             guncelle_tum_urun_maliyetleri()
             flash(f"'{urun.isim}' güncellendi.", 'success')
@@ -721,7 +1045,15 @@ def create_app():
             return redirect(url_for('admin_panel'))
 
         try:
+            kullanan = db.session.scalar(
+                db.select(AltRecete).where(AltRecete.alt_urun_id == id).limit(1)
+            )
+            if kullanan:
+                flash(f"'{urun.isim}' başka bir ürünün alt reçetesi olduğu için silinemez. Önce ilgili alt reçeteleri kaldırın.", 'danger')
+                return redirect(url_for('admin_panel'))
+
             db.session.delete(urun)
+            surum_artir(KATALOG_SURUMU)
             db.session.commit()
             flash(f"'{urun.isim}' silindi.", 'success')
         except Exception as e:
@@ -729,7 +1061,85 @@ def create_app():
             flash(f"Silme hatası: {e}", 'danger')
         return redirect(url_for('admin_panel'))
 
+    # Toplu katalog: hammadde / ürün listesi yükle (fark + upsert) ve indir (CSV)
+    @app.route('/upload-catalog', methods=['POST'])
+    @login_required
+    @sinirla(UPLOAD)
+    def upload_catalog():
+        tur = request.form.get('tur')
+        sekme = 'products' if tur == 'urun' else 'mats'
+        if tur not in KATALOG_KOLONLARI:
+            flash('Geçersiz katalog türü.', 'danger')
+            return redirect(url_for('admin_panel'))
+
+        file = request.files.get('catalog_file')
+        if not file or file.filename == '':
+            flash('Katalog dosyası seçilmedi.', 'danger')
+            return redirect(url_for('admin_panel', tab=sekme))
+
+        dosya_adi = file.filename.lower()
+        if not dosya_adi.endswith(('.xlsx', '.xls', '.csv')):
+            flash('Desteklenmeyen dosya türü. Lütfen .xlsx / .xls / .csv yükleyin.', 'danger')
+            return redirect(url_for('admin_panel', tab=sekme))
+
+        import pandas as pd  # ilk upload'da yüklenir
+
+        try:
+            if dosya_adi.endswith('.csv'):
+                df = pd.read_csv(file, dtype=str, encoding='utf-8-sig')
+            else:
+                df = pd.read_excel(file, dtype=str)
+            missing = eksik_kolonlar(tur, df)
+            if missing:
+                flash(f"Eksik kolon(lar): {', '.join(missing)}", 'danger')
+                return redirect(url_for('admin_panel', tab=sekme))
+
+            fark = katalog_farki(tur, df)
+            if fark.bos:
+                flash(f"Değişiklik yok ({fark.degismeyen} kayıt aynı).", 'info')
+            else:
+                katalog_uygula(fark)
+                db.session.commit()
+                flash(
+                    f"Katalog güncellendi: {len(fark.eklenecek)} yeni, {len(fark.guncellenecek)} güncellenen, "
+                    f"{fark.degismeyen} değişmeyen kayıt.",
+                    'success'
+                )
+
+            if fark.cakismalar:
+                ornek = '; '.join(fark.cakismalar[:10])
+                flash(f"Excel adı çakışan {len(fark.cakismalar)} ürün atlandı: {ornek}", 'warning')
+            if fark.hatali_satirlar:
+                ornek = ', '.join(map(str, fark.hatali_satirlar[:20]))
+                flash(f"Hatalı/tekrarlı {len(fark.hatali_satirlar)} satır atlandı (satır no: {ornek})", 'warning')
+
+        except ReceteDongusuHatasi as e:
+            db.session.rollback()
+            flash(f"Katalog kaydedilmedi. {e}", 'danger')
+        except Exception as e:
+            db.session.rollback()
+            flash(f"Katalog dosyası işlenemedi: {e}", 'danger')
+
+        return redirect(url_for('admin_panel', tab=sekme))
+
+    @app.route('/export-catalog/<tur>')
+    @login_required
+    @sinirla(EXPORT)
+    def export_catalog(tur):
+        if tur not in KATALOG_KOLONLARI:
+            flash('Geçersiz katalog türü.', 'danger')
+            return redirect(url_for('admin_panel'))
+
+        bicim = request.args.get('bicim', 'csv')
+        if bicim not in BICIMLER:
+            bicim = 'csv'
+        return indirme_yaniti(
+            bicim, 'hammaddeler' if tur == 'hammadde' else 'urunler',
+            KATALOG_KOLONLARI[tur][0], katalog_satirlari(tur)
+        )
+
     # ✅ FIX: Çoklu reçete satırı destekli add_recipe
+    # ✅ EK: Alt reçete (ara ürün) satırları: r_alt_urun_id[] / r_alt_miktar[]
     @app.route('/add-recipe', methods=['POST'])
     @login_required
     def add_recipe():
@@ -745,26 +1155,32 @@ def create_app():
             hammadde_ids = [request.form.get('r_hammadde_id')]
             miktarlar = [request.form.get('r_miktar')]
 
-        if not hammadde_ids:
-            flash("En az 1 hammadde satırı eklemelisiniz.", 'danger')
-            return redirect(url_for('admin_panel'))
-
-        normalized: dict[int, float] = {}
-        skipped = 0
+        alt_urun_ids = request.form.getlist('r_alt_urun_id[]')
+        alt_miktarlar = request.form.getlist('r_alt_miktar[]')
 
-        n = min(len(hammadde_ids), len(miktarlar)) if miktarlar else len(hammadde_ids)
-
-        for i in range(n):
-            hid = safe_int(hammadde_ids[i])
-            mikt = parse_decimal(miktarlar[i] if miktarlar else None)
+        if not hammadde_ids and not alt_urun_ids:
+            flash("En az 1 hammadde veya alt reçete satırı eklemelisiniz.", 'danger')
+            return redirect(url_for('admin_panel'))
 
-            if not hid or mikt is None or mikt <= 0:
-                skipped += 1
-                continue
+        def normalize(ids, miktar_listesi):
+            """Aynı id tekrar ederse miktarlar toplanır; geçersiz satırlar atlanır."""
+            sonuc: dict[int, float] = {}
+            atlanan = 0
+            n = min(len(ids), len(miktar_listesi)) if miktar_listesi else len(ids)
+            for i in range(n):
+                kid = safe_int(ids[i])
+                mikt = parse_decimal(miktar_listesi[i] if miktar_listesi else None)
+                if not kid or mikt is None or mikt <= 0:
+                    atlanan += 1
+                    continue
+                sonuc[kid] = float(sonuc.get(kid, 0.0) + float(mikt))
+            return sonuc, atlanan
 
-            normalized[hid] = float(normalized.get(hid, 0.0) + float(mikt))
+        normalized, skipped = normalize(hammadde_ids, miktarlar)
+        alt_normalized, alt_skipped = normalize(alt_urun_ids, alt_miktarlar)
+        skipped += alt_skipped
 
-        if not normalized:
+        if not normalized and not alt_normalized:
             flash("Geçerli bir hammadde/miktar satırı bulunamadı.", 'danger')
             return redirect(url_for('admin_panel'))
 
@@ -778,53 +1194,194 @@ def create_app():
                 db.session.scalars(
                     db.select(Hammadde.id).where(Hammadde.id.in_(list(normalized.keys())))
                 ).all()
-            )
-            if not valid_h_ids:
-                flash("Seçilen hammaddeler bulunamadı.", 'danger')
-                return redirect(url_for('admin_panel'))
+            ) if normalized else set()
 
             missing_ids = [hid for hid in normalized.keys() if hid not in valid_h_ids]
             for hid in missing_ids:
                 normalized.pop(hid, None)
                 skipped += 1
 
-            if not normalized:
+            # Alt ürün: var olmalı ve ürünün kendisi olmamalı
+            alt_normalized.pop(urun_id, None)
+            valid_alt_ids = set(
+                db.session.scalars(
+                    db.select(Urun.id).where(Urun.id.in_(list(alt_normalized.keys())))
+                ).all()
+            ) if alt_normalized else set()
+            for aid in [aid for aid in alt_normalized if aid not in valid_alt_ids]:
+                alt_normalized.pop(aid, None)
+                skipped += 1
+
+            if not normalized and not alt_normalized:
                 flash("Geçerli hammadde kalmadı.", 'danger')
                 return redirect(url_for('admin_panel'))
 
             added = 0
             updated = 0
 
-            existing_rows = db.session.scalars(
-                db.select(Recete).where(
-                    Recete.urun_id == urun_id,
-                    Recete.hammadde_id.in_(list(normalized.keys()))
-                )
-            ).all()
-            existing_map = {r.hammadde_id: r for r in existing_rows}
-
-            for hid, mikt in normalized.items():
-                if hid in existing_map:
-                    existing_map[hid].miktar = float(mikt)
-                    updated += 1
-                else:
-                    db.session.add(Recete(urun_id=urun_id, hammadde_id=hid, miktar=float(mikt)))
-                    added += 1
-
+            if normalized:
+                existing_rows = db.session.scalars(
+                    db.select(Recete).where(
+                        Recete.urun_id == urun_id,
+                        Recete.hammadde_id.in_(list(normalized.keys()))
+                    )
+                ).all()
+                existing_map = {r.hammadde_id: r for r in existing_rows}
+
+                for hid, mikt in normalized.items():
+                    if hid in existing_map:
+                        existing_map[hid].miktar = float(mikt)
+                        updated += 1
+                    else:
+                        db.session.add(Recete(urun_id=urun_id, hammadde_id=hid, miktar=float(mikt)))
+                        added += 1
+
+            if alt_normalized:
+                existing_alt = {
+                    r.alt_urun_id: r for r in db.session.scalars(
+                        db.select(AltRecete).where(
+                            AltRecete.urun_id == urun_id,
+                            AltRecete.alt_urun_id.in_(list(alt_normalized.keys()))
+                        )
+                    ).all()
+                }
+                for aid, mikt in alt_normalized.items():
+                    if aid in existing_alt:
+                        existing_alt[aid].miktar = float(mikt)
+                        updated += 1
+                    else:
+                        db.session.add(AltRecete(urun_id=urun_id, alt_urun_id=aid, miktar=float(mikt)))
+                        added += 1
+
+            # Maliyetler aynı transaction'da: döngü varsa hiçbir satır yazılmaz
+            db.session.flush()
+            guncelle_tum_urun_maliyetleri(commit=False, urun_ids=[urun_id])
             db.session.commit()
-            guncelle_tum_urun_maliyetleri()
 
             msg = f"Reçete kaydedildi. Eklenen: {added}, Güncellenen: {updated}."
             if skipped:
                 msg += f" Atlanan satır: {skipped}."
             flash(msg, 'success')
 
+        except ReceteDongusuHatasi as e:
+            db.session.rollback()
+            flash(f"Reçete kaydedilmedi. {e}", 'danger')
         except Exception as e:
             db.session.rollback()
             flash(f"Reçete hatası: {e}", 'danger')
 
         return redirect(url_for('admin_panel'))
 
+    # Toplu tarif yükleme: Urun_Adi / Hammadde_Adi / Miktar
+    @app.route('/upload-recipes', methods=['POST'])
+    @login_required
+    @sinirla(UPLOAD)
+    def upload_recipes():
+        file = request.files.get('recipe_file')
+        if not file or file.filename == '':
+            flash('Tarif dosyası seçilmedi.', 'danger')
+            return redirect(url_for('admin_panel', tab='recipes'))
+
+        dosya_adi = file.filename.lower()
+        if not dosya_adi.endswith(('.xlsx', '.xls', '.csv')):
+            flash('Desteklenmeyen dosya türü. Lütfen .xlsx / .xls / .csv yükleyin.', 'danger')
+            return redirect(url_for('admin_panel', tab='recipes'))
+
+        import pandas as pd  # ilk upload'da yüklenir
+
+        try:
+            if dosya_adi.endswith('.csv'):
+                df = pd.read_csv(file, dtype={'Urun_Adi': str, 'Hammadde_Adi': str})
+            else:
+                df = pd.read_excel(file, dtype={'Urun_Adi': str, 'Hammadde_Adi': str})
+            required_columns = ['Urun_Adi', 'Hammadde_Adi', 'Miktar']
+            missing = [c for c in required_columns if c not in df.columns]
+            if missing:
+                flash(f"Eksik kolon(lar): {', '.join(missing)}", 'danger')
+                return redirect(url_for('admin_panel', tab='recipes'))
+
+            # İsimler toplu çözülür: ürün (isim, yoksa Excel adı) ve hammadde başına tek sözlük
+            # Reçeteler şubeler arası ortaktır: tüm katalog
+            ref = katalog(tum_subeler=True)
+            urun_map = {u.excel_adi: u.id for u in ref.urunler}
+            urun_map.update({u.isim: u.id for u in ref.urunler})
+            hammadde_map = dict(
+                (isim, hid) for hid, isim in db.session.execute(db.select(Hammadde.id, Hammadde.isim))
+            )
+
+            miktarlar: dict[tuple[int, int], float] = {}
+            hatali_satirlar, bilinmeyen_urun, bilinmeyen_hammadde = [], set(), set()
+
+            for idx, (urun_adi, hammadde_adi, miktar) in enumerate(
+                zip(df['Urun_Adi'], df['Hammadde_Adi'], df['Miktar'])
+            ):
+                urun_adi = '' if pd.isna(urun_adi) else str(urun_adi).strip()
+                hammadde_adi = '' if pd.isna(hammadde_adi) else str(hammadde_adi).strip()
+                miktar = parse_decimal(None if pd.isna(miktar) else miktar)
+
+                if not urun_adi or not hammadde_adi or miktar is None or miktar <= 0:
+                    hatali_satirlar.append(idx + 2)
+                    continue
+
+                urun_id = urun_map.get(urun_adi)
+                hammadde_id = hammadde_map.get(hammadde_adi)
+                if not urun_id:
+                    bilinmeyen_urun.add(urun_adi)
+                if not hammadde_id:
+                    bilinmeyen_hammadde.add(hammadde_adi)
+                if not urun_id or not hammadde_id:
+                    continue
+
+                # Aynı ürün-hammadde tekrar ederse miktarlar toplanır (add_recipe ile aynı)
+                anahtar = (urun_id, hammadde_id)
+                miktarlar[anahtar] = miktarlar.get(anahtar, 0.0) + float(miktar)
+
+            if miktarlar:
+                urun_ids = sorted({u for u, _ in miktarlar})
+                mevcut = set(
+                    db.session.execute(
+                        db.select(Recete.urun_id, Recete.hammadde_id).where(Recete.urun_id.in_(urun_ids))
+                    ).all()
+                )
+                toplu_upsert(
+                    Recete,
+                    [{'urun_id': u, 'hammadde_id': h, 'miktar': m} for (u, h), m in miktarlar.items()],
+                    anahtar_kolonlar=['urun_id', 'hammadde_id'],
+                    guncellenecek=['miktar'],
+                    constraint='uq_recete_urun_hammadde'
+                )
+                # Tek maliyet hesabı, aynı transaction
+                guncelle_tum_urun_maliyetleri(commit=False, urun_ids=urun_ids)
+                db.session.commit()
+
+                guncellenen = sum(1 for k in miktarlar if k in mevcut)
+                flash(
+                    f"Tarifler yüklendi: {len(urun_ids)} ürün, "
+                    f"{len(miktarlar) - guncellenen} yeni / {guncellenen} güncellenen kalem.",
+                    'success'
+                )
+            else:
+                flash('İşlenecek geçerli tarif satırı bulunamadı.', 'warning')
+
+            if bilinmeyen_urun:
+                ornek = ', '.join(sorted(bilinmeyen_urun)[:10])
+                flash(f"Tanınmayan {len(bilinmeyen_urun)} ürün: {ornek}", 'warning')
+            if bilinmeyen_hammadde:
+                ornek = ', '.join(sorted(bilinmeyen_hammadde)[:10])
+                flash(f"Tanınmayan {len(bilinmeyen_hammadde)} hammadde: {ornek}", 'warning')
+            if hatali_satirlar:
+                ornek = ', '.join(map(str, hatali_satirlar[:20]))
+                flash(f"Hatalı {len(hatali_satirlar)} satır atlandı (satır no: {ornek})", 'warning')
+
+        except ReceteDongusuHatasi as e:
+            db.session.rollback()
+            flash(f"Tarifler kaydedilmedi. {e}", 'danger')
+        except Exception as e:
+            db.session.rollback()
+            flash(f"Tarif dosyası işlenemedi: {e}", 'danger')
+
+        return redirect(url_for('admin_panel', tab='recipes'))
+
     @app.route('/edit-recipe/<int:id>', methods=['POST'])
     @login_required
     def edit_recipe(id):
@@ -841,7 +1398,7 @@ def create_app():
         try:
             rec.miktar = miktar
             db.session.commit()
-            guncelle_tum_urun_maliyetleri()
+            guncelle_tum_urun_maliyetleri(urun_ids=[rec.urun_id])
             flash(f"'{rec.urun.isim}' / '{rec.hammadde.isim}' miktarı güncellendi.", 'success')
         except Exception as e:
             db.session.rollback()
@@ -857,17 +1414,74 @@ def create_app():
             return redirect(url_for('admin_panel'))
 
         try:
+            urun_id = rec.urun_id
             urun_adi = rec.urun.isim
             hammadde_adi = rec.hammadde.isim
             db.session.delete(rec)
             db.session.commit()
-            guncelle_tum_urun_maliyetleri()
+            guncelle_tum_urun_maliyetleri(urun_ids=[urun_id])
             flash(f"'{urun_adi}' ürününden '{hammadde_adi}' kalemi silindi.", 'success')
         except Exception as e:
             db.session.rollback()
             flash(f"Silme hatası: {e}", 'danger')
         return redirect(url_for('admin_panel'))
 
+    @app.route('/delete-sub-recipe/<int:id>', methods=['POST'])
+    @login_required
+    def delete_sub_recipe(id):
+        alt = db.session.get(AltRecete, id)
+        if not alt:
+            flash("Alt reçete kalemi bulunamadı.", 'warning')
+            return redirect(url_for('admin_panel', tab='recipes'))
+
+        try:
+            urun_id = alt.urun_id
+            urun_adi = alt.urun.isim
+            alt_adi = alt.alt_urun.isim
+            db.session.delete(alt)
+            db.session.commit()
+            guncelle_tum_urun_maliyetleri(urun_ids=[urun_id])
+            flash(f"'{urun_adi}' ürününden '{alt_adi}' alt reçetesi kaldırıldı.", 'success')
+        except Exception as e:
+            db.session.rollback()
+            flash(f"Silme hatası: {e}", 'danger')
+        return redirect(url_for('admin_panel', tab='recipes'))
+
+    # Satış geçmişi / ürün özeti dışa aktarımı (akışlı CSV / XLSX)
+    @app.route('/export-sales')
+    @login_required
+    @sinirla(EXPORT)
+    def export_sales():
+        bicim = request.args.get('bicim', 'csv')
+        tur = request.args.get('tur', 'satis')
+        if bicim not in BICIMLER or tur not in ('satis', 'urun_ozeti', 'tuketim', 'tuketim_gunluk'):
+            flash('Geçersiz dışa aktarım seçimi.', 'danger')
+            return redirect(url_for('dashboard'))
+
+        # Akış başladıktan sonra hata dönülemez: aralık yanıt kurulmadan doğrulanır
+        try:
+            baslangic, bitis = tarih_araligi(request.args.get('baslangic'), request.args.get('bitis'))
+        except ValueError as e:
+            flash(str(e), 'danger')
+            return redirect(url_for('dashboard'))
+
+        filtreler = dict(
+            baslangic=baslangic, bitis=bitis,
+            urun_ismi=(request.args.get('urun') or '').strip() or None,
+            kategori=(request.args.get('kategori') or '').strip() or None,
+            grup=(request.args.get('grup') or '').strip() or None,
+        )
+        if tur == 'urun_ozeti':
+            return indirme_yaniti(bicim, 'urun_ozeti', URUN_OZETI_BASLIKLARI,
+                                  urun_ozeti_satirlari(**filtreler), sayfa_adi='Urun Ozeti')
+        if tur in ('tuketim', 'tuketim_gunluk'):
+            gunluk = tur == 'tuketim_gunluk'
+            return indirme_yaniti(bicim, 'teorik_tuketim',
+                                  GUNLUK_TUKETIM_BASLIKLARI if gunluk else TUKETIM_BASLIKLARI,
+                                  tuketim_satirlari(gunluk=gunluk, **filtreler), sayfa_adi='Teorik Tuketim')
+        return indirme_yaniti(bicim, 'satislar', SATIS_BASLIKLARI,
+                              satis_satirlari(**filtreler), sayfa_adi='Satislar')
+
     @app.route('/delete-sales-by-date', methods=['POST'])
     @login_required
     def delete_sales_by_date():
@@ -875,13 +1489,27 @@ def create_app():
         if not date_str:
             flash("Silmek için geçerli bir tarih seçin.", 'danger')
             return redirect(url_for('admin_panel'))
+        sube_id = islem_subesi()
+        if sube_id is None:
+            flash("Satış silmek için önce üst menüden bir şube seçin.", 'danger')
+            return redirect(url_for('admin_panel'))
         try:
             target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+            gun_basi = datetime.combine(target_date, datetime.min.time())
+            # Aralık filtresi: func.date(tarih) gibi her satırda hesaplanmaz, index'lenebilir
+            gun_filtresi = (SatisKaydi.sube_id == sube_id,
+                            SatisKaydi.tarih >= gun_basi, SatisKaydi.tarih < gun_basi + timedelta(days=1))
+            # Silinen günün ürünleri: uyarıları silme sonrası yeniden değerlendirilir
+            etkilenen = db.session.scalars(db.select(SatisKaydi.urun_id).where(*gun_filtresi).distinct()).all()
             num_deleted = (
                 db.session.query(SatisKaydi)
-                .filter(func.date(SatisKaydi.tarih) == target_date)
+                .filter(*gun_filtresi)
                 .delete(synchronize_session=False)
             )
+            satis_ozeti_gun_sil(target_date, sube_id)
+            if num_deleted:
+                uyarilari_degerlendir(etkilenen, sube_id)
+                surum_artir(SATIS_SURUMU)
             db.session.commit()
             if num_deleted > 0:
                 flash(f"{target_date.strftime('%d %B %Y')} tarihindeki {num_deleted} satış kaydı silindi.", 'success')
@@ -894,31 +1522,58 @@ def create_app():
             flash(f"Silme hatası: {e}", 'danger')
         return redirect(url_for('admin_panel'))
 
+    @app.route('/admin/slow-queries')
+    @login_required
+    def slow_queries():
+        return render_template(
+            'slow_queries.html',
+            title='Yavaş Sorgular',
+            aktif=bool(app.config.get('SLOW_QUERY_MS')),
+            esik_ms=app.config.get('SLOW_QUERY_MS'),
+            log_dosyasi=app.config.get('SLOW_QUERY_LOG'),
+            kayitlar=son_kayitlar()
+        )
+
+    @app.route('/admin/diagnostics')
+    @login_required
+    def diagnostics():
+        veritabanlari = []
+        for ad, engine in db.engines.items():
+            try:
+                durum = sqlite_durumu(engine)
+                hata = None
+            except Exception as e:
+                durum, hata = None, str(e)
+            veritabanlari.append({
+                'ad': ad or 'default',
+                'dialect': engine.dialect.name,
+                'url': engine.url.render_as_string(hide_password=True),
+                'havuz': engine.pool.status(),
+                'sqlite': durum,
+                'hata': hata,
+            })
+        return render_template(
+            'diagnostics.html',
+            title='Tanılama',
+            veritabanlari=veritabanlari,
+            giris_kontrolu=metrikler(app),
+            giris_kontrolu_acik=bool(app.config.get('ADMISSION_ENABLED')),
+            sqlite_ayarli=bool(app.config.get('SQLITE_TUNED')),
+            optimize_aralik=app.config.get('SQLITE_OPTIMIZE_INTERVAL')
+        )
+
     # -------------------------
     # REPORTS / ANALYSIS
     # -------------------------
     @app.route('/reports', methods=['GET', 'POST'])
     @login_required
+    @sinirla(ANALIZ, yontemler=('POST',))
     def reports():
         try:
-            urunler_db = Urun.query.order_by(Urun.isim).all()
-            urun_listesi = [u.isim for u in urunler_db]
-
-            kategoriler_db = (
-                db.session.query(Urun.kategori)
-                .distinct()
-                .order_by(Urun.kategori)
-                .all()
-            )
-            kategori_listesi = sorted([k[0] for k in kategoriler_db if k[0]])
-
-            gruplar_db = (
-                db.session.query(Urun.kategori_grubu)
-                .distinct()
-                .order_by(Urun.kategori_grubu)
-                .all()
-            )
-            grup_listesi = sorted([g[0] for g in gruplar_db if g[0]])
+            ref = katalog()
+            urun_listesi = ref.urun_isimleri
+            kategori_listesi = ref.kategoriler
+            grup_listesi = ref.gruplar
 
         except Exception as e:
             flash(f'Veritabanından listeler çekilirken hata: {e}', 'danger')
@@ -930,6 +1585,17 @@ def create_app():
         analiz_tipi = None
 
         if request.method == 'POST':
+            from analysis_engine import (
+                hesapla_hedef_marj,
+                simule_et_fiyat_degisikligi,
+                bul_optimum_fiyat,
+                analiz_et_kategori_veya_grup,
+                simule_et_hammadde_fiyat_soku,
+                simule_et_fiyat_taramasi,
+                menu_muhendisligi,
+                tahmin_et_talep, MIN_GECMIS_GUN, MAKS_GECMIS_GUN
+            )
+
             try:
                 analiz_tipi = request.form.get('analiz_tipi')
                 urun_ismi = request.form.get('urun_ismi')
@@ -960,8 +1626,14 @@ def create_app():
                 elif analiz_tipi == 'optimum_fiyat':
                     if not urun_ismi:
                         raise ValueError("Lütfen bir ürün seçin.")
+                    guven_araligi = bool(request.form.get('guven_araligi'))
                     analiz_tipi_baslik = f"Optimum Fiyat: {urun_ismi}"
-                    success, sonuc, chart_json = bul_optimum_fiyat(urun_ismi)
+                    urun_ref = ref.urun(urun_ismi) if not guven_araligi else None
+                    hazir = precompute_store.oku(precompute_store.optimum_anahtari(urun_ref.id)) if urun_ref else None
+                    if hazir is not None:
+                        success, sonuc, chart_json = hazir
+                    else:
+                        success, sonuc, chart_json = bul_optimum_fiyat(urun_ismi, guven_araligi=guven_araligi)
                     analiz_sonucu, chart_data = sonuc, chart_json
 
                 elif analiz_tipi == 'kategori':
@@ -978,6 +1650,37 @@ def create_app():
                     success, sonuc, chart_json = analiz_et_kategori_veya_grup('kategori_grubu', grup_ismi, gun_sayisi)
                     analiz_sonucu, chart_data = sonuc, chart_json
 
+                elif analiz_tipi == 'fiyat_soku':
+                    degisiklikler = parse_fiyat_soku(request.form.get('fiyat_degisiklikleri'))
+                    if not degisiklikler:
+                        raise ValueError("En az bir hammadde fiyat değişikliği girin.")
+                    gun_sayisi = safe_int(request.form.get('gun_sayisi'), 30)
+                    analiz_tipi_baslik = f"Hammadde Fiyat Şoku ({gun_sayisi} gün)"
+                    success, sonuc, chart_json = simule_et_hammadde_fiyat_soku(degisiklikler, gun_sayisi)
+                    analiz_sonucu, chart_data = sonuc, chart_json
+
+                elif analiz_tipi == 'fiyat_taramasi':
+                    urun_isimleri = [u for u in request.form.getlist('urun_isimleri') if u]
+                    yuzdeler = parse_yuzde_listesi(request.form.get('fiyat_adaylari'))
+                    if not yuzdeler:
+                        raise ValueError("En az bir aday fiyat değişimi (%) girin.")
+                    analiz_tipi_baslik = f"Fiyat Taraması ({len(urun_isimleri) or 'tüm'} ürün × {len(yuzdeler)} aday)"
+                    success, sonuc, chart_json = simule_et_fiyat_taramasi(urun_isimleri, yuzdeler)
+                    analiz_sonucu, chart_data = sonuc, chart_json
+
+                elif analiz_tipi == 'menu_muhendisligi':
+                    gun_sayisi = safe_int(request.form.get('gun_sayisi'), 30)
+                    kategori_ismi = (kategori_ismi or '').strip() or None
+                    analiz_tipi_baslik = f"Menü Mühendisliği: {kategori_ismi or 'Tüm menü'} ({gun_sayisi} gün)"
+                    success, sonuc, chart_json = menu_muhendisligi(gun_sayisi, kategori_ismi)
+                    analiz_sonucu, chart_data = sonuc, chart_json
+
+                elif analiz_tipi == 'talep_tahmini':
+                    gun_sayisi = max(MIN_GECMIS_GUN, min(safe_int(request.form.get('gun_sayisi'), 56) or 56, MAKS_GECMIS_GUN))
+                    analiz_tipi_baslik = f"Talep Tahmini (7 gün, en çok {gun_sayisi} gün geçmiş)"
+                    success, sonuc, chart_json = tahmin_et_talep(7, gun_sayisi)
+                    analiz_sonucu, chart_data = sonuc, chart_json
+
                 else:
                     success, analiz_sonucu = False, "Geçersiz analiz tipi."
 
@@ -1005,14 +1708,52 @@ def create_app():
             analiz_sonucu_clean=strip_emojis(analiz_sonucu) if analiz_sonucu else None,
             chart_data=chart_data,
             analiz_tipi_baslik=analiz_tipi_baslik,
-            aktif_analiz_tipi=analiz_tipi if request.method == 'POST' else None
+            aktif_analiz_tipi=analiz_tipi if request.method == 'POST' else None,
+            form_degerleri=request.form if request.method == 'POST' else {}
         )
 
     return app
 
 
+def ilk_kurulum(app):
+    """
+    Şema + ilk admin. Worker açılışında değil, deploy adımında bir kez çalışır:
+      flask --app app init-db
+    """
+    with app.app_context():
+        db.create_all()
+        # Şubeler sonradan eklendi: eski şemayı tamamla, tek şube varsa onu oluştur
+        for adim in sube_semasini_guncelle():
+            print(f"[INIT] Şube şeması: {adim}")
+        db.session.commit()
+        if not User.query.first():
+            admin_user = os.environ.get('ADMIN_USER', 'onur')
+            admin_pass = os.environ.get('ADMIN_PASS', 'RestoranSifrem!2025')
+            try:
+                hashed_password = bcrypt.generate_password_hash(admin_pass).decode('utf-8')
+                db.session.add(User(username=admin_user, password_hash=hashed_password))
+                db.session.commit()
+                print(f"[INIT] Admin oluşturuldu -> kullanıcı: {admin_user}")
+            except Exception as e:
+                db.session.rollback()
+                print(f"[INIT] Admin oluşturulamadı: {e}")
+
+        # Özet tablosu sonradan eklendi: eski kurulumlarda satışlardan bir kez doldur
+        if satis_ozeti_eksik_mi():
+            adet = satis_ozeti_yenile()
+            db.session.commit()
+            print(f"[INIT] Günlük satış özeti kuruldu -> {adet} satır")
+
+        # Uyarı tablosu sonradan eklendi: mevcut satışlar için bir kez değerlendir
+        if uyari_kurulumu_gerekli():
+            sayac = uyarilari_yenile()
+            db.session.commit()
+            print(f"[INIT] Marj uyarıları değerlendirildi -> {sayac['acilan']} yeni uyarı")
+
+
 app = create_app()
 
 if __name__ == '__main__':
+    ilk_kurulum(app)
     port = int(os.environ.get("PORT", 5000))
     app.run(host='0.0.0.0', port=port, debug=bool(os.environ.get('FLASK_DEBUG')))
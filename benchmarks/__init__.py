@@ -0,0 +1,2 @@
+# benchmarks — sentetik veri üretici ve performans ölçüm araçları
+# Çalıştırma: proje kökünden `python -m benchmarks.bench`
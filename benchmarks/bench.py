@@ -0,0 +1,199 @@
+# benchmarks/bench.py — Sıcak yollar için tekrarlanabilir benchmark (SQLite)
+#
+# Her ölçek için geçici bir SQLite veritabanı kurar, sentetik veriyi yazar ve
+# aşağıdaki yolların süresini (medyan) ve tepe bellek kullanımını ölçer:
+#   upload_excel, guncelle_tum_urun_maliyetleri, _product_stats_last_days,
+#   bul_optimum_fiyat, simule_et_fiyat_degisikligi, analiz_et_kategori_veya_grup
+#
+# Örnek:
+#   python -m benchmarks.bench                          # small + medium, baseline ile kıyas
+#   python -m benchmarks.bench --scales large --repeat 5
+#   python -m benchmarks.bench --save-baseline          # baseline.json'u güncelle
+
+import argparse
+import gc
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic_data import uret, veritabanina_yaz, upload_dosyasi_yaz
+
+# (hammadde, ürün, yıl)
+OLCEKLER = {
+    "small": (15, 30, 0.5),
+    "medium": (40, 120, 1.0),
+    "large": (80, 300, 2.0),
+}
+UPLOAD_GUN = 7
+ORNEK_URUN = 10          # optimum/simülasyon için örneklenen ürün sayısı
+VARSAYILAN_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+ADMIN_USER, ADMIN_PASS = "bench", "bench-sifre-123"
+
+
+def _olc(fn, tekrar: int):
+    """fn'i tekrar kez çalıştırır; medyan süre (ms) ve tek koşudaki tepe bellek (KB)."""
+    sureler = []
+    for _ in range(tekrar):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn()
+        sureler.append((time.perf_counter() - t0) * 1000.0)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, tepe = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"sure_ms": round(statistics.median(sureler), 2), "bellek_kb": round(tepe / 1024.0, 1)}
+
+
+def _olcek_calistir(olcek: str, tekrar: int, seed: int) -> dict:
+    h_sayi, u_sayi, yil = OLCEKLER[olcek]
+    klasor = tempfile.mkdtemp(prefix=f"rp-bench-{olcek}-")
+    try:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(klasor, 'bench.db')}"
+        os.environ["UPLOAD_FOLDER"] = os.path.join(klasor, "uploads")
+        os.environ["ADMIN_USER"], os.environ["ADMIN_PASS"] = ADMIN_USER, ADMIN_PASS
+
+        from app import create_app, ilk_kurulum
+        from database import db, guncelle_tum_urun_maliyetleri
+        from dashboard_stats import _product_stats_last_days
+        from analysis_engine import (
+            bul_optimum_fiyat, simule_et_fiyat_degisikligi, analiz_et_kategori_veya_grup
+        )
+
+        app = create_app()
+        veri = uret(h_sayi, u_sayi, yil, seed=seed)
+        excel_yolu = os.path.join(klasor, "upload.xlsx")
+        upload_dosyasi_yaz(veri, excel_yolu, son_gun=UPLOAD_GUN)
+
+        ilk_kurulum(app)
+        with app.app_context():
+            t0 = time.perf_counter()
+            sayilar = veritabanina_yaz(veri, son_gun_haric=UPLOAD_GUN)
+            print(f"  [{olcek}] veri yüklendi {sayilar} ({time.perf_counter() - t0:.1f} sn)")
+
+        urunler = [u["isim"] for u in veri.urunler[:ORNEK_URUN]]
+        fiyatlar = {u["isim"]: u["mevcut_satis_fiyati"] for u in veri.urunler}
+        kategoriler = sorted({u["kategori"] for u in veri.urunler})
+        gruplar = sorted({u["kategori_grubu"] for u in veri.urunler})
+
+        client = app.test_client()
+        client.post("/login", data={"username": ADMIN_USER, "password": ADMIN_PASS},
+                    base_url="https://localhost")
+
+        def upload():
+            with open(excel_yolu, "rb") as f:
+                r = client.post("/upload-excel", data={"excel_file": (f, "upload.xlsx")},
+                                content_type="multipart/form-data", base_url="https://localhost")
+            assert r.status_code == 302, r.status_code
+
+        sonuc = {}
+        sonuc["upload_excel"] = _olc(upload, tekrar)
+
+        with app.app_context():
+            def maliyet():
+                guncelle_tum_urun_maliyetleri(commit=False)
+                db.session.rollback()
+
+            def optimum():
+                for isim in urunler:
+                    bul_optimum_fiyat(isim)
+
+            def simulasyon():
+                for isim in urunler:
+                    simule_et_fiyat_degisikligi(isim, fiyatlar[isim] * 1.05)
+
+            def kategori():
+                for k in kategoriler:
+                    analiz_et_kategori_veya_grup("kategori", k, 30)
+
+            def grup():
+                for g in gruplar:
+                    analiz_et_kategori_veya_grup("kategori_grubu", g, 30)
+
+            sonuc["guncelle_tum_urun_maliyetleri"] = _olc(maliyet, tekrar)
+            sonuc["_product_stats_last_days(30)"] = _olc(lambda: _product_stats_last_days(30), tekrar)
+            sonuc["_product_stats_last_days(365)"] = _olc(lambda: _product_stats_last_days(365), tekrar)
+            sonuc[f"bul_optimum_fiyat x{len(urunler)}"] = _olc(optimum, tekrar)
+            sonuc[f"simule_et_fiyat_degisikligi x{len(urunler)}"] = _olc(simulasyon, tekrar)
+            sonuc[f"analiz_et_kategori x{len(kategoriler)}"] = _olc(kategori, tekrar)
+            sonuc[f"analiz_et_kategori_grubu x{len(gruplar)}"] = _olc(grup, tekrar)
+
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+        return sonuc
+    finally:
+        shutil.rmtree(klasor, ignore_errors=True)
+
+
+def _kiyasla(sonuclar: dict, baseline: dict, tolerans: float) -> int:
+    """Tabloyu basar; toleransı aşan süre gerilemelerinin sayısını döner."""
+    gerileme = 0
+    for olcek, vakalar in sonuclar.items():
+        print(f"\n== {olcek} ==")
+        print(f"{'vaka':<42} {'süre ms':>10} {'baseline':>10} {'Δ%':>8} {'bellek KB':>11}")
+        for vaka, olcum in vakalar.items():
+            eski = (baseline.get(olcek) or {}).get(vaka)
+            if eski and eski.get("sure_ms"):
+                delta = (olcum["sure_ms"] - eski["sure_ms"]) / eski["sure_ms"] * 100.0
+                isaret = "  ⚠" if delta > tolerans * 100 else ""
+                gerileme += 1 if isaret else 0
+                print(f"{vaka:<42} {olcum['sure_ms']:>10.1f} {eski['sure_ms']:>10.1f} "
+                      f"{delta:>+7.1f}% {olcum['bellek_kb']:>11.1f}{isaret}")
+            else:
+                print(f"{vaka:<42} {olcum['sure_ms']:>10.1f} {'-':>10} {'-':>8} {olcum['bellek_kb']:>11.1f}")
+    return gerileme
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="RestoProfit benchmark")
+    ap.add_argument("--scales", default="small,medium", help=f"Virgülle: {','.join(OLCEKLER)}")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--baseline", default=VARSAYILAN_BASELINE)
+    ap.add_argument("--save-baseline", action="store_true", help="Sonuçları baseline olarak kaydet")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="Gerileme eşiği (0.25 = %%25)")
+    ap.add_argument("--fail-on-regression", action="store_true")
+    args = ap.parse_args(argv)
+
+    olcekler = [s.strip() for s in args.scales.split(",") if s.strip()]
+    bilinmeyen = [s for s in olcekler if s not in OLCEKLER]
+    if bilinmeyen:
+        ap.error(f"Bilinmeyen ölçek: {', '.join(bilinmeyen)}")
+
+    sonuclar = {}
+    for olcek in olcekler:
+        print(f"Ölçek: {olcek} {OLCEKLER[olcek]}")
+        sonuclar[olcek] = _olcek_calistir(olcek, max(1, args.repeat), args.seed)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    gerileme = _kiyasla(sonuclar, baseline, args.tolerance)
+
+    if args.save_baseline:
+        baseline.update(sonuclar)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f"\nBaseline kaydedildi: {args.baseline}")
+
+    if gerileme:
+        print(f"\n{gerileme} vakada %{args.tolerance * 100:.0f} üzeri yavaşlama var.")
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
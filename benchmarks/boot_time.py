@@ -0,0 +1,100 @@
+# benchmarks/boot_time.py — Worker açılış süresi (soğuk süreç)
+#
+# Her tekrar için yeni bir Python süreci başlatır ve şunları ölçer:
+#   import app          : modül import + create_app() (gunicorn worker'ın ödediği bedel)
+#   ilk istek /login    : ilk GET (şablon derleme vb.)
+#   ilk analiz isteği   : lazy import edilen pandas/sklearn'ün ilk kullanımda maliyeti
+# Ayrıca import sonrası yüklü modül sayısı ve pandas/sklearn'ün yüklenip yüklenmediği raporlanır.
+#
+# Örnek:
+#   python -m benchmarks.boot_time --repeat 7
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+KOK = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADMIN_USER, ADMIN_PASS = "boot", "boot-sifre-123"
+
+_COCUK = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import app as app_modulu
+t1 = time.perf_counter()
+moduller = len(sys.modules)
+agir = {m: m in sys.modules for m in ("pandas", "numpy", "sklearn")}
+
+client = app_modulu.app.test_client()
+t2 = time.perf_counter()
+client.get("/login", base_url="https://localhost")
+t3 = time.perf_counter()
+client.post("/login", data={"username": sys.argv[1], "password": sys.argv[2]}, base_url="https://localhost")
+t4 = time.perf_counter()
+client.post("/reports", data={"analiz_tipi": "hedef_marj", "urun_ismi": "-", "hedef_marj": "70"},
+            base_url="https://localhost")
+t5 = time.perf_counter()
+print(json.dumps({
+    "import_ms": (t1 - t0) * 1000.0,
+    "ilk_istek_ms": (t3 - t2) * 1000.0,
+    "ilk_analiz_ms": (t5 - t4) * 1000.0,
+    "modul_sayisi": moduller,
+    "agir_moduller": agir,
+}))
+"""
+
+
+def _calistir(kod: str, env: dict, *argv) -> str:
+    r = subprocess.run([sys.executable, "-c", kod, *argv], cwd=KOK, env=env,
+                       capture_output=True, text=True, check=True)
+    return r.stdout.strip().splitlines()[-1]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="RestoProfit worker açılış süresi")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--json", help="Özet JSON çıktısı")
+    args = ap.parse_args(argv)
+
+    klasor = tempfile.mkdtemp(prefix="rp-boot-")
+    try:
+        env = dict(os.environ)
+        env["DATABASE_URL"] = f"sqlite:///{os.path.join(klasor, 'boot.db')}"
+        env["UPLOAD_FOLDER"] = os.path.join(klasor, "uploads")
+        env["ADMIN_USER"], env["ADMIN_PASS"] = ADMIN_USER, ADMIN_PASS
+
+        # Şema + admin bir kez (deploy adımı); ölçülen süreçler hazır DB'ye bağlanır
+        _calistir("import app; app.ilk_kurulum(app.app); print('ok')", env)
+
+        olcumler = [json.loads(_calistir(_COCUK, env, ADMIN_USER, ADMIN_PASS))
+                    for _ in range(max(1, args.repeat))]
+
+        ozet = {
+            k: round(statistics.median(o[k] for o in olcumler), 1)
+            for k in ("import_ms", "ilk_istek_ms", "ilk_analiz_ms")
+        }
+        ozet["modul_sayisi"] = olcumler[-1]["modul_sayisi"]
+        ozet["agir_moduller"] = olcumler[-1]["agir_moduller"]
+
+        print(f"{len(olcumler)} soğuk süreç (medyan):")
+        print(f"  import app        : {ozet['import_ms']:>8.1f} ms")
+        print(f"  ilk istek /login  : {ozet['ilk_istek_ms']:>8.1f} ms")
+        print(f"  ilk analiz isteği : {ozet['ilk_analiz_ms']:>8.1f} ms")
+        print(f"  import sonrası modül sayısı: {ozet['modul_sayisi']}")
+        print("  import sonrası yüklü: "
+              + ", ".join(f"{m}={'evet' if v else 'hayır'}" for m, v in ozet["agir_moduller"].items()))
+
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(ozet, f, ensure_ascii=False, indent=2)
+        return 0
+    finally:
+        shutil.rmtree(klasor, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
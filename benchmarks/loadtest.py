@@ -0,0 +1,278 @@
+# benchmarks/loadtest.py — Endpoint seviyesinde yük testi (Flask test client, tamamen offline)
+#
+# create_app() ile uygulamayı kurar, sentetik veriyle (SQLite veya lokal PostgreSQL)
+# doldurur, her sanal kullanıcı için ayrı hesap ve test client'ı ile giriş yapar ve karışık
+# iş yükünü thread havuzundan sürer (giriş kontrolünün kullanıcı başı sınırı gerçek
+# kullanımdaki gibi işler). Endpoint bazında p50/p95/p99, throughput ve gecikme
+# histogramı raporlanır; giriş kontrolünün reddettiği istekler (429/503) hata sayılmaz,
+# "red" kolonunda ayrıca gösterilir ve gecikme dağılımına girmez.
+#
+# Örnek:
+#   python -m benchmarks.loadtest --users 8 --duration 30
+#   python -m benchmarks.loadtest --db postgresql://localhost/restoprofit_load --scale medium
+#   python -m benchmarks.loadtest --mix dashboard=5,admin=1,upload=0 --json sonuc.json
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import numpy as np
+
+from benchmarks.bench import OLCEKLER
+from benchmarks.synthetic_data import uret, veritabanina_yaz, upload_dosyasi_yaz
+
+BASE_URL = "https://localhost"   # SESSION_COOKIE_SECURE=True olduğu için https
+ADMIN_USER, ADMIN_PASS = "loadtest", "loadtest-sifre-123"
+RED_DURUMLARI = (429, 503)       # admission_control: kullanıcı başı sınır / kuyruk dolu
+
+# Varsayılan iş yükü ağırlıkları
+VARSAYILAN_KARISIM = {
+    "dashboard": 6,
+    "reports:hedef_marj": 1,
+    "reports:simulasyon": 2,
+    "reports:optimum_fiyat": 2,
+    "reports:kategori": 1,
+    "reports:grup": 1,
+    "admin": 2,
+    "upload": 1,
+}
+
+# Histogram kova sınırları (ms)
+HISTOGRAM_SINIRLARI = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+def _karisim_ayristir(metin: str | None) -> dict:
+    karisim = dict(VARSAYILAN_KARISIM)
+    if not metin:
+        return karisim
+    for parca in metin.split(","):
+        if "=" not in parca:
+            continue
+        anahtar, deger = parca.split("=", 1)
+        anahtar = anahtar.strip()
+        eslesen = [k for k in karisim if k == anahtar or k.startswith(anahtar + ":")]
+        for k in eslesen or [anahtar]:
+            karisim[k] = float(deger)
+    return {k: v for k, v in karisim.items() if v > 0}
+
+
+class _Senaryo:
+    """Her istek tipi için (etiket, client çağrısı) üretir."""
+
+    def __init__(self, veri, upload_yolu: str):
+        self.urunler = veri.urunler
+        self.kategoriler = sorted({u["kategori"] for u in veri.urunler})
+        self.gruplar = sorted({u["kategori_grubu"] for u in veri.urunler})
+        with open(upload_yolu, "rb") as f:
+            self.upload_bytes = f.read()
+
+    def calistir(self, client, tip: str, rng: random.Random):
+        if tip == "dashboard":
+            return client.get(f"/dashboard?days={rng.choice([7, 30, 90])}", base_url=BASE_URL)
+        if tip == "admin":
+            return client.get("/admin", base_url=BASE_URL)
+        if tip == "upload":
+            return client.post(
+                "/upload-excel",
+                data={"excel_file": (BytesIO(self.upload_bytes), "pos.xlsx")},
+                content_type="multipart/form-data",
+                base_url=BASE_URL,
+            )
+
+        analiz = tip.split(":", 1)[1]
+        urun = rng.choice(self.urunler)
+        form = {"analiz_tipi": analiz, "urun_ismi": urun["isim"], "gun_sayisi": "30"}
+        if analiz == "hedef_marj":
+            form["hedef_marj"] = "70"
+        elif analiz == "simulasyon":
+            form["yeni_fiyat"] = f"{urun['mevcut_satis_fiyati'] * rng.uniform(0.9, 1.15):.2f}"
+        elif analiz == "kategori":
+            form["kategori_ismi"] = rng.choice(self.kategoriler)
+        elif analiz == "grup":
+            form["grup_ismi"] = rng.choice(self.gruplar)
+        return client.post("/reports", data=form, base_url=BASE_URL)
+
+
+def _kullanici_adi(sira: int) -> str:
+    return f"{ADMIN_USER}{sira}"
+
+
+def _kullanicilari_olustur(app, sayi: int) -> None:
+    """Her sanal kullanıcıya ayrı hesap (aynı şifre; hash bir kez hesaplanır)."""
+    from app import bcrypt
+    from database import db, User
+
+    with app.app_context():
+        parola_hash = bcrypt.generate_password_hash(ADMIN_PASS).decode("utf-8")
+        mevcut = set(db.session.scalars(db.select(User.username)))
+        db.session.add_all(
+            User(username=ad, password_hash=parola_hash)
+            for ad in map(_kullanici_adi, range(sayi)) if ad not in mevcut
+        )
+        db.session.commit()
+
+
+def _kullanici(app, senaryo, karisim, bitis_zamani, istek_limiti, sayac, kilit, sonuclar, seed, kullanici_adi):
+    rng = random.Random(seed)
+    tipler, agirliklar = list(karisim), list(karisim.values())
+    client = app.test_client()
+    r = client.post("/login", data={"username": kullanici_adi, "password": ADMIN_PASS}, base_url=BASE_URL)
+    if r.status_code != 302:
+        raise RuntimeError(f"Giriş başarısız: HTTP {r.status_code}")
+
+    yerel = defaultdict(list)
+    hatalar = defaultdict(int)
+    redler = defaultdict(int)
+    while time.perf_counter() < bitis_zamani:
+        if istek_limiti:
+            with kilit:
+                if sayac[0] >= istek_limiti:
+                    break
+                sayac[0] += 1
+        tip = rng.choices(tipler, weights=agirliklar)[0]
+        t0 = time.perf_counter()
+        try:
+            resp = senaryo.calistir(client, tip, rng)
+            durum = resp.status_code
+        except Exception:
+            durum = 599
+        if durum in RED_DURUMLARI:
+            redler[tip] += 1
+            continue
+        yerel[tip].append((time.perf_counter() - t0) * 1000.0)
+        if durum >= 400:
+            hatalar[tip] += 1
+
+    with kilit:
+        for tip, sureler in yerel.items():
+            sonuclar["sureler"][tip].extend(sureler)
+        for tip, n in hatalar.items():
+            sonuclar["hatalar"][tip] += n
+        for tip, n in redler.items():
+            sonuclar["redler"][tip] += n
+
+
+def _histogram(sureler: np.ndarray, genislik: int = 30) -> list[str]:
+    sinirlar = [0] + HISTOGRAM_SINIRLARI + [float("inf")]
+    sayilar = [int(((sureler >= a) & (sureler < b)).sum()) for a, b in zip(sinirlar, sinirlar[1:])]
+    en_cok = max(sayilar) or 1
+    satirlar = []
+    for (a, b), n in zip(zip(sinirlar, sinirlar[1:]), sayilar):
+        if not n:
+            continue
+        etiket = f"{a:>5.0f}-{b:<5.0f}ms" if b != float("inf") else f"{a:>5.0f}+     ms"
+        satirlar.append(f"    {etiket} {'█' * max(1, round(n / en_cok * genislik)):<{genislik}} {n}")
+    return satirlar
+
+
+def _rapor(sonuclar: dict, sure_sn: float) -> dict:
+    ozet = {}
+    toplam = sum(len(v) for v in sonuclar["sureler"].values())
+    red = sum(sonuclar["redler"].values())
+    print(f"\nToplam {toplam} istek (+{red} red), {sure_sn:.1f} sn, {toplam / sure_sn:.1f} istek/sn\n")
+    print(f"{'endpoint':<24} {'n':>6} {'hata':>5} {'red':>5} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for tip in sorted(set(sonuclar["sureler"]) | set(sonuclar["redler"])):
+        s = np.array(sonuclar["sureler"].get(tip) or [0.0])
+        p50, p95, p99 = np.percentile(s, [50, 95, 99])
+        ozet[tip] = {
+            "n": len(sonuclar["sureler"].get(tip, [])),
+            "hata": int(sonuclar["hatalar"].get(tip, 0)),
+            "red": int(sonuclar["redler"].get(tip, 0)),
+            "rps": round(len(sonuclar["sureler"].get(tip, [])) / sure_sn, 2),
+            "p50_ms": round(float(p50), 2),
+            "p95_ms": round(float(p95), 2),
+            "p99_ms": round(float(p99), 2),
+            "max_ms": round(float(s.max()), 2),
+        }
+        o = ozet[tip]
+        print(f"{tip:<24} {o['n']:>6} {o['hata']:>5} {o['red']:>5} {o['rps']:>7.2f} {o['p50_ms']:>8.1f} "
+              f"{o['p95_ms']:>8.1f} {o['p99_ms']:>8.1f} {o['max_ms']:>8.1f}")
+
+    print("\nGecikme histogramları:")
+    for tip in sorted(sonuclar["sureler"]):
+        print(f"  {tip}")
+        for satir in _histogram(np.array(sonuclar["sureler"][tip])):
+            print(satir)
+    return ozet
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="RestoProfit endpoint yük testi")
+    ap.add_argument("--db", help="Veritabanı URL'i (varsayılan: geçici SQLite)")
+    ap.add_argument("--scale", default="small", choices=list(OLCEKLER))
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--no-seed-data", action="store_true", help="Var olan veriyi kullan, sentetik veri yazma")
+    ap.add_argument("--users", type=int, default=8, help="Eşzamanlı sanal kullanıcı")
+    ap.add_argument("--duration", type=float, default=20.0, help="Saniye")
+    ap.add_argument("--requests", type=int, default=0, help="Toplam istek limiti (0 = süreye göre)")
+    ap.add_argument("--mix", help="Ağırlıklar: dashboard=6,reports=1,admin=2,upload=1 ...")
+    ap.add_argument("--json", help="Özet JSON çıktısı")
+    args = ap.parse_args(argv)
+
+    klasor = tempfile.mkdtemp(prefix="rp-load-")
+    try:
+        os.environ["DATABASE_URL"] = args.db or f"sqlite:///{os.path.join(klasor, 'load.db')}"
+        os.environ["UPLOAD_FOLDER"] = os.path.join(klasor, "uploads")
+        os.environ["ADMIN_USER"], os.environ["ADMIN_PASS"] = ADMIN_USER, ADMIN_PASS
+
+        from app import create_app, ilk_kurulum
+        from database import db, Urun
+
+        app = create_app()
+        h_sayi, u_sayi, yil = OLCEKLER[args.scale]
+        veri = uret(h_sayi, u_sayi, yil, seed=args.seed)
+        upload_yolu = os.path.join(klasor, "pos.xlsx")
+        upload_dosyasi_yaz(veri, upload_yolu, son_gun=1)
+
+        ilk_kurulum(app)
+        _kullanicilari_olustur(app, args.users)
+        with app.app_context():
+            if not args.no_seed_data:
+                if db.session.query(Urun).count():
+                    ap.error("Hedef veritabanı boş değil; mevcut veriyle çalışmak için --no-seed-data verin.")
+                print(f"Sentetik veri yazılıyor: {veritabanina_yaz(veri, son_gun_haric=1)}")
+
+        karisim = _karisim_ayristir(args.mix)
+        print(f"İş yükü: {karisim}")
+        print(f"{args.users} kullanıcı, {args.duration:.0f} sn"
+              + (f", en fazla {args.requests} istek" if args.requests else ""))
+
+        senaryo = _Senaryo(veri, upload_yolu)
+        sonuclar = {"sureler": defaultdict(list), "hatalar": defaultdict(int), "redler": defaultdict(int)}
+        kilit = threading.Lock()
+        sayac = [0]
+
+        baslangic = time.perf_counter()
+        bitis = baslangic + args.duration
+        with ThreadPoolExecutor(max_workers=args.users) as havuz:
+            isler = [
+                havuz.submit(_kullanici, app, senaryo, karisim, bitis, args.requests,
+                             sayac, kilit, sonuclar, args.seed + i, _kullanici_adi(i))
+                for i in range(args.users)
+            ]
+            for f in isler:
+                f.result()
+        gecen = time.perf_counter() - baslangic
+
+        ozet = _rapor(sonuclar, gecen)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump({"sure_sn": round(gecen, 2), "kullanici": args.users, "endpointler": ozet},
+                          f, ensure_ascii=False, indent=2)
+            print(f"\nJSON: {args.json}")
+        return 0
+    finally:
+        shutil.rmtree(klasor, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
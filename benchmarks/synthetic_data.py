@@ -0,0 +1,261 @@
+# benchmarks/synthetic_data.py — Tekrarlanabilir (seed'li) sentetik RestoProfit verisi
+#
+# Üretilen veri:
+#   - N hammadde (birim + fiyat)
+#   - M ürün (kategori / grup / excel adı) ve her ürün için 2-8 kalemli reçete
+#   - Y yıllık günlük satış: ürün bazında taban talep, fiyat esnekliği,
+#     haftanın günü etkisi, dönemsel fiyat değişiklikleri ve kampanya günleri
+#
+# Örnek:
+#   python -m benchmarks.synthetic_data --urun 120 --hammadde 40 --yil 1 \
+#       --db sqlite:///bench.db --excel son7gun.xlsx --csv son7gun.csv
+
+import argparse
+import csv
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+KATEGORI_GRUPLARI = {
+    "Yiyecek": ["Burger", "Pizza", "Makarna", "Salata", "Tatlı"],
+    "İçecek": ["Soğuk İçecek", "Sıcak İçecek", "Kokteyl"],
+    "Atıştırmalık": ["Aperatif", "Yan Ürün"],
+}
+BIRIMLER = ["kg", "lt", "adet"]
+
+# Haftanın günü talep çarpanları (Pzt..Paz)
+HAFTA_GUNU_CARPANI = np.array([0.85, 0.85, 0.9, 0.95, 1.15, 1.3, 1.2])
+
+
+@dataclass
+class SentetikVeri:
+    hammaddeler: list = field(default_factory=list)   # dict(isim, maliyet_birimi, maliyet_fiyati)
+    urunler: list = field(default_factory=list)       # dict(isim, excel_adi, mevcut_satis_fiyati, kategori, kategori_grubu)
+    receteler: list = field(default_factory=list)     # (urun_idx, hammadde_idx, miktar)
+    gunler: list = field(default_factory=list)        # date listesi
+    adetler: np.ndarray | None = None                 # (urun, gün) satış adedi
+    fiyatlar: np.ndarray | None = None                # (urun, gün) birim satış fiyatı
+
+    @property
+    def satis_satiri_sayisi(self) -> int:
+        return int(np.count_nonzero(self.adetler)) if self.adetler is not None else 0
+
+
+def uret(hammadde_sayisi=40, urun_sayisi=120, yil=1.0, seed=42, bitis: date | None = None) -> SentetikVeri:
+    """Seed'e göre deterministik sentetik menü + satış geçmişi üretir."""
+    rng = np.random.default_rng(seed)
+    veri = SentetikVeri()
+
+    # --- Hammaddeler ---
+    for i in range(hammadde_sayisi):
+        birim = BIRIMLER[i % len(BIRIMLER)]
+        fiyat = float(rng.uniform(5, 60) if birim == "adet" else rng.uniform(20, 250))
+        veri.hammaddeler.append({
+            "isim": f"Hammadde {i + 1:04d}",
+            "maliyet_birimi": birim,
+            "maliyet_fiyati": round(fiyat, 2),
+        })
+
+    # --- Ürünler + reçeteler ---
+    kategoriler = [(g, k) for g, ks in KATEGORI_GRUPLARI.items() for k in ks]
+    for j in range(urun_sayisi):
+        grup, kategori = kategoriler[j % len(kategoriler)]
+        kalem = int(rng.integers(2, 9))
+        secilen = rng.choice(hammadde_sayisi, size=min(kalem, hammadde_sayisi), replace=False)
+
+        maliyet = 0.0
+        for h_idx in secilen:
+            h = veri.hammaddeler[int(h_idx)]
+            miktar = 1.0 if h["maliyet_birimi"] == "adet" else round(float(rng.uniform(0.02, 0.3)), 3)
+            veri.receteler.append((j, int(h_idx), miktar))
+            maliyet += h["maliyet_fiyati"] * miktar
+
+        # Maliyetin 2-4 katı liste fiyatı, 5 TL'ye yuvarlı
+        fiyat = max(10.0, round(maliyet * float(rng.uniform(2.0, 4.0)) / 5.0) * 5.0)
+        veri.urunler.append({
+            "isim": f"{kategori} {j + 1:04d}",
+            "excel_adi": f"URN-{j + 1:05d}",
+            "mevcut_satis_fiyati": fiyat,
+            "kategori": kategori,
+            "kategori_grubu": grup,
+        })
+
+    # --- Satış geçmişi ---
+    gun_sayisi = max(1, int(round(365 * float(yil))))
+    bitis = bitis or (datetime.now().date() - timedelta(days=1))
+    veri.gunler = [bitis - timedelta(days=gun_sayisi - 1 - d) for d in range(gun_sayisi)]
+    hafta_gunu = np.array([g.weekday() for g in veri.gunler])
+
+    liste_fiyati = np.array([u["mevcut_satis_fiyati"] for u in veri.urunler])
+    taban_talep = rng.gamma(2.0, 6.0, size=urun_sayisi)          # günlük ort. adet
+    esneklik = rng.uniform(-2.2, -0.6, size=urun_sayisi)
+
+    # Fiyat değişiklikleri: her ürün ~60-120 günde bir %±5-15 kayar
+    fiyat_carpani = np.ones((urun_sayisi, gun_sayisi))
+    for j in range(urun_sayisi):
+        d = 0
+        carpan = float(rng.uniform(0.85, 1.0))
+        while d < gun_sayisi:
+            sure = int(rng.integers(60, 121))
+            fiyat_carpani[j, d:d + sure] = carpan
+            carpan = float(np.clip(carpan * rng.uniform(0.95, 1.15), 0.7, 1.3))
+            d += sure
+    # Son dönem liste fiyatıyla bitsin
+    fiyat_carpani[:, -30:] = 1.0
+
+    # Kampanya günleri (%3): %20 indirim
+    kampanya = rng.random((urun_sayisi, gun_sayisi)) < 0.03
+    fiyat_carpani = np.where(kampanya, fiyat_carpani * 0.8, fiyat_carpani)
+
+    fiyatlar = np.round(liste_fiyati[:, None] * fiyat_carpani, 2)
+    beklenen = (
+        taban_talep[:, None]
+        * np.power(fiyat_carpani, esneklik[:, None])
+        * HAFTA_GUNU_CARPANI[hafta_gunu][None, :]
+    )
+    veri.adetler = rng.poisson(beklenen)
+    veri.fiyatlar = fiyatlar
+    return veri
+
+
+def satis_satirlari(veri: SentetikVeri, son_gun: int | None = None, son_gun_haric: int = 0):
+    """
+    (urun_idx, tarih, adet, toplam_tutar) üretir. Sıfır adetli günler atlanır.
+    son_gun: sadece son N gün; son_gun_haric: son N günü dışarıda bırak.
+    """
+    bitis = len(veri.gunler) - int(son_gun_haric or 0)
+    baslangic = 0 if son_gun is None else max(0, bitis - int(son_gun))
+    adet = veri.adetler[:, baslangic:bitis]
+    u_idx, d_idx = np.nonzero(adet)
+    for j, d in zip(u_idx.tolist(), d_idx.tolist()):
+        a = int(adet[j, d])
+        yield j, veri.gunler[baslangic + d], a, round(a * float(veri.fiyatlar[j, baslangic + d]), 2)
+
+
+def veritabanina_yaz(veri: SentetikVeri, son_gun_haric: int = 0, parca: int = 5000) -> dict:
+    """
+    Aktif app context'indeki veritabanına toplu yazar.
+    son_gun_haric: son N günün satışlarını DB'ye yazmaz (upload testi için ayrılır).
+    Dönüş: {'hammadde', 'urun', 'recete', 'satis'} sayıları.
+    """
+    from sqlalchemy import insert
+
+    from database import (
+        db, Hammadde, Urun, Recete, SatisKaydi, guncelle_tum_urun_maliyetleri, satis_ozeti_yenile, varsayilan_sube
+    )
+
+    db.session.execute(insert(Hammadde), veri.hammaddeler)
+    db.session.execute(insert(Urun), [dict(u, hesaplanan_maliyet=0.0) for u in veri.urunler])
+    db.session.flush()
+
+    h_id = dict(db.session.execute(db.select(Hammadde.isim, Hammadde.id)).all())
+    u_id = dict(db.session.execute(db.select(Urun.isim, Urun.id)).all())
+    h_ids = [h_id[h["isim"]] for h in veri.hammaddeler]
+    u_ids = [u_id[u["isim"]] for u in veri.urunler]
+
+    db.session.execute(insert(Recete), [
+        {"urun_id": u_ids[j], "hammadde_id": h_ids[h], "miktar": m}
+        for j, h, m in veri.receteler
+    ])
+    db.session.commit()
+    guncelle_tum_urun_maliyetleri()
+
+    maliyet = dict(db.session.execute(db.select(Urun.id, Urun.hesaplanan_maliyet)).all())
+
+    sube_id = varsayilan_sube().id
+    toplam = 0
+    tampon = []
+    for j, tarih, adet, tutar in satis_satirlari(veri, son_gun_haric=son_gun_haric):
+        uid = u_ids[j]
+        m = float(maliyet.get(uid) or 0.0) * adet
+        tampon.append({
+            "sube_id": sube_id,
+            "urun_id": uid,
+            "tarih": datetime.combine(tarih, datetime.min.time()),
+            "adet": adet,
+            "toplam_tutar": tutar,
+            "hesaplanan_birim_fiyat": tutar / adet,
+            "hesaplanan_maliyet": m,
+            "hesaplanan_kar": tutar - m,
+        })
+        if len(tampon) >= parca:
+            db.session.execute(insert(SatisKaydi), tampon)
+            toplam += len(tampon)
+            tampon = []
+    if tampon:
+        db.session.execute(insert(SatisKaydi), tampon)
+        toplam += len(tampon)
+    satis_ozeti_yenile()
+    db.session.commit()
+
+    return {
+        "hammadde": len(veri.hammaddeler),
+        "urun": len(veri.urunler),
+        "recete": len(veri.receteler),
+        "satis": toplam,
+    }
+
+
+def upload_dosyasi_yaz(veri: SentetikVeri, yol: str, son_gun: int = 7) -> int:
+    """
+    /upload-excel formatında dosya yazar (Urun_Adi, Adet, Toplam_Tutar, Tarih).
+    Uzantı .csv ise CSV, değilse xlsx. Dönüş: satır sayısı.
+    """
+    satirlar = [
+        (veri.urunler[j]["excel_adi"], adet, tutar, tarih.isoformat())
+        for j, tarih, adet, tutar in satis_satirlari(veri, son_gun=son_gun)
+    ]
+    basliklar = ["Urun_Adi", "Adet", "Toplam_Tutar", "Tarih"]
+
+    if yol.lower().endswith(".csv"):
+        with open(yol, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(basliklar)
+            w.writerows(satirlar)
+    else:
+        from openpyxl import Workbook
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Satislar")
+        ws.append(basliklar)
+        for s in satirlar:
+            ws.append(list(s))
+        wb.save(yol)
+    return len(satirlar)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="RestoProfit sentetik veri üretici")
+    ap.add_argument("--hammadde", type=int, default=40)
+    ap.add_argument("--urun", type=int, default=120)
+    ap.add_argument("--yil", type=float, default=1.0)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--db", help="Hedef veritabanı URL'i (örn: sqlite:///bench.db)")
+    ap.add_argument("--upload-gun", type=int, default=7, help="Upload dosyasına yazılacak son N gün")
+    ap.add_argument("--excel", help="Upload için .xlsx çıktısı")
+    ap.add_argument("--csv", help="Upload için .csv çıktısı")
+    args = ap.parse_args(argv)
+
+    veri = uret(args.hammadde, args.urun, args.yil, seed=args.seed)
+    print(f"Üretildi: {len(veri.hammaddeler)} hammadde, {len(veri.urunler)} ürün, "
+          f"{len(veri.receteler)} reçete kalemi, {veri.satis_satiri_sayisi} satış satırı")
+
+    if args.db:
+        import os
+        os.environ["DATABASE_URL"] = args.db
+        from app import create_app
+        from database import db
+        app = create_app()
+        with app.app_context():
+            db.create_all()
+            sayilar = veritabanina_yaz(veri, son_gun_haric=args.upload_gun if (args.excel or args.csv) else 0)
+        print(f"DB'ye yazıldı: {sayilar}")
+
+    if args.excel:
+        print(f"Excel: {args.excel} ({upload_dosyasi_yaz(veri, args.excel, args.upload_gun)} satır)")
+    if args.csv:
+        print(f"CSV: {args.csv} ({upload_dosyasi_yaz(veri, args.csv, args.upload_gun)} satır)")
+
+
+if __name__ == "__main__":
+    main()
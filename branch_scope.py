@@ -0,0 +1,69 @@
+# branch_scope.py — Şube kapsamı (tek kurulum, çok şube)
+#
+# Aktif şube kullanıcının oturumunda tutulur (navbar'daki şube seçici); None = tüm şubeler
+# (merkez / HQ özeti). İstek dışında (CLI, on-hesapla) kapsam `with sube_kapsami(id):` ile verilir.
+# Sorgular kapsamı açıkça uygular:
+#   - sube_filtresi(q, SatisKaydi.sube_id): satış / özet satırları şubeye eşitlenir
+#   - urun_kapsami(q): ortak menü (sube_id NULL) + şubeye özel ürünler
+# Satış tablolarının kompozit index'leri sube_id ile başlar; şube sorgusu tek şubeli bir
+# veritabanındaki kadar satır okur.
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import has_request_context, session as flask_session
+
+from database import db, Sube, Urun
+
+# Flask session çerezinde seçili şube
+_OTURUM_ANAHTARI = "_rp_sube"
+
+# Oturumdan okunur (kapsam açıkça verilmediyse)
+_OTURUMDAN = object()
+_kapsam: ContextVar = ContextVar("sube_kapsami", default=_OTURUMDAN)
+
+
+def aktif_sube_id() -> int | None:
+    """Geçerli şube; None = tüm şubeler."""
+    kapsam = _kapsam.get()
+    if kapsam is not _OTURUMDAN:
+        return kapsam
+    if has_request_context():
+        return flask_session.get(_OTURUM_ANAHTARI)
+    return None
+
+
+def sube_sec(sube_id: int | None) -> None:
+    """Kullanıcının oturumundaki şubeyi değiştirir (None: tüm şubeler)."""
+    if sube_id is None:
+        flask_session.pop(_OTURUM_ANAHTARI, None)
+    else:
+        flask_session[_OTURUM_ANAHTARI] = int(sube_id)
+
+
+@contextmanager
+def sube_kapsami(sube_id: int | None):
+    """Bloğun içindeki sorgular verilen şubeyle (None: tüm şubeler) kapsanır."""
+    token = _kapsam.set(sube_id)
+    try:
+        yield
+    finally:
+        _kapsam.reset(token)
+
+
+def sube_filtresi(sorgu, kolon):
+    """Query / Select'i aktif şubeye süzer; tüm şubelerde sorgu aynen döner."""
+    sube_id = aktif_sube_id()
+    return sorgu if sube_id is None else sorgu.filter(kolon == sube_id)
+
+
+def urun_kapsami(sorgu, model=Urun):
+    """Aktif şubenin menüsü: ortak ürünler + şubeye özel ürünler."""
+    sube_id = aktif_sube_id()
+    if sube_id is None:
+        return sorgu
+    return sorgu.filter(db.or_(model.sube_id.is_(None), model.sube_id == sube_id))
+
+
+def subeler() -> list[Sube]:
+    return db.session.scalars(db.select(Sube).order_by(Sube.isim)).all()
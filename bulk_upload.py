@@ -0,0 +1,199 @@
+# bulk_upload.py — Çok dosyalı / ZIP satış yüklemesi (kasa başına günlük dosyalar)
+#
+# Dosyalar (ZIP içindekiler açılarak) bir süreç havuzunda paralel ayrıştırılır: Excel okuma ve
+# satır doğrulama CPU işidir, worker'lar veritabanına dokunmaz. Ana süreç sonuçları birleştirir,
+# tekrarları ayıklar ve tüm satışları tek toplu transaction'da yazar.
+# Tekrar kuralları:
+#   - içeriği aynı dosya (aynı dosya hem tek başına hem ZIP içinde gelmiş) bir kez işlenir
+#   - saatli (00:00 olmayan) ve ürün/adet/tutar/tarihi aynı satır farklı dosyalarda tekrar ediyorsa
+#     bir kez yazılır; sadece gün içeren satırlar kasalar arasında ayırt edilemediği için korunur
+# Havuz süreç başına bir kez kurulur (spawn: worker'lar Flask/SQLAlchemy durumunu devralmaz).
+
+import hashlib
+import io
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+from value_parsing import safe_int, parse_decimal
+
+EXCEL_UZANTILARI = (".xlsx", ".xls")
+GEREKLI_KOLONLAR = ("Urun_Adi", "Adet", "Toplam_Tutar", "Tarih")
+
+# ZIP bombası / aşırı yüke karşı sınırlar
+MAKS_DOSYA = 200
+MAKS_ACILMIS_BOYUT = 64 * 1024 * 1024
+
+_havuz = None
+_havuz_boyutu = 0
+_havuz_kilidi = threading.Lock()
+
+
+class DosyaSonucu:
+    """Tek bir dosyanın ayrıştırma sonucu (worker'dan pickle ile döner)."""
+
+    def __init__(self, ad: str):
+        self.ad = ad
+        self.kayitlar: list[tuple] = []      # (urun_id, tarih, adet, toplam_tutar)
+        self.taninmayan: set[str] = set()
+        self.hatali_satirlar: list[int] = []
+        self.hata: str | None = None
+        # Birleştirme sonrası (ana süreç)
+        self.kabul = 0
+        self.tekrar = 0
+        self.ayni_dosya: str | None = None
+
+
+def dosyalari_topla(yuklenenler) -> tuple[list[tuple[str, bytes]], list[DosyaSonucu]]:
+    """
+    Yüklenen dosyaları (FileStorage) Excel içeriklerine açar; ZIP'ler içindeki Excel'lerle değiştirilir.
+    Dönüş: ([(ad, içerik)], [reddedilen dosya sonuçları])
+    """
+    dosyalar, reddedilen = [], []
+    toplam = 0
+
+    def reddet(ad, mesaj):
+        s = DosyaSonucu(ad)
+        s.hata = mesaj
+        reddedilen.append(s)
+
+    def sigar_mi(boyut) -> bool:
+        return len(dosyalar) < MAKS_DOSYA and toplam + boyut <= MAKS_ACILMIS_BOYUT
+
+    sinir_mesaji = f"Yükleme sınırı aşıldı (en fazla {MAKS_DOSYA} dosya / {MAKS_ACILMIS_BOYUT // (1024 * 1024)} MB)."
+    for f in yuklenenler:
+        ad = f.filename or ""
+        if not ad:
+            continue
+        kucuk = ad.lower()
+        if kucuk.endswith(".zip"):
+            try:
+                with zipfile.ZipFile(io.BytesIO(f.read())) as z:
+                    for bilgi in z.infolist():
+                        uye = bilgi.filename
+                        if bilgi.is_dir() or uye.startswith("__MACOSX/") or not uye.lower().endswith(EXCEL_UZANTILARI):
+                            continue
+                        # Açılmış boyut okunmadan (ZIP başlığından) kontrol edilir
+                        if not sigar_mi(bilgi.file_size):
+                            reddet(f"{ad}/{uye}", sinir_mesaji)
+                            continue
+                        icerik = z.read(bilgi)
+                        toplam += len(icerik)
+                        dosyalar.append((f"{ad}/{uye}", icerik))
+            except zipfile.BadZipFile:
+                reddet(ad, "Geçersiz ZIP dosyası.")
+        elif kucuk.endswith(EXCEL_UZANTILARI):
+            icerik = f.read()
+            if not sigar_mi(len(icerik)):
+                reddet(ad, sinir_mesaji)
+                continue
+            toplam += len(icerik)
+            dosyalar.append((ad, icerik))
+        else:
+            reddet(ad, "Desteklenmeyen dosya türü (.xlsx / .xls / .zip).")
+    return dosyalar, reddedilen
+
+
+def dosya_ayristir(ad: str, icerik: bytes, eslestirme: dict[str, int]) -> DosyaSonucu:
+    """
+    Tek dosyayı okur ve satırları doğrular; tek dosya (upload_excel) ve toplu yükleme aynı kuralları
+    buradan kullanır. Toplu yüklemede worker süreçte çalışır.
+    """
+    import numpy as np
+    import pandas as pd
+
+    sonuc = DosyaSonucu(ad)
+    try:
+        df = pd.read_excel(io.BytesIO(icerik))
+    except Exception as e:
+        sonuc.hata = f"Dosya okunamadı: {e}"
+        return sonuc
+
+    eksik = [k for k in GEREKLI_KOLONLAR if k not in df.columns]
+    if eksik:
+        sonuc.hata = f"Eksik kolon(lar): {', '.join(eksik)}"
+        return sonuc
+
+    # Kolon bazında çeviri biçimi ilk değerden çıkarır; karışık biçimde (saatli / saatsiz)
+    # düşen değerler tek tek yeniden denenir (upload_excel'in satır bazlı sonucuyla aynı)
+    tarihler = pd.to_datetime(df["Tarih"], errors="coerce")
+    for idx in np.flatnonzero(tarihler.isna().to_numpy() & df["Tarih"].notna().to_numpy()):
+        tarihler.iat[idx] = pd.to_datetime(df["Tarih"].iat[idx], errors="coerce")
+
+    for idx, (urun_adi, adet, tutar, tarih) in enumerate(zip(df["Urun_Adi"], df["Adet"], df["Toplam_Tutar"], tarihler)):
+        excel_adi = str(urun_adi).strip()
+        adet = safe_int(adet)
+        tutar = parse_decimal(tutar)
+        if excel_adi == "" or adet is None or adet <= 0 or tutar is None or tutar < 0 or pd.isna(tarih):
+            sonuc.hatali_satirlar.append(idx + 2)
+            continue
+        urun_id = eslestirme.get(excel_adi)
+        if not urun_id:
+            sonuc.taninmayan.add(excel_adi)
+            continue
+        sonuc.kayitlar.append((urun_id, tarih.to_pydatetime(), adet, tutar))
+    return sonuc
+
+
+def _havuz_al(isci: int):
+    global _havuz, _havuz_boyutu
+    with _havuz_kilidi:
+        if _havuz is None or _havuz_boyutu != isci:
+            if _havuz is not None:
+                _havuz.shutdown(wait=False)
+            _havuz = ProcessPoolExecutor(max_workers=isci, mp_context=get_context("spawn"))
+            _havuz_boyutu = isci
+        return _havuz
+
+
+def _havuzu_sifirla():
+    global _havuz
+    with _havuz_kilidi:
+        if _havuz is not None:
+            _havuz.shutdown(wait=False, cancel_futures=True)
+        _havuz = None
+
+
+def paralel_ayristir(dosyalar: list[tuple[str, bytes]], eslestirme: dict[str, int], isci: int) -> list[DosyaSonucu]:
+    """Dosyaları süreç havuzunda ayrıştırır (sıra korunur); tek dosya / isci<=1 ise aynı süreçte."""
+    if isci <= 1 or len(dosyalar) <= 1:
+        return [dosya_ayristir(ad, icerik, eslestirme) for ad, icerik in dosyalar]
+
+    havuz = _havuz_al(isci)
+    try:
+        isler = [havuz.submit(dosya_ayristir, ad, icerik, eslestirme) for ad, icerik in dosyalar]
+        return [i.result() for i in isler]
+    except BrokenProcessPool:
+        # Worker öldüyse (bellek vb.) havuz yeniden kurulur; bu istek sırayla tamamlanır
+        _havuzu_sifirla()
+        return [dosya_ayristir(ad, icerik, eslestirme) for ad, icerik in dosyalar]
+
+
+def birlestir(dosyalar: list[tuple[str, bytes]], sonuclar: list[DosyaSonucu]) -> list[tuple]:
+    """
+    Sonuçları dosya sırasıyla birleştirir, tekrarları ayıklar ve dosya sayaçlarını doldurur.
+    Dönüş: yazılacak (urun_id, tarih, adet, toplam_tutar) kayıtları.
+    """
+    gorulen_icerik: dict[str, str] = {}
+    gorulen_satir: dict[tuple, int] = {}  # saatli satır -> ilk görüldüğü dosyanın sırası
+    yazilacak = []
+    for sira, ((_, icerik), s) in enumerate(zip(dosyalar, sonuclar)):
+        ozet = hashlib.sha256(icerik).hexdigest()
+        if ozet in gorulen_icerik:
+            s.ayni_dosya = gorulen_icerik[ozet]
+            s.tekrar = len(s.kayitlar)
+            continue
+        gorulen_icerik[ozet] = s.ad
+
+        for kayit in s.kayitlar:
+            tarih = kayit[1]
+            if tarih.hour or tarih.minute or tarih.second or tarih.microsecond:
+                ilk = gorulen_satir.setdefault(kayit, sira)
+                if ilk != sira:
+                    s.tekrar += 1
+                    continue
+            yazilacak.append(kayit)
+            s.kabul += 1
+    return yazilacak
@@ -0,0 +1,98 @@
+# catalog_cache.py — Ürün referans verisi önbelleği (id / isim / excel_adi / maliyet / kategori / grup)
+#
+# reports() listeleri, upload_excel eşleştirmesi ve analiz motorlarının ürün aramaları
+# aynı süreç içi önbelleği paylaşır. Geçerlilik, veri_surumleri tablosundaki 'katalog'
+# sayacıyla kontrol edilir: ürün/reçete/maliyet değişiklikleri sayacı artırır, her worker
+# bir sonraki okumada kataloğu tek sorguyla yeniden kurar.
+# katalog() aktif şubenin menüsünü (ortak + şubeye özel ürünler) döndürür; şube görünümleri
+# aynı anlık görüntüden türetilir ve onunla birlikte geçersizleşir.
+
+import threading
+from collections import namedtuple
+
+from flask import g, has_request_context
+
+from branch_scope import aktif_sube_id
+from database import db, Urun, KATALOG_SURUMU, surum_oku
+
+UrunRef = namedtuple(
+    "UrunRef",
+    "id isim excel_adi mevcut_satis_fiyati kategori kategori_grubu hesaplanan_maliyet sube_id"
+)
+
+
+class KatalogReferansi:
+    """Belirli bir katalog sürümünün değişmez anlık görüntüsü."""
+
+    def __init__(self, surum: int, urunler: list[UrunRef]):
+        self.surum = surum
+        self.urunler = urunler
+        self.by_id = {u.id: u for u in urunler}
+        self.by_isim = {u.isim: u for u in urunler}
+        self.by_excel_adi = {u.excel_adi: u for u in urunler}
+        self.urun_isimleri = sorted(self.by_isim)
+        self.kategoriler = sorted({u.kategori for u in urunler if u.kategori})
+        self.gruplar = sorted({u.kategori_grubu for u in urunler if u.kategori_grubu})
+        self._sube_gorunumleri: dict[int, "KatalogReferansi"] = {}
+
+    def urun(self, isim: str) -> UrunRef | None:
+        return self.by_isim.get(isim)
+
+    def sube_gorunumu(self, sube_id: int | None) -> "KatalogReferansi":
+        """Şubenin menüsü (ortak + şubeye özel); None tüm kataloğu döndürür."""
+        if sube_id is None:
+            return self
+        gorunum = self._sube_gorunumleri.get(sube_id)
+        if gorunum is None:
+            gorunum = KatalogReferansi(self.surum, [u for u in self.urunler if u.sube_id in (None, sube_id)])
+            self._sube_gorunumleri[sube_id] = gorunum
+        return gorunum
+
+
+_kilit = threading.Lock()
+# Veritabanı URL'i -> görüntü (aynı süreçte birden fazla app/DB olabilir: benchmark vb.)
+_onbellek: dict[str, KatalogReferansi] = {}
+
+
+def _guncel_surum() -> int:
+    # Bir istek boyunca sürüm satırını en fazla bir kez oku
+    if has_request_context():
+        if "_katalog_surumu" not in g:
+            g._katalog_surumu = surum_oku(KATALOG_SURUMU)
+        return g._katalog_surumu
+    return surum_oku(KATALOG_SURUMU)
+
+
+def _yukle(surum: int) -> KatalogReferansi:
+    rows = db.session.execute(
+        db.select(
+            Urun.id, Urun.isim, Urun.excel_adi, Urun.mevcut_satis_fiyati,
+            Urun.kategori, Urun.kategori_grubu, Urun.hesaplanan_maliyet, Urun.sube_id
+        )
+    ).all()
+    return KatalogReferansi(surum, [
+        UrunRef(
+            int(r.id), r.isim, r.excel_adi, float(r.mevcut_satis_fiyati or 0.0),
+            r.kategori, r.kategori_grubu, float(r.hesaplanan_maliyet or 0.0), r.sube_id
+        )
+        for r in rows
+    ])
+
+
+def katalog(tum_subeler: bool = False) -> KatalogReferansi:
+    """
+    Güncel katalog görüntüsü (aktif şubenin menüsü); sürüm değişmediyse DB'ye gitmez.
+    tum_subeler=True: şubeden bağımsız tüm ürünler (isim benzersizliği, toplu içe aktarım).
+    """
+    # Sürüm, veriden ÖNCE okunur: yarışta en kötü ihtimal fazladan bir yeniden yükleme
+    surum = _guncel_surum()
+    anahtar = str(db.engine.url)
+    ref = _onbellek.get(anahtar)
+    if ref is None or ref.surum != surum:
+        with _kilit:
+            ref = _onbellek.get(anahtar)
+            if ref is None or ref.surum != surum:
+                ref = _yukle(surum)
+                _onbellek[anahtar] = ref
+    return ref if tum_subeler else ref.sube_gorunumu(aktif_sube_id())
+
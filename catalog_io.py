@@ -0,0 +1,170 @@
+# catalog_io.py — Hammadde / ürün kataloğunun toplu içe ve dışa aktarımı
+#
+# İçe aktarma: dosya (pandas DataFrame) mevcut kayıtlarla bellekte karşılaştırılır,
+# sadece yeni ve değişen satırlar toplu upsert ile yazılır (isim anahtardır).
+# Fiyatı değişen hammaddeler için tek bir maliyet yeniden hesabı yapılır; commit çağırana aittir.
+# Dosyada olmayan kayıtlar silinmez.
+# Dışa aktarma: aynı kolonlarla satır satır üretilir (export_stream ile CSV / XLSX).
+
+from database import (
+    db, Hammadde, Urun, toplu_upsert, guncelle_tum_urun_maliyetleri, surum_artir, KATALOG_SURUMU
+)
+
+# tür -> (dosya kolonları, model kolonları)
+KOLONLAR = {
+    "hammadde": (
+        ("Isim", "Birim", "Fiyat"),
+        ("isim", "maliyet_birimi", "maliyet_fiyati"),
+    ),
+    "urun": (
+        ("Isim", "Excel_Adi", "Fiyat", "Kategori", "Grup"),
+        ("isim", "excel_adi", "mevcut_satis_fiyati", "kategori", "kategori_grubu"),
+    ),
+}
+_MODELLER = {"hammadde": Hammadde, "urun": Urun}
+_FIYAT_KOLONU = {"hammadde": "maliyet_fiyati", "urun": "mevcut_satis_fiyati"}
+
+# Dışa aktarımda DB'den tek seferde okunan satır sayısı
+_PARCA = 500
+
+
+class KatalogFarki:
+    """Dosya ile veritabanı arasındaki fark (henüz yazılmamış)."""
+
+    def __init__(self, tur: str):
+        self.tur = tur
+        self.eklenecek: list[dict] = []
+        self.guncellenecek: list[dict] = []
+        self.degismeyen = 0
+        self.hatali_satirlar: list[int] = []
+        self.cakismalar: list[str] = []
+        # Fiyatı değişen mevcut hammaddeler (maliyet hesabı için)
+        self.fiyati_degisen_ids: list[int] = []
+
+    @property
+    def bos(self) -> bool:
+        return not self.eklenecek and not self.guncellenecek
+
+
+def _metin(v) -> str:
+    # NaN kendisine eşit değildir (pandas boş hücre)
+    if v is None or v != v:
+        return ""
+    return str(v).strip()
+
+
+def _sayi(v):
+    s = _metin(v)
+    if not s:
+        return None
+    try:
+        return float(s.replace(",", "."))
+    except ValueError:
+        return None
+
+
+def eksik_kolonlar(tur: str, df) -> list[str]:
+    return [k for k in KOLONLAR[tur][0] if k not in df.columns]
+
+
+def katalog_farki(tur: str, df) -> KatalogFarki:
+    """DataFrame'i mevcut kayıtlarla karşılaştırır (tek okuma sorgusu)."""
+    dosya_kolonlari, model_kolonlari = KOLONLAR[tur]
+    model = _MODELLER[tur]
+    fiyat_kolonu = _FIYAT_KOLONU[tur]
+    fark = KatalogFarki(tur)
+
+    mevcut = {
+        r.isim: r
+        for r in db.session.execute(
+            db.select(model.id, *[getattr(model, k) for k in model_kolonlari])
+        )
+    }
+
+    gorulen = set()
+    dosya_satirlari = []
+    for idx, degerler in enumerate(zip(*[df[k] for k in dosya_kolonlari])):
+        satir = {}
+        for k, v in zip(model_kolonlari, degerler):
+            satir[k] = _sayi(v) if k == fiyat_kolonu else _metin(v)
+
+        if not all(satir.values()) or satir[fiyat_kolonu] <= 0 or satir["isim"] in gorulen:
+            fark.hatali_satirlar.append(idx + 2)
+            continue
+        gorulen.add(satir["isim"])
+        dosya_satirlari.append(satir)
+
+    if tur == "urun":
+        dosya_satirlari = _excel_adi_cakismalari(dosya_satirlari, mevcut, fark)
+
+    for satir in dosya_satirlari:
+        eski = mevcut.get(satir["isim"])
+        if eski is None:
+            fark.eklenecek.append(satir)
+            continue
+        if all(_esit(getattr(eski, k), satir[k]) for k in model_kolonlari):
+            fark.degismeyen += 1
+            continue
+        fark.guncellenecek.append(satir)
+        if tur == "hammadde" and not _esit(eski.maliyet_fiyati, satir["maliyet_fiyati"]):
+            fark.fiyati_degisen_ids.append(eski.id)
+
+    return fark
+
+
+def _esit(a, b) -> bool:
+    if isinstance(b, float):
+        return a is not None and abs(float(a) - b) < 1e-9
+    return (a or "") == b
+
+
+def _excel_adi_cakismalari(satirlar: list[dict], mevcut: dict, fark: KatalogFarki) -> list[dict]:
+    """Yükleme sonrası excel_adi benzersiz kalmalı; çakışan dosya satırları atlanır."""
+    son_durum = {isim: r.excel_adi for isim, r in mevcut.items()}
+    son_durum.update({s["isim"]: s["excel_adi"] for s in satirlar})
+
+    sahipler: dict[str, list[str]] = {}
+    for isim, excel_adi in son_durum.items():
+        sahipler.setdefault(excel_adi, []).append(isim)
+
+    temiz = []
+    for s in satirlar:
+        if len(sahipler[s["excel_adi"]]) > 1:
+            digerleri = ", ".join(i for i in sahipler[s["excel_adi"]] if i != s["isim"])
+            fark.cakismalar.append(f"{s['isim']} (Excel adı '{s['excel_adi']}' → {digerleri})")
+            continue
+        temiz.append(s)
+    return temiz
+
+
+def katalog_uygula(fark: KatalogFarki) -> None:
+    """Farkı toplu upsert ile yazar; gerekiyorsa maliyetleri bir kez yeniden hesaplar."""
+    if fark.bos:
+        return
+
+    model_kolonlari = KOLONLAR[fark.tur][1]
+    toplu_upsert(
+        _MODELLER[fark.tur],
+        fark.eklenecek + fark.guncellenecek,
+        anahtar_kolonlar=["isim"],
+        guncellenecek=[k for k in model_kolonlari if k != "isim"],
+    )
+
+    if fark.tur == "urun":
+        # Satış fiyatı/kategori maliyeti etkilemez; sadece katalog önbelleği yenilenir
+        surum_artir(KATALOG_SURUMU)
+    elif fark.fiyati_degisen_ids:
+        db.session.expire_all()
+        guncelle_tum_urun_maliyetleri(commit=False, hammadde_ids=fark.fiyati_degisen_ids)
+
+
+def katalog_satirlari(tur: str):
+    """Kataloğu dosya kolon sırasıyla, isme göre sıralı üretir (dışa aktarım için)."""
+    model = _MODELLER[tur]
+    sonuc = db.session.execute(
+        db.select(*[getattr(model, k) for k in KOLONLAR[tur][1]])
+          .order_by(model.isim)
+          .execution_options(yield_per=_PARCA)
+    )
+    for satir in sonuc:
+        yield tuple(satir)
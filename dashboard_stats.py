@@ -0,0 +1,124 @@
+# dashboard_stats.py — Dashboard ürün istatistikleri ve öneriler
+# Ağır kütüphane (pandas/sklearn) kullanmaz; hem app.py hem de
+# analiz/benchmark araçları tarafından doğrudan çağrılabilir.
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+from branch_scope import sube_filtresi
+from database import db, Sube, Urun, SatisKaydi, replika_okuma
+
+
+def _product_stats_last_days(days: int = 30):
+    """
+    Son X gün satışlarına göre ürün bazında:
+    - toplam ciro, toplam kâr, toplam adet
+    - marj % = (toplam_kâr / toplam_ciro) * 100
+    Aktif şubenin satışları (tüm şubelerde: toplam).
+    """
+    days = max(1, min(int(days or 30), 3650))
+    since_dt = datetime.now() - timedelta(days=days)
+
+    with replika_okuma():
+        rows = sube_filtresi(
+            db.session.query(
+                Urun.id.label("urun_id"),
+                Urun.isim.label("urun_adi"),
+                func.coalesce(func.sum(SatisKaydi.toplam_tutar), 0.0).label("ciro"),
+                func.coalesce(func.sum(SatisKaydi.hesaplanan_kar), 0.0).label("kar"),
+                func.coalesce(func.sum(SatisKaydi.adet), 0).label("adet"),
+                func.coalesce(func.max(Urun.hesaplanan_maliyet), 0.0).label("urun_maliyet"),
+            )
+            .join(SatisKaydi, SatisKaydi.urun_id == Urun.id)
+            .filter(SatisKaydi.tarih >= since_dt),
+            SatisKaydi.sube_id,
+        ).group_by(Urun.id, Urun.isim).having(func.sum(SatisKaydi.toplam_tutar) > 0).all()
+
+    out = []
+    for r in rows:
+        ciro = float(r.ciro or 0.0)
+        kar = float(r.kar or 0.0)
+        adet = int(r.adet or 0)
+        marj = (kar / ciro * 100.0) if ciro > 0 else 0.0
+        out.append({
+            "urun_id": int(r.urun_id),
+            "urun_adi": r.urun_adi,
+            "ciro": ciro,
+            "kar": kar,
+            "adet": adet,
+            "marj": float(marj),
+            "urun_maliyet": float(r.urun_maliyet or 0.0),
+        })
+    return out
+
+
+def _branch_stats_last_days(days: int = 30):
+    """
+    Merkez özeti: son X günde şube bazında ciro / kâr / adet / marj (ciroya göre sıralı).
+    Satışı olmayan şubeler de 0 ile listelenir.
+    """
+    days = max(1, min(int(days or 30), 3650))
+    since_dt = datetime.now() - timedelta(days=days)
+
+    with replika_okuma():
+        rows = (
+            db.session.query(
+                Sube.id.label("sube_id"),
+                Sube.isim.label("sube_adi"),
+                func.coalesce(func.sum(SatisKaydi.toplam_tutar), 0.0).label("ciro"),
+                func.coalesce(func.sum(SatisKaydi.hesaplanan_kar), 0.0).label("kar"),
+                func.coalesce(func.sum(SatisKaydi.adet), 0).label("adet"),
+            )
+            .outerjoin(SatisKaydi, db.and_(SatisKaydi.sube_id == Sube.id, SatisKaydi.tarih >= since_dt))
+            .group_by(Sube.id, Sube.isim)
+            .all()
+        )
+
+    out = []
+    for r in rows:
+        ciro, kar = float(r.ciro or 0.0), float(r.kar or 0.0)
+        out.append({
+            "sube_id": int(r.sube_id),
+            "sube_adi": r.sube_adi,
+            "ciro": ciro,
+            "kar": kar,
+            "adet": int(r.adet or 0),
+            "marj": (kar / ciro * 100.0) if ciro > 0 else 0.0,
+        })
+    return sorted(out, key=lambda x: x["ciro"], reverse=True)
+
+
+def _top_bottom_products_by_margin(stats, limit: int = 3):
+    """
+    Hazır stats listesinden en iyi/en kötü ürünleri seçer.
+    Sıralama: marj, sonra kar
+    """
+    limit = max(1, min(int(limit or 3), 20))
+    best = sorted(stats, key=lambda x: (x["marj"], x["kar"]), reverse=True)[:limit]
+    worst = sorted(stats, key=lambda x: (x["marj"], x["kar"]))[:limit]
+    return best, worst
+
+
+def _build_insights(stats, days_window: int):
+    """
+    Dashboard "Bugün Ne Yapmalıyım?" önerileri.
+    Zarar / düşük marj / maliyet yok kuralları burada değil, kalıcı uyarılarda (alerts.py) tutulur.
+    """
+    insights = []
+    if not stats:
+        return [{
+            "type": "info",
+            "text": f"Son {days_window} günde satış verisi yok. Excel yüklediğinde burada öneriler çıkacak."
+        }]
+
+    # En çok kâr getiren ürün
+    top_profit = sorted(stats, key=lambda x: x["kar"], reverse=True)
+    if top_profit and top_profit[0]["kar"] > 0:
+        x = top_profit[0]
+        insights.append({
+            "type": "success",
+            "text": f"✅ {x['urun_adi']} son {days_window} günde en çok kâr getiren ürün (Kâr: {x['kar']:.2f} TL, Marj: %{x['marj']:.1f}). Öne çıkar / stok planla."
+        })
+
+    return insights
@@ -1,12 +1,21 @@
 # database.py — RestoProfit veri katmanı (Flask-SQLAlchemy 3.x / SQLAlchemy 2.x uyumlu)
 
+import math
 import os
-from datetime import datetime
+import weakref
+from collections import defaultdict, deque
+from datetime import datetime, date
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import func, inspect, text
 from sqlalchemy.orm import relationship, backref
 
+from replica_routing import REPLICA_BIND, YonlendirmeliSession, replika_okuma
+from slow_query_log import init_slow_query_log
+from sqlite_tuning import init_sqlite_tuning
+
 # SQLAlchemy nesnesi (app.py içinde init_db ile app'e bağlanacağız)
-db = SQLAlchemy()
+# Session: replika_okuma() bloklarındaki okumaları opsiyonel replikaya yönlendirir
+db = SQLAlchemy(session_options={"class_": YonlendirmeliSession})
 
 
 def _normalize_db_url(url: str | None) -> str | None:
@@ -18,6 +27,23 @@ def _normalize_db_url(url: str | None) -> str | None:
     return url
 
 
+# fork sonrası havuzu sıfırlanacak engine'ler (gunicorn --preload)
+_fork_engineleri = weakref.WeakSet()
+
+
+def _fork_sonrasi_havuzlari_birak():
+    """
+    Child süreçte çalışır: master'dan kalan bağlantılar paylaşılmasın diye havuzu
+    bırakır. close=False -> parent'ın soketlerine dokunmaz, sadece referansları atar.
+    """
+    for engine in list(_fork_engineleri):
+        engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_fork_sonrasi_havuzlari_birak)
+
+
 def init_db(app):
     """
     Uygulama başlatılırken çağrılır.
@@ -31,8 +57,30 @@ def init_db(app):
     app.config["SQLALCHEMY_DATABASE_URI"] = db_url
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+    # Opsiyonel read-replica: analitik/dashboard okumaları (bkz. replica_routing.py)
+    replica_url = _normalize_db_url(os.environ.get("DATABASE_URL_REPLICA"))
+    if replica_url:
+        app.config.setdefault("SQLALCHEMY_BINDS", {})[REPLICA_BIND] = replica_url
+    app.config.setdefault("REPLICA_STICKY_SECONDS", float(os.environ.get("REPLICA_STICKY_SECONDS") or 10))
+
+    # Yavaş sorgu kaydı (opsiyonel): SLOW_QUERY_MS=200 gibi
+    app.config.setdefault("SLOW_QUERY_MS", float(os.environ.get("SLOW_QUERY_MS") or 0))
+    app.config.setdefault("SLOW_QUERY_LOG", os.environ.get("SLOW_QUERY_LOG", "logs/slow_queries.log"))
+
+    # SQLite performans profili (tek sunuculu kurulumlar): SQLITE_TUNED=0 ile kapatılır
+    app.config.setdefault("SQLITE_TUNED", os.environ.get("SQLITE_TUNED", "1") != "0")
+    app.config.setdefault("SQLITE_BUSY_TIMEOUT_MS", int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS") or 5000))
+    app.config.setdefault("SQLITE_MMAP_MB", int(os.environ.get("SQLITE_MMAP_MB") or 256))
+    app.config.setdefault("SQLITE_CACHE_MB", int(os.environ.get("SQLITE_CACHE_MB") or 64))
+    app.config.setdefault("SQLITE_OPTIMIZE_INTERVAL", float(os.environ.get("SQLITE_OPTIMIZE_INTERVAL") or 3600))
+
     db.init_app(app)
 
+    with app.app_context():
+        _fork_engineleri.update(db.engines.values())
+        init_sqlite_tuning(app, db.engines.values())
+        init_slow_query_log(app, db.engines.values())
+
 
 # -------------------------
 # Modeller
@@ -58,6 +106,20 @@ class User(db.Model):
         return str(self.id)
 
 
+class Sube(db.Model):
+    """
+    Şube (restoran). Satış kayıtları her zaman bir şubeye aittir; ürünler ortak menüde
+    (sube_id NULL) veya tek bir şubeye özel olabilir. Hammadde ve reçeteler ortaktır.
+    """
+    __tablename__ = "subeler"
+
+    id = db.Column(db.Integer, primary_key=True)
+    isim = db.Column(db.String(120), unique=True, nullable=False)
+
+    def __repr__(self):
+        return f"<Sube {self.isim}>"
+
+
 class Hammadde(db.Model):
     __tablename__ = "hammaddeler"
 
@@ -87,9 +149,24 @@ class Urun(db.Model):
     # Reçeteden hesaplanan toplam ürün maliyeti (TL)
     hesaplanan_maliyet = db.Column(db.Float, nullable=False, default=0.0)
 
+    # NULL: tüm şubelerin menüsünde; dolu: sadece o şubede satılır
+    sube_id = db.Column(db.Integer, db.ForeignKey("subeler.id"), nullable=True, index=True)
+
     # İlişkiler
+    sube = relationship("Sube")
     receteler = relationship("Recete", back_populates="urun", cascade="all, delete-orphan")
+    # Bu ürünün içindeki ara ürünler (sos, hamur...) / bu ürünü ara ürün olarak kullananlar
+    alt_receteler = relationship(
+        "AltRecete", foreign_keys="AltRecete.urun_id",
+        back_populates="urun", cascade="all, delete-orphan"
+    )
+    kullanildigi_receteler = relationship(
+        "AltRecete", foreign_keys="AltRecete.alt_urun_id",
+        back_populates="alt_urun", cascade="all, delete-orphan"
+    )
     satis_kayitlari = relationship("SatisKaydi", back_populates="urun", cascade="all, delete-orphan")
+    satis_ozetleri = relationship("GunlukSatisOzeti", back_populates="urun", cascade="all, delete-orphan")
+    uyarilar = relationship("Uyari", back_populates="urun", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<Urun {self.isim} ({self.kategori}/{self.kategori_grubu})>"
@@ -118,10 +195,37 @@ class Recete(db.Model):
         return f"<Recete urun={self.urun_id} hammadde={self.hammadde_id} miktar={self.miktar}>"
 
 
+class AltRecete(db.Model):
+    """
+    Alt reçete: bir ürünün içinde başka bir ürünün (ara ürün) kullanılması.
+    Örn: Burger -> 0.05 x 'Burger Sosu'. miktar, alt ürünün porsiyonu cinsindendir;
+    alt ürünün hesaplanan_maliyet'i 1 porsiyonun maliyetidir.
+    """
+    __tablename__ = "alt_receteler"
+
+    id = db.Column(db.Integer, primary_key=True)
+    urun_id = db.Column(db.Integer, db.ForeignKey("urunler.id", ondelete="CASCADE"), nullable=False, index=True)
+    alt_urun_id = db.Column(db.Integer, db.ForeignKey("urunler.id", ondelete="CASCADE"), nullable=False, index=True)
+    miktar = db.Column(db.Float, nullable=False, default=0.0)
+
+    # İlişkiler
+    urun = relationship("Urun", foreign_keys=[urun_id], back_populates="alt_receteler")
+    alt_urun = relationship("Urun", foreign_keys=[alt_urun_id], back_populates="kullanildigi_receteler")
+
+    __table_args__ = (
+        db.UniqueConstraint("urun_id", "alt_urun_id", name="uq_alt_recete_urun_alt"),
+        db.CheckConstraint("urun_id <> alt_urun_id", name="ck_alt_recete_kendisi_degil"),
+    )
+
+    def __repr__(self):
+        return f"<AltRecete urun={self.urun_id} alt_urun={self.alt_urun_id} miktar={self.miktar}>"
+
+
 class SatisKaydi(db.Model):
     __tablename__ = "satis_kayitlari"
 
     id = db.Column(db.Integer, primary_key=True)
+    sube_id = db.Column(db.Integer, db.ForeignKey("subeler.id"), nullable=False)
     urun_id = db.Column(db.Integer, db.ForeignKey("urunler.id", ondelete="CASCADE"), nullable=False, index=True)
     tarih = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     adet = db.Column(db.Integer, nullable=False, default=0)
@@ -134,42 +238,474 @@ class SatisKaydi(db.Model):
 
     urun = relationship("Urun", back_populates="satis_kayitlari")
 
+    __table_args__ = (
+        # Şube kapsamlı sorgular (dashboard penceresi, günlük silme, analizler) şube ile başlar
+        db.Index("ix_satis_sube_tarih", "sube_id", "tarih"),
+        db.Index("ix_satis_sube_urun_tarih", "sube_id", "urun_id", "tarih"),
+    )
+
     def __repr__(self):
-        return f"<SatisKaydi urun={self.urun_id} tarih={self.tarih} adet={self.adet}>"
+        return f"<SatisKaydi sube={self.sube_id} urun={self.urun_id} tarih={self.tarih} adet={self.adet}>"
+
+
+class GunlukSatisOzeti(db.Model):
+    """
+    Şube × ürün × gün × fiyat bucket'ı başına satış özeti: talep modelinin yeterli istatistikleri.
+    Bucket başına gün sayısı = satır sayısı, toplam adet = SUM(toplam_adet); pencere (son N gün)
+    gün kolonu üzerinden süzülür. upload_excel artırır, delete_sales_by_date siler;
+    `flask satis-ozeti-yenile` satış kayıtlarından baştan kurar.
+    """
+    __tablename__ = "gunluk_satis_ozetleri"
+
+    id = db.Column(db.Integer, primary_key=True)
+    sube_id = db.Column(db.Integer, db.ForeignKey("subeler.id"), nullable=False)
+    urun_id = db.Column(db.Integer, db.ForeignKey("urunler.id", ondelete="CASCADE"), nullable=False, index=True)
+    gun = db.Column(db.Date, nullable=False, index=True)
+    fiyat_bucket = db.Column(db.Float, nullable=False)
+    toplam_adet = db.Column(db.Integer, nullable=False, default=0)
+    kayit_sayisi = db.Column(db.Integer, nullable=False, default=0)
+
+    urun = relationship("Urun", back_populates="satis_ozetleri")
+
+    __table_args__ = (
+        db.UniqueConstraint("sube_id", "urun_id", "gun", "fiyat_bucket", name="uq_gunluk_ozet_sube_urun_gun_fiyat"),
+        db.Index("ix_gunluk_ozet_sube_gun", "sube_id", "gun"),
+    )
+
+    def __repr__(self):
+        return f"<GunlukSatisOzeti sube={self.sube_id} urun={self.urun_id} gun={self.gun} fiyat={self.fiyat_bucket} adet={self.toplam_adet}>"
+
+
+class VeriSurumu(db.Model):
+    """
+    Önbellek geçersizleme sayaçları (örn: 'katalog').
+    Tüm worker'lar aynı satırı okuduğu için süreçler arası tutarlıdır.
+    """
+    __tablename__ = "veri_surumleri"
+
+    anahtar = db.Column(db.String(32), primary_key=True)
+    surum = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<VeriSurumu {self.anahtar}={self.surum}>"
+
+
+class OnHesap(db.Model):
+    """
+    Önceden hesaplanmış sonuçlar (dashboard istatistikleri, öneriler, optimum fiyat).
+    `flask on-hesapla` yazar; imza, hesaplandığı andaki veri sürümleri + gündür.
+    İmza güncel değilse okuyucular sonucu canlı hesaplar.
+    """
+    __tablename__ = "on_hesaplar"
+
+    anahtar = db.Column(db.String(120), primary_key=True)
+    imza = db.Column(db.String(64), nullable=False)
+    deger = db.Column(db.Text, nullable=False)  # JSON
+    sure_ms = db.Column(db.Float, nullable=False, default=0.0)
+    hesaplandi = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<OnHesap {self.anahtar} ({self.imza})>"
+
+
+class Uyari(db.Model):
+    """
+    Şube × ürün × kural başına marj uyarısı (zarar, düşük marj, maliyet yok).
+    Satış yüklemesi / maliyet değişikliği sadece etkilenen ürünlerin kurallarını yeniden
+    değerlendirir (alerts.py). Durum: yeni -> goruldu (kullanıcı onayı) -> cozuldu (kural artık
+    tetiklenmiyor); çözülen uyarı tekrar tetiklenirse aynı kayıt 'yeni' olarak açılır.
+    """
+    __tablename__ = "uyarilar"
+
+    id = db.Column(db.Integer, primary_key=True)
+    sube_id = db.Column(db.Integer, db.ForeignKey("subeler.id", ondelete="CASCADE"), nullable=False)
+    urun_id = db.Column(db.Integer, db.ForeignKey("urunler.id", ondelete="CASCADE"), nullable=False, index=True)
+    kural = db.Column(db.String(32), nullable=False)
+    durum = db.Column(db.String(16), nullable=False, default="yeni")
+    mesaj = db.Column(db.String(400), nullable=False, default="")
+    deger = db.Column(db.Float, nullable=False, default=0.0)  # kurala göre kâr (TL) / marj (%) / adet
+    olusturuldu = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    guncellendi = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    cozuldu = db.Column(db.DateTime, nullable=True)
+
+    urun = relationship("Urun", back_populates="uyarilar")
+
+    __table_args__ = (
+        db.UniqueConstraint("sube_id", "urun_id", "kural", name="uq_uyari_sube_urun_kural"),
+        # Dashboard: şubenin aktif uyarıları
+        db.Index("ix_uyari_sube_durum", "sube_id", "durum"),
+    )
+
+    def __repr__(self):
+        return f"<Uyari {self.kural} urun={self.urun_id} sube={self.sube_id} {self.durum}>"
+
+
+# -------------------------
+# Yardımcı: Veri sürümleri (önbellek geçersizleme)
+# -------------------------
+
+KATALOG_SURUMU = "katalog"
+# Satış kayıtları eklenince / silinince artar
+SATIS_SURUMU = "satis"
+
+
+def surum_oku(anahtar: str) -> int:
+    deger = db.session.scalar(db.select(VeriSurumu.surum).where(VeriSurumu.anahtar == anahtar))
+    return int(deger or 0)
+
+
+def surumler(*anahtarlar: str) -> dict[str, int]:
+    """Birden fazla sayacı tek sorguda okur (olmayanlar 0)."""
+    rows = db.session.execute(
+        db.select(VeriSurumu.anahtar, VeriSurumu.surum).where(VeriSurumu.anahtar.in_(anahtarlar))
+    ).all()
+    sonuc = dict.fromkeys(anahtarlar, 0)
+    sonuc.update({a: int(s or 0) for a, s in rows})
+    return sonuc
+
+
+def surum_artir(anahtar: str) -> None:
+    """
+    Sayacı mevcut transaction içinde 1 artırır (commit çağırana aittir).
+    Böylece veri değişikliği ile sürüm artışı aynı anda görünür olur.
+    """
+    guncellenen = db.session.execute(
+        db.update(VeriSurumu)
+          .where(VeriSurumu.anahtar == anahtar)
+          .values(surum=VeriSurumu.surum + 1)
+    ).rowcount
+    if not guncellenen:
+        db.session.add(VeriSurumu(anahtar=anahtar, surum=1))
+
+
+# -------------------------
+# Yardımcı: Toplu upsert (INSERT ... ON CONFLICT DO UPDATE)
+# -------------------------
+
+def toplu_upsert(model, satirlar: list[dict], anahtar_kolonlar: list[str],
+                 guncellenecek: list[str], constraint: str | None = None, artir: bool = False) -> int:
+    """
+    satirlar'ı tek seferde ekler; anahtar çakışırsa guncellenecek kolonları yazar
+    (artir=True ise mevcut değere ekler: sayaç / toplam kolonları için).
+    PostgreSQL'de constraint adı (verildiyse), SQLite'ta anahtar kolonlar çakışma hedefidir.
+    Diğer dialect'lerde mevcut anahtarlar okunup UPDATE / INSERT'e ayrılır.
+    Commit çağırana aittir. Dönüş: işlenen satır sayısı.
+    """
+    tablo = model.__table__
+    if not satirlar:
+        return 0
+
+    dialect = db.session.get_bind(mapper=model).dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+            hedef = {"constraint": constraint} if constraint else {"index_elements": anahtar_kolonlar}
+            parca = 1000
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+            hedef = {"index_elements": anahtar_kolonlar}
+            # Eski SQLite sürümlerinde ifade başına 999 parametre sınırı
+            parca = max(1, 900 // len(satirlar[0]))
+
+        for i in range(0, len(satirlar), parca):
+            stmt = insert(model).values(satirlar[i:i + parca])
+            stmt = stmt.on_conflict_do_update(**hedef, set_={
+                k: (tablo.c[k] + stmt.excluded[k]) if artir else stmt.excluded[k] for k in guncellenecek
+            })
+            db.session.execute(stmt)
+        return len(satirlar)
+
+    anahtar = lambda r: tuple(r[k] for k in anahtar_kolonlar)
+    n = len(anahtar_kolonlar)
+    mevcut = {
+        tuple(row[:n]): row[n:]
+        for row in db.session.execute(
+            db.select(*[tablo.c[k] for k in anahtar_kolonlar], tablo.c.id, *[tablo.c[k] for k in guncellenecek])
+              .where(db.tuple_(*[tablo.c[k] for k in anahtar_kolonlar]).in_([anahtar(r) for r in satirlar]))
+        )
+    }
+    yeni = [r for r in satirlar if anahtar(r) not in mevcut]
+    eski = [
+        {"id": mevcut[anahtar(r)][0],
+         **{k: (mevcut[anahtar(r)][i + 1] + r[k]) if artir else r[k] for i, k in enumerate(guncellenecek)}}
+        for r in satirlar if anahtar(r) in mevcut
+    ]
+    if yeni:
+        db.session.execute(db.insert(model), yeni)
+    if eski:
+        db.session.execute(db.update(model), eski)
+    return len(satirlar)
+
+
+# -------------------------
+# Yardımcı: Günlük satış özeti (talep modeli istatistikleri)
+# -------------------------
+
+# Özetin fiyat bucket adımı (analiz motorları 1 TL bucket kullanır)
+OZET_FIYAT_ADIMI = 1.0
+
+
+def fiyat_bucket(fiyat: float, adim: float = OZET_FIYAT_ADIMI) -> float:
+    """150.49 -> 150, 150.50 -> 151 (adim=1); analysis_engine._round_to_step ile aynı kural."""
+    if adim <= 0:
+        return float(fiyat)
+    return float(math.floor((float(fiyat) / adim) + 0.5) * adim)
+
+
+def _gun(tarih) -> date:
+    return tarih.date() if isinstance(tarih, datetime) else tarih
+
+
+def _ozet_satirlari(kayitlar) -> list[dict]:
+    """(sube_id, urun_id, tarih, adet, birim_fiyat) kayıtlarını (şube, ürün, gün, bucket) başına toplar."""
+    toplam = defaultdict(lambda: [0, 0])
+    for sube_id, urun_id, tarih, adet, birim_fiyat in kayitlar:
+        if tarih is None or adet is None or birim_fiyat is None:
+            continue
+        t = toplam[(sube_id, urun_id, _gun(tarih), fiyat_bucket(birim_fiyat))]
+        t[0] += int(adet)
+        t[1] += 1
+    return [
+        {"sube_id": s, "urun_id": u, "gun": g, "fiyat_bucket": f, "toplam_adet": a, "kayit_sayisi": k}
+        for (s, u, g, f), (a, k) in toplam.items()
+    ]
+
+
+def satis_ozeti_ekle(kayitlar) -> int:
+    """
+    Yeni satış kayıtlarını özete ekler (aynı transaction; commit çağırana aittir).
+    kayitlar: SatisKaydi nesneleri veya (sube_id, urun_id, tarih, adet, birim_fiyat) demetleri.
+    """
+    satirlar = _ozet_satirlari(
+        (k.sube_id, k.urun_id, k.tarih, k.adet, k.hesaplanan_birim_fiyat) if isinstance(k, SatisKaydi) else k
+        for k in kayitlar
+    )
+    return toplu_upsert(
+        GunlukSatisOzeti, satirlar,
+        anahtar_kolonlar=["sube_id", "urun_id", "gun", "fiyat_bucket"],
+        guncellenecek=["toplam_adet", "kayit_sayisi"],
+        constraint="uq_gunluk_ozet_sube_urun_gun_fiyat",
+        artir=True,
+    )
+
+
+def satis_ozeti_gun_sil(gun: date, sube_id: int | None = None) -> int:
+    """Bir günün satışları silindiğinde özetini de siler (sube_id None: tüm şubeler)."""
+    stmt = db.delete(GunlukSatisOzeti).where(GunlukSatisOzeti.gun == gun)
+    if sube_id is not None:
+        stmt = stmt.where(GunlukSatisOzeti.sube_id == sube_id)
+    return db.session.execute(stmt).rowcount
+
+
+def satis_ozeti_yenile(parca: int = 20000) -> int:
+    """
+    Özeti satış kayıtlarından baştan kurar (ilk kurulum / bakım).
+    Kayıtlar parça parça okunur; commit çağırana aittir. Dönüş: özet satır sayısı.
+    """
+    db.session.execute(db.delete(GunlukSatisOzeti))
+    sonuc = db.session.execute(
+        db.select(SatisKaydi.sube_id, SatisKaydi.urun_id, SatisKaydi.tarih, SatisKaydi.adet,
+                  SatisKaydi.hesaplanan_birim_fiyat)
+          .execution_options(yield_per=parca)
+    )
+    satirlar = _ozet_satirlari(sonuc)
+    for i in range(0, len(satirlar), parca):
+        db.session.execute(db.insert(GunlukSatisOzeti), satirlar[i:i + parca])
+    return len(satirlar)
+
+
+def satis_ozeti_eksik_mi() -> bool:
+    """Satış var ama özet boşsa (eski kurulum) True."""
+    return (
+        db.session.scalar(db.select(GunlukSatisOzeti.id).limit(1)) is None
+        and db.session.scalar(db.select(SatisKaydi.id).limit(1)) is not None
+    )
 
 
 # -------------------------
-# Yardımcı: Ürünlerin maliyetlerini reçetelerden güncelle
+# Yardımcı: Şubeler (tek şubeli kurulumdan geçiş)
 # -------------------------
 
-def _hesapla_urun_maliyeti(urun: Urun) -> float:
+VARSAYILAN_SUBE = "Merkez"
+
+
+def varsayilan_sube() -> Sube:
+    """İlk şube (yoksa oluşturulur); tek şubeli kurulumların satışları buna aittir."""
+    sube = db.session.scalar(db.select(Sube).order_by(Sube.id).limit(1))
+    if sube is None:
+        sube = Sube(isim=os.environ.get("VARSAYILAN_SUBE") or VARSAYILAN_SUBE)
+        db.session.add(sube)
+        db.session.flush()
+    return sube
+
+
+def sube_semasini_guncelle() -> list[str]:
     """
-    Urun.receteler üzerinden toplam maliyeti (TL) hesaplar.
-    Toplam = Σ( hammadde.maliyet_fiyati * miktar )
+    create_all mevcut tablolara kolon eklemez: eski (tek şubeli) şemaya sube_id kolonlarını
+    ve sube_id ile başlayan index'leri ekler, eski satışları varsayılan şubeye atar.
+    Özet tablosu eski şemadaysa satışlardan yeniden kurulur. Commit çağırana aittir.
+    Dönüş: yapılan adımlar (boşsa şema zaten güncel).
     """
-    if not urun or not urun.receteler:
-        return 0.0
+    adimlar = []
+    baglanti = db.session.connection()
+    kolonlar = lambda tablo: {k["name"] for k in inspect(baglanti).get_columns(tablo)}
+    sube_id = varsayilan_sube().id
 
-    toplam = 0.0
-    for rec in urun.receteler:
-        if rec.hammadde and rec.miktar and rec.miktar > 0:
-            birim_fiyat = float(rec.hammadde.maliyet_fiyati or 0.0)
-            toplam += birim_fiyat * float(rec.miktar or 0.0)
-    return round(toplam, 4)
+    if "sube_id" not in kolonlar(Urun.__tablename__):
+        db.session.execute(text("ALTER TABLE urunler ADD COLUMN sube_id INTEGER REFERENCES subeler(id)"))
+        adimlar.append("urunler.sube_id eklendi")
 
+    if "sube_id" not in kolonlar(SatisKaydi.__tablename__):
+        # Eklenen kolon NULL olabilir (ALTER kısıtı); uygulama her satışa şube yazar
+        db.session.execute(text("ALTER TABLE satis_kayitlari ADD COLUMN sube_id INTEGER REFERENCES subeler(id)"))
+        adet = db.session.execute(text("UPDATE satis_kayitlari SET sube_id = :s"), {"s": sube_id}).rowcount
+        adimlar.append(f"satis_kayitlari.sube_id eklendi ({adet} satış -> şube {sube_id})")
 
-def guncelle_tum_urun_maliyetleri(commit: bool = True) -> int:
+    if "sube_id" not in kolonlar(GunlukSatisOzeti.__tablename__):
+        GunlukSatisOzeti.__table__.drop(baglanti)
+        GunlukSatisOzeti.__table__.create(baglanti)
+        adimlar.append(f"gunluk_satis_ozetleri yeniden kuruldu ({satis_ozeti_yenile()} satır)")
+
+    for index in (*Urun.__table__.indexes, *SatisKaydi.__table__.indexes):
+        index.create(baglanti, checkfirst=True)
+    return adimlar
+
+
+# -------------------------
+# Yardımcı: Ürünlerin maliyetlerini reçetelerden güncelle (alt reçete DAG'ı)
+# -------------------------
+
+class ReceteDongusuHatasi(ValueError):
+    """Alt reçeteler döngü oluşturuyor (A -> B -> ... -> A)."""
+
+    def __init__(self, urun_isimleri: list[str]):
+        self.urun_isimleri = urun_isimleri
+        super().__init__("Alt reçetelerde döngü var: " + " -> ".join(urun_isimleri))
+
+
+def _alt_recete_kenarlari() -> dict[int, list[tuple[int, float]]]:
+    """urun_id -> [(alt_urun_id, miktar)]. Tablo küçüktür; graf tek sorguda gelir."""
+    kenarlar = defaultdict(list)
+    rows = db.session.execute(db.select(AltRecete.urun_id, AltRecete.alt_urun_id, AltRecete.miktar))
+    for urun_id, alt_urun_id, miktar in rows:
+        kenarlar[urun_id].append((alt_urun_id, float(miktar or 0.0)))
+    return kenarlar
+
+
+def _etkilenen_urunler(kenarlar, hammadde_ids=None, urun_ids=None) -> set[int]:
+    """Değişen hammadde/ürünlerden etkilenen ürünler + onları kullanan tüm üst ürünler."""
+    baslangic = set(urun_ids or ())
+    if hammadde_ids:
+        baslangic.update(db.session.scalars(
+            db.select(Recete.urun_id).where(Recete.hammadde_id.in_(list(hammadde_ids))).distinct()
+        ))
+
+    ustler = defaultdict(list)
+    for urun_id, altlar in kenarlar.items():
+        for alt_id, _ in altlar:
+            ustler[alt_id].append(urun_id)
+
+    etkilenen, yigin = set(), list(baslangic)
+    while yigin:
+        u = yigin.pop()
+        if u not in etkilenen:
+            etkilenen.add(u)
+            yigin.extend(ustler.get(u, ()))
+    return etkilenen
+
+
+def _dongu_bul(kalan: set[int], kenarlar) -> list[str]:
+    # Kalan her düğümün kalan kümede en az bir alt ürünü var: izi takip et, tekrar edene kadar
+    u = next(iter(kalan))
+    yol, sira_no = [], {}
+    while u not in sira_no:
+        sira_no[u] = len(yol)
+        yol.append(u)
+        u = next(a for a, _ in kenarlar[u] if a in kalan)
+    dongu = yol[sira_no[u]:] + [u]
+    isimler = dict(db.session.execute(db.select(Urun.id, Urun.isim).where(Urun.id.in_(dongu))).all())
+    return [isimler.get(i, str(i)) for i in dongu]
+
+
+def _topolojik_sira(dugumler: set[int], kenarlar) -> list[int]:
+    """Alt ürünler, onları kullanan üst ürünlerden önce gelir (Kahn)."""
+    bekleyen = {u: 0 for u in dugumler}
+    ustler = defaultdict(list)
+    for u in dugumler:
+        for alt_id, _ in kenarlar.get(u, ()):
+            if alt_id in dugumler:
+                bekleyen[u] += 1
+                ustler[alt_id].append(u)
+
+    hazir = deque(u for u, n in bekleyen.items() if n == 0)
+    sira = []
+    while hazir:
+        alt_id = hazir.popleft()
+        sira.append(alt_id)
+        for u in ustler[alt_id]:
+            bekleyen[u] -= 1
+            if bekleyen[u] == 0:
+                hazir.append(u)
+
+    if len(sira) != len(dugumler):
+        raise ReceteDongusuHatasi(_dongu_bul({u for u, n in bekleyen.items() if n > 0}, kenarlar))
+    return sira
+
+
+# Maliyeti değişen ürün id'leriyle (commit öncesi, aynı transaction'da) çağrılır; alerts.py kaydolur
+maliyet_dinleyicileri: list = []
+
+
+def guncelle_tum_urun_maliyetleri(commit: bool = True, hammadde_ids=None, urun_ids=None) -> int:
     """
-    Tüm ürünler için reçete bazlı maliyetleri yeniden hesaplar ve yazar.
-    Dönüş: güncellenen ürün sayısı.
+    Reçete + alt reçete grafını topolojik sırayla değerlendirip maliyetleri yazar.
+    Maliyet = Σ(hammadde.maliyet_fiyati * miktar) + Σ(alt_urun.maliyet * miktar)
+
+    hammadde_ids / urun_ids verilirse sadece bunlardan etkilenen ürünler (ve onları alt
+    reçete olarak kullanan üst ürünler) yeniden hesaplanır; ikisi de None ise hepsi.
+    Grafın geri kalanındaki ara ürünlerin kayıtlı maliyetleri aynen kullanılır.
+    Döngüde ReceteDongusuHatasi. Dönüş: güncellenen ürün sayısı.
     """
-    adet = 0
-    urunler = Urun.query.all()
-    for u in urunler:
-        yeni = _hesapla_urun_maliyeti(u)
-        if u.hesaplanan_maliyet != yeni:
-            u.hesaplanan_maliyet = yeni
-            adet += 1
-    if commit and adet:
+    kenarlar = _alt_recete_kenarlari()
+    tamami = hammadde_ids is None and urun_ids is None
+    if tamami:
+        hedef = set(db.session.scalars(db.select(Urun.id)))
+    else:
+        hedef = _etkilenen_urunler(kenarlar, hammadde_ids, urun_ids)
+    if not hedef:
+        return 0
+
+    sira = _topolojik_sira(hedef, kenarlar)
+
+    # Hammadde payı: ürün başına tek toplu sorgu
+    q = (
+        db.select(Recete.urun_id, func.sum(Recete.miktar * Hammadde.maliyet_fiyati))
+          .join(Hammadde, Hammadde.id == Recete.hammadde_id)
+          .where(Recete.miktar > 0)
+          .group_by(Recete.urun_id)
+    )
+    if not tamami:
+        q = q.where(Recete.urun_id.in_(list(hedef)))
+    hammadde_payi = dict(db.session.execute(q).all())
+
+    # Memo: hesaplanan ara ürün maliyetleri; hedef dışındakiler kayıtlı değerden okunur
+    memo = dict(db.session.execute(db.select(Urun.id, Urun.hesaplanan_maliyet)).all())
+    eski = {u: memo.get(u) for u in hedef}
+    for u in sira:
+        toplam = float(hammadde_payi.get(u) or 0.0)
+        for alt_id, miktar in kenarlar.get(u, ()):
+            if miktar > 0:
+                toplam += float(memo.get(alt_id) or 0.0) * miktar
+        memo[u] = round(toplam, 4)
+
+    degisen = {u: memo[u] for u in hedef if eski[u] != memo[u]}
+    if degisen:
+        for urun in db.session.scalars(db.select(Urun).where(Urun.id.in_(list(degisen)))):
+            urun.hesaplanan_maliyet = degisen[urun.id]
+        # Katalog önbelleği ürün maliyetlerini de taşır
+        surum_artir(KATALOG_SURUMU)
+        for dinleyici in maliyet_dinleyicileri:
+            dinleyici(set(degisen))
+    if commit and degisen:
         db.session.commit()
-    return adet
+    return len(degisen)
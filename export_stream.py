@@ -0,0 +1,143 @@
+# export_stream.py — Satış geçmişi ve analiz sonuçlarının akışlı dışa aktarımı (CSV / XLSX)
+#
+# Satırlar veritabanından yield_per ile parça parça okunur (PostgreSQL'de sunucu taraflı cursor)
+# ve yanıt gövdesi generator ile üretilir; bellek kullanımı satır sayısından bağımsızdır.
+# XLSX için openpyxl'in write-only çalışma kitabı kullanılır: satırlar geçici dosyaya yazılır,
+# ardından dosya parça parça gönderilir.
+
+import csv
+import io
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from flask import Response, stream_with_context
+from sqlalchemy import func
+
+from branch_scope import sube_filtresi
+from database import db, Sube, Urun, SatisKaydi, replika_okuma
+
+BICIMLER = ("csv", "xlsx")
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# DB'den tek seferde okunan satır / yanıta yazılan parça boyutu
+PARCA = 2000
+_DOSYA_PARCASI = 64 * 1024
+
+SATIS_BASLIKLARI = (
+    "Tarih", "Sube", "Urun_Adi", "Excel_Adi", "Kategori", "Grup", "Adet", "Toplam_Tutar",
+    "Birim_Fiyat", "Maliyet", "Kar",
+)
+URUN_OZETI_BASLIKLARI = (
+    "Urun_Adi", "Kategori", "Grup", "Adet", "Ciro", "Maliyet", "Kar", "Marj_Yuzde", "Satis_Gunu",
+)
+
+
+def csv_akisi(basliklar, satirlar, parca: int = PARCA):
+    """Satırları CSV metni olarak parça parça üretir (Excel için BOM ile)."""
+    tampon = io.StringIO()
+    yazici = csv.writer(tampon)
+    tampon.write("\ufeff")
+    yazici.writerow(basliklar)
+
+    for i, satir in enumerate(satirlar, start=1):
+        yazici.writerow(satir)
+        if i % parca == 0:
+            yield tampon.getvalue()
+            tampon.seek(0)
+            tampon.truncate(0)
+
+    if tampon.tell():
+        yield tampon.getvalue()
+
+
+def xlsx_akisi(basliklar, satirlar, sayfa_adi: str = "Veri"):
+    """Write-only çalışma kitabı ile XLSX üretir; bitmiş dosyayı parça parça okur."""
+    from openpyxl import Workbook  # sadece xlsx dışa aktarımında yüklenir
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sayfa_adi)
+    ws.append(list(basliklar))
+    for satir in satirlar:
+        ws.append(list(satir))
+
+    fd, yol = tempfile.mkstemp(prefix="rp-export-", suffix=".xlsx")
+    os.close(fd)
+    try:
+        wb.save(yol)
+        with open(yol, "rb") as f:
+            while parca := f.read(_DOSYA_PARCASI):
+                yield parca
+    finally:
+        os.remove(yol)
+
+
+def indirme_yaniti(bicim: str, dosya_koku: str, basliklar, satirlar, sayfa_adi: str = "Veri") -> Response:
+    """Akışlı indirme yanıtı; satirlar bir generator olmalı (istek bağlamında tüketilir)."""
+    dosya = f"{dosya_koku}_{datetime.now():%Y%m%d}.{bicim}"
+    if bicim == "xlsx":
+        govde, mimetype = xlsx_akisi(basliklar, satirlar, sayfa_adi), XLSX_MIMETYPE
+    else:
+        govde, mimetype = csv_akisi(basliklar, satirlar), "text/csv; charset=utf-8"
+    return Response(
+        stream_with_context(govde),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{dosya}"'},
+    )
+
+
+def _filtrele(stmt, baslangic=None, bitis=None, urun_ismi=None, kategori=None, grup=None):
+    # Aktif şube (tüm şubelerde filtre yok); bitis dahil: ertesi günün başından küçük
+    stmt = sube_filtresi(stmt, SatisKaydi.sube_id)
+    if baslangic:
+        stmt = stmt.where(SatisKaydi.tarih >= datetime.combine(baslangic, datetime.min.time()))
+    if bitis:
+        stmt = stmt.where(SatisKaydi.tarih < datetime.combine(bitis + timedelta(days=1), datetime.min.time()))
+    if urun_ismi:
+        stmt = stmt.where(Urun.isim == urun_ismi)
+    if kategori:
+        stmt = stmt.where(Urun.kategori == kategori)
+    if grup:
+        stmt = stmt.where(Urun.kategori_grubu == grup)
+    return stmt
+
+
+def satis_satirlari(parca: int = PARCA, **filtreler):
+    """Ham satış kayıtları + hesaplanan maliyet/kâr, tarihe göre sıralı."""
+    stmt = _filtrele(
+        db.select(
+            SatisKaydi.tarih, Sube.isim, Urun.isim, Urun.excel_adi, Urun.kategori, Urun.kategori_grubu,
+            SatisKaydi.adet, SatisKaydi.toplam_tutar, SatisKaydi.hesaplanan_birim_fiyat,
+            SatisKaydi.hesaplanan_maliyet, SatisKaydi.hesaplanan_kar,
+        ).join(Urun, Urun.id == SatisKaydi.urun_id).join(Sube, Sube.id == SatisKaydi.sube_id),
+        **filtreler,
+    ).order_by(SatisKaydi.tarih, SatisKaydi.id)
+
+    with replika_okuma():
+        sonuc = db.session.execute(stmt.execution_options(yield_per=parca))
+        for tarih, *diger in sonuc:
+            yield (tarih.strftime("%Y-%m-%d %H:%M") if tarih else "", *diger)
+
+
+def urun_ozeti_satirlari(parca: int = PARCA, **filtreler):
+    """Filtrelenen dönem için ürün bazında adet / ciro / maliyet / kâr (SQL'de toplanır)."""
+    ciro = func.coalesce(func.sum(SatisKaydi.toplam_tutar), 0.0)
+    kar = func.coalesce(func.sum(SatisKaydi.hesaplanan_kar), 0.0)
+    stmt = _filtrele(
+        db.select(
+            Urun.isim, Urun.kategori, Urun.kategori_grubu,
+            func.coalesce(func.sum(SatisKaydi.adet), 0),
+            ciro,
+            func.coalesce(func.sum(SatisKaydi.hesaplanan_maliyet), 0.0),
+            kar,
+            func.count(func.distinct(func.date(SatisKaydi.tarih))),
+        ).join(Urun, Urun.id == SatisKaydi.urun_id),
+        **filtreler,
+    ).group_by(Urun.id, Urun.isim, Urun.kategori, Urun.kategori_grubu).order_by(kar.desc())
+
+    with replika_okuma():
+        sonuc = db.session.execute(stmt.execution_options(yield_per=parca))
+        for isim, kategori, grup, adet, c, maliyet, k, gun in sonuc:
+            marj = (float(k) / float(c) * 100.0) if c else 0.0
+            yield (isim, kategori, grup, int(adet), round(float(c), 2), round(float(maliyet), 2),
+                   round(float(k), 2), round(marj, 1), int(gun))
@@ -0,0 +1,147 @@
+# ingredient_usage.py — Satışlardan teorik hammadde tüketimi (stok mutabakatı için)
+#
+# Tek SQL ifadesi: dönemin satışları ürün (ve istenirse gün) bazında toplanır, alt reçeteler
+# recursive CTE ile düzleştirilmiş porsiyon reçetesiyle birleştirilir ve
+#   SUM(adet × miktar)  hammadde (× gün) başına
+# hesaplanır. Satış tarafı mümkünse günlük satış özetinden (gunluk_satis_ozetleri) okunur;
+# özet yoksa (eski kurulum) ham satış kayıtları kullanılır. Ağır kütüphane kullanmaz.
+
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import cast, func, literal
+
+from branch_scope import sube_filtresi
+from database import (
+    db, Urun, Hammadde, Recete, AltRecete, SatisKaydi, GunlukSatisOzeti, replika_okuma, satis_ozeti_eksik_mi
+)
+
+TUKETIM_BASLIKLARI = ("Hammadde", "Birim", "Teorik_Miktar", "Birim_Fiyat", "Maliyet")
+GUNLUK_TUKETIM_BASLIKLARI = ("Gun", *TUKETIM_BASLIKLARI)
+
+# Alt reçete derinliği sınırı; döngüler yazarken engellenir (ReceteDongusuHatasi), bu sadece emniyet
+MAKS_DERINLIK = 16
+
+
+def etkin_recete():
+    """
+    (urun_id, hammadde_id, miktar) CTE'si: 1 porsiyonun alt reçeteler dahil hammadde ihtiyacı.
+    Burger -> 0.05 × Sos -> 0.2 kg Domates ise Burger için domates 0.01 kg eklenir.
+    """
+    acilim = db.select(
+        Urun.id.label("kok_id"),
+        Urun.id.label("urun_id"),
+        # Tipler açık: PostgreSQL recursive terimle (double precision) aynı tipi ister, bind numeric gelir
+        cast(literal(1.0), db.Float).label("carpan"),
+        cast(literal(0), db.Integer).label("derinlik"),
+    ).cte("recete_acilimi", recursive=True)
+    ust = acilim.alias("ust")
+    acilim = acilim.union_all(
+        db.select(
+            ust.c.kok_id,
+            AltRecete.alt_urun_id,
+            ust.c.carpan * AltRecete.miktar,
+            ust.c.derinlik + 1,
+        )
+        .join(AltRecete, AltRecete.urun_id == ust.c.urun_id)
+        .where(AltRecete.miktar > 0, ust.c.derinlik < MAKS_DERINLIK)
+    )
+    return (
+        db.select(
+            acilim.c.kok_id.label("urun_id"),
+            Recete.hammadde_id.label("hammadde_id"),
+            func.sum(acilim.c.carpan * Recete.miktar).label("miktar"),
+        )
+        .join(Recete, Recete.urun_id == acilim.c.urun_id)
+        .where(Recete.miktar > 0)
+        .group_by(acilim.c.kok_id, Recete.hammadde_id)
+        .cte("etkin_recete")
+    )
+
+
+def _satis_adetleri(baslangic, bitis, urun_ismi, kategori, grup, gunluk: bool, ozetten: bool):
+    """Ürün (× gün) başına satılan adet alt sorgusu; aktif şubeye süzülür."""
+    if ozetten:
+        urun_id, adet, gun_kolonu, sube_kolonu = (
+            GunlukSatisOzeti.urun_id, GunlukSatisOzeti.toplam_adet, GunlukSatisOzeti.gun, GunlukSatisOzeti.sube_id
+        )
+        gun = gun_kolonu
+    else:
+        urun_id, adet, gun_kolonu, sube_kolonu = (
+            SatisKaydi.urun_id, SatisKaydi.adet, SatisKaydi.tarih, SatisKaydi.sube_id
+        )
+        gun = func.date(SatisKaydi.tarih)
+
+    kolonlar = [urun_id.label("urun_id"), func.sum(adet).label("adet")]
+    if gunluk:
+        kolonlar.insert(0, gun.label("gun"))
+    stmt = sube_filtresi(db.select(*kolonlar), sube_kolonu)
+
+    # Özet gün kolonuyla, ham kayıtlar index'lenebilir zaman aralığıyla süzülür; bitis dahil
+    if baslangic:
+        stmt = stmt.where(gun_kolonu >= (baslangic if ozetten else datetime.combine(baslangic, datetime.min.time())))
+    if bitis:
+        stmt = stmt.where(
+            gun_kolonu <= bitis if ozetten
+            else gun_kolonu < datetime.combine(bitis + timedelta(days=1), datetime.min.time())
+        )
+    if urun_ismi or kategori or grup:
+        stmt = stmt.join(Urun, Urun.id == urun_id)
+        if urun_ismi:
+            stmt = stmt.where(Urun.isim == urun_ismi)
+        if kategori:
+            stmt = stmt.where(Urun.kategori == kategori)
+        if grup:
+            stmt = stmt.where(Urun.kategori_grubu == grup)
+
+    gruplar = [urun_id, gun] if gunluk else [urun_id]
+    return stmt.group_by(*gruplar).subquery("satilan")
+
+
+def teorik_tuketim(baslangic: date | None = None, bitis: date | None = None, urun_ismi: str | None = None,
+                   kategori: str | None = None, grup: str | None = None, gunluk: bool = False,
+                   ozetten: bool | None = None) -> list[tuple]:
+    """
+    Dönemde satılan ürünlerin reçetelerine göre tüketilmiş olması gereken hammadde miktarları.
+    Dönüş (isme göre; gunluk=True ise önce güne göre sıralı):
+      [([gun,] hammadde, birim, miktar, birim_fiyat, maliyet)]
+    ozetten=None: günlük satış özeti doluysa oradan okur.
+    """
+    if ozetten is None:
+        ozetten = not satis_ozeti_eksik_mi()
+    satilan = _satis_adetleri(baslangic, bitis, urun_ismi, kategori, grup, gunluk, ozetten)
+    recete = etkin_recete()
+
+    miktar = func.sum(satilan.c.adet * recete.c.miktar)
+    kolonlar = [Hammadde.isim, Hammadde.maliyet_birimi, miktar, Hammadde.maliyet_fiyati]
+    gruplar = [Hammadde.id, Hammadde.isim, Hammadde.maliyet_birimi, Hammadde.maliyet_fiyati]
+    siralama = [Hammadde.isim]
+    if gunluk:
+        kolonlar.insert(0, satilan.c.gun)
+        gruplar.insert(0, satilan.c.gun)
+        siralama.insert(0, satilan.c.gun)
+
+    stmt = (
+        db.select(*kolonlar)
+        .select_from(satilan)
+        .join(recete, recete.c.urun_id == satilan.c.urun_id)
+        .join(Hammadde, Hammadde.id == recete.c.hammadde_id)
+        .group_by(*gruplar)
+        .order_by(*siralama)
+    )
+
+    with replika_okuma():
+        satirlar = db.session.execute(stmt).all()
+
+    sonuc = []
+    for satir in satirlar:
+        *gun, isim, birim, m, fiyat = satir
+        m, fiyat = float(m or 0.0), float(fiyat or 0.0)
+        # Ham kayıtlarda gün SQLite'ta metin, PostgreSQL'de date döner
+        gun = [str(g)[:10] for g in gun]
+        sonuc.append((*gun, isim, birim, round(m, 4), round(fiyat, 2), round(m * fiyat, 2)))
+    return sonuc
+
+
+def tuketim_satirlari(gunluk: bool = False, **filtreler):
+    """Dışa aktarım için satır üreteci (TUKETIM_BASLIKLARI / GUNLUK_TUKETIM_BASLIKLARI sırasıyla)."""
+    yield from teorik_tuketim(gunluk=gunluk, **filtreler)
@@ -0,0 +1,165 @@
+# precompute_store.py — Dashboard / fiyatlama sonuçlarının önceden hesaplanması
+#
+# `flask on-hesapla` (cron: her sabah deploy sonrası) verilen pencereler (varsayılan 7/30/90) için
+# _product_stats_last_days ve _build_insights çıktısını, her ürün için bul_optimum_fiyat
+# sonucunu on_hesaplar tablosuna yazar. Her kayıt, hesaplandığı andaki katalog + satış
+# sürümleri ve gün ile imzalanır: imzası güncel olan iş tekrar yapılmaz, okuyucular
+# (dashboard / reports) imza tutmazsa sonucu canlı hesaplar.
+# Anahtarlar şube kapsamını içerir: her şube ve tüm şubeler (merkez özeti) ayrı hesaplanır.
+
+import json
+import time
+from datetime import date, datetime
+
+from database import (
+    db, OnHesap, Sube, toplu_upsert, surumler, KATALOG_SURUMU, SATIS_SURUMU
+)
+from branch_scope import aktif_sube_id, sube_kapsami
+from catalog_cache import katalog
+from dashboard_stats import _product_stats_last_days, _build_insights
+
+STANDART_PENCERELER = (7, 30, 90)
+
+
+def guncel_imza() -> str:
+    """Katalog + satış sürümü + gün ("son N gün" pencereleri güne bağlıdır)."""
+    s = surumler(KATALOG_SURUMU, SATIS_SURUMU)
+    return f"k{s[KATALOG_SURUMU]}-s{s[SATIS_SURUMU]}-{date.today().isoformat()}"
+
+
+def oku(anahtar: str, imza: str | None = None):
+    """İmzası güncel kayıt varsa değeri, yoksa None."""
+    kayit = db.session.get(OnHesap, anahtar)
+    if kayit is None or kayit.imza != (imza or guncel_imza()):
+        return None
+    return json.loads(kayit.deger)
+
+
+def _imzalar(anahtarlar) -> dict[str, str]:
+    return dict(db.session.execute(
+        db.select(OnHesap.anahtar, OnHesap.imza).where(OnHesap.anahtar.in_(list(anahtarlar)))
+    ).all())
+
+
+def _yaz(satirlar: list[dict]) -> None:
+    toplu_upsert(
+        OnHesap, satirlar,
+        anahtar_kolonlar=["anahtar"],
+        guncellenecek=["imza", "deger", "sure_ms", "hesaplandi"],
+    )
+
+
+def _kapsam() -> str:
+    sube_id = aktif_sube_id()
+    return "tum" if sube_id is None else str(sube_id)
+
+
+def istatistik_anahtari(gun: int) -> str:
+    return f"urun_istatistik:{_kapsam()}:{gun}"
+
+
+def oneri_anahtari(gun: int) -> str:
+    # v2: marj kuralları uyarılara taşındı; eski biçimde hesaplanmış öneriler okunmaz
+    return f"oneriler:v2:{_kapsam()}:{gun}"
+
+
+def optimum_anahtari(urun_id: int) -> str:
+    return f"optimum_fiyat:{_kapsam()}:{urun_id}"
+
+
+class _Asama:
+    """Aşama başına sayaç + süre (CLI çıktısı için)."""
+
+    def __init__(self, ad: str):
+        self.ad = ad
+        self.hesaplanan = 0
+        self.atlanan = 0
+        self.yetersiz = 0
+        self._t0 = time.perf_counter()
+        self.sure_ms = 0.0
+
+    def bitir(self):
+        self.sure_ms = (time.perf_counter() - self._t0) * 1000.0
+        return self
+
+    def __str__(self):
+        return (f"{self.ad:<34} hesaplanan={self.hesaplanan:<4} atlanan={self.atlanan:<4} "
+                f"veri_yetersiz={self.yetersiz:<3} {self.sure_ms:>9.1f} ms")
+
+
+def on_hesapla(pencereler=STANDART_PENCERELER, zorla: bool = False, optimum: bool = True) -> list[_Asama]:
+    """
+    Tüm şubeler (merkez özeti) ve birden fazla şube varsa her şube için tüm aşamaları çalıştırır ve yazar
+    (her aşama kendi commit'i ile). zorla=True imzadan bağımsız yeniden hesaplar.
+    Dönüş: aşama özetleri.
+    """
+    asamalar = []
+    sube_ids = db.session.scalars(db.select(Sube.id).order_by(Sube.id)).all()
+    # Tek şubede şube seçici gösterilmez: sadece "tüm şubeler" kapsamı okunur
+    kapsamlar = [None, *sube_ids] if len(sube_ids) > 1 else [None]
+    for sube_id in kapsamlar:
+        with sube_kapsami(sube_id):
+            asamalar += _kapsami_hesapla(pencereler, zorla, optimum)
+    return asamalar
+
+
+def _kapsami_hesapla(pencereler, zorla: bool, optimum: bool) -> list[_Asama]:
+    imza = guncel_imza()
+    simdi = datetime.utcnow()
+    asamalar = []
+    etiket = f"[{_kapsam()}]"
+
+    # 1) Ürün istatistikleri + 2) öneriler (aynı stats'tan)
+    ist = _Asama(f"{etiket} Ürün istatistikleri")
+    oner = _Asama(f"{etiket} Dashboard önerileri")
+    mevcut = _imzalar([istatistik_anahtari(g) for g in pencereler] + [oneri_anahtari(g) for g in pencereler])
+    satirlar = []
+    for gun in pencereler:
+        if not zorla and mevcut.get(istatistik_anahtari(gun)) == imza and mevcut.get(oneri_anahtari(gun)) == imza:
+            ist.atlanan += 1
+            oner.atlanan += 1
+            continue
+        t0 = time.perf_counter()
+        stats = _product_stats_last_days(gun)
+        t1 = time.perf_counter()
+        oneriler = _build_insights(stats, gun)
+        t2 = time.perf_counter()
+        satirlar += [
+            dict(anahtar=istatistik_anahtari(gun), imza=imza, deger=json.dumps(stats),
+                 sure_ms=(t1 - t0) * 1000.0, hesaplandi=simdi),
+            dict(anahtar=oneri_anahtari(gun), imza=imza, deger=json.dumps(oneriler),
+                 sure_ms=(t2 - t1) * 1000.0, hesaplandi=simdi),
+        ]
+        ist.hesaplanan += 1
+        oner.hesaplanan += 1
+    _yaz(satirlar)
+    db.session.commit()
+    asamalar += [ist.bitir(), oner.bitir()]
+
+    if not optimum:
+        return asamalar
+
+    # 3) Optimum fiyat (her ürün); pandas/sklearn sadece burada yüklenir
+    opt = _Asama(f"{etiket} Optimum fiyat")
+    from analysis_engine import bul_optimum_fiyat
+
+    urunler = katalog().urunler
+    mevcut = _imzalar([optimum_anahtari(u.id) for u in urunler])
+    satirlar = []
+    for u in urunler:
+        anahtar = optimum_anahtari(u.id)
+        if not zorla and mevcut.get(anahtar) == imza:
+            opt.atlanan += 1
+            continue
+        t0 = time.perf_counter()
+        basarili, rapor, chart = bul_optimum_fiyat(u.isim)
+        opt.hesaplanan += 1
+        if not basarili:
+            opt.yetersiz += 1
+        # Başarısız sonuç da saklanır: "veri yetersiz" cevabı da aynı imzada değişmez
+        satirlar.append(dict(anahtar=anahtar, imza=imza, deger=json.dumps([basarili, rapor, chart]),
+                             sure_ms=(time.perf_counter() - t0) * 1000.0, hesaplandi=simdi))
+    _yaz(satirlar)
+    db.session.commit()
+    asamalar.append(opt.bitir())
+    return asamalar
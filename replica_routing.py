@@ -0,0 +1,86 @@
+# replica_routing.py — Analitik okumaları read-replica'ya yönlendirme (opsiyonel)
+#
+# DATABASE_URL_REPLICA verildiğinde init_db onu "replica" bind'i olarak ekler.
+# db.session bu modüldeki YonlendirmeliSession'dır: sadece `with replika_okuma():`
+# bloğundaki SELECT'ler replikaya gider. Aşağıdakiler her zaman primary'de kalır:
+#   - flush / INSERT / UPDATE / DELETE
+#   - aynı session'da yazma yapıldıktan sonraki tüm okumalar
+#   - yazma commit'inden sonraki REPLICA_STICKY_SECONDS saniye boyunca aynı kullanıcının
+#     istekleri (örn: upload -> redirect -> dashboard; replika gecikmesini gizler)
+# Replika tanımlı değilse her şey primary'e gider; davranış değişmez.
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import current_app, has_request_context, session as flask_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+REPLICA_BIND = "replica"
+
+# Flask session çerezinde son yazma zamanı
+_SON_YAZMA_ANAHTARI = "_rp_son_yazma"
+# db.session.info içinde "bu session yazdı" işareti
+_YAZMA_ISARETI = "rp_yazma_yapildi"
+
+_replika_istegi: ContextVar[bool] = ContextVar("replika_istegi", default=False)
+
+
+class YonlendirmeliSession(Session):
+    """Flask-SQLAlchemy Session'ı; replika bağlamındaki salt okumaları replica bind'ine yollar."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _replika_istegi.get() and self._replika_uygun(clause):
+            replika = self._db.engines.get(REPLICA_BIND)
+            if replika is not None:
+                return replika
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _replika_uygun(self, clause) -> bool:
+        if self._flushing or self.info.get(_YAZMA_ISARETI):
+            return False
+        if clause is not None and getattr(clause, "is_dml", False):
+            return False
+        return True
+
+
+@event.listens_for(YonlendirmeliSession, "after_flush")
+def _flush_sonrasi(session, flush_context):
+    session.info[_YAZMA_ISARETI] = True
+
+
+@event.listens_for(YonlendirmeliSession, "do_orm_execute")
+def _orm_execute(state):
+    if state.is_insert or state.is_update or state.is_delete:
+        state.session.info[_YAZMA_ISARETI] = True
+
+
+@event.listens_for(YonlendirmeliSession, "after_commit")
+def _commit_sonrasi(session):
+    if not session.info.get(_YAZMA_ISARETI) or not has_request_context():
+        return
+    if REPLICA_BIND in (current_app.config.get("SQLALCHEMY_BINDS") or {}):
+        flask_session[_SON_YAZMA_ANAHTARI] = time.time()
+
+
+def _yakinda_yazildi() -> bool:
+    if not has_request_context():
+        return False
+    son = flask_session.get(_SON_YAZMA_ANAHTARI)
+    if not son:
+        return False
+    return time.time() - float(son) < float(current_app.config.get("REPLICA_STICKY_SECONDS") or 0)
+
+
+@contextmanager
+def replika_okuma():
+    """
+    Bloğun içindeki okumalar (mümkünse) replikadan yapılır.
+    Kullanıcı az önce yazdıysa blok primary'de çalışır (read-your-writes).
+    """
+    token = _replika_istegi.set(not _yakinda_yazildi())
+    try:
+        yield
+    finally:
+        _replika_istegi.reset(token)
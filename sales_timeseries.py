@@ -0,0 +1,166 @@
+# sales_timeseries.py — Ciro / kâr / adet zaman serisi (gün / hafta / ay)
+#
+# Toplama SQL'de yapılır (dönem başına tek satır); satışsız dönemler 0 ile doldurulur.
+# Uzun aralıklarda seri LTTB (Largest-Triangle-Three-Buckets) ile hedef nokta sayısına
+# indirilir: tepe ve dipler korunur, grafik yükü tarih aralığından bağımsız olarak birkaç KB kalır.
+# Pandas kullanmaz; dashboard'dan doğrudan çağrılır.
+
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func
+
+from branch_scope import sube_filtresi
+from database import db, Urun, SatisKaydi, replika_okuma
+
+PERIYOTLAR = ("gun", "hafta", "ay")
+METRIKLER = ("ciro", "kar", "adet")
+VARSAYILAN_HEDEF = 200
+MIN_HEDEF, MAKS_HEDEF = 10, 1000
+
+
+def _donem_ifadesi(periyot: str, dialect: str):
+    """Satırın dönem başı (gün / pazartesi / ayın 1'i); bilinmeyen dialect'te gün (Python'da toplanır)."""
+    tarih = SatisKaydi.tarih
+    if dialect == "postgresql":
+        return func.date_trunc({"gun": "day", "hafta": "week", "ay": "month"}[periyot], tarih)
+    if dialect == "sqlite":
+        if periyot == "hafta":
+            # 'weekday 0' bir sonraki (veya aynı) pazara gider; 6 gün geri = o haftanın pazartesisi
+            return func.date(tarih, "weekday 0", "-6 days")
+        if periyot == "ay":
+            return func.strftime("%Y-%m-01", tarih)
+    return func.date(tarih)
+
+
+def _gune(deger) -> date:
+    if isinstance(deger, datetime):
+        return deger.date()
+    if isinstance(deger, date):
+        return deger
+    return date.fromisoformat(str(deger)[:10])
+
+
+def _donem_basi(gun: date, periyot: str) -> date:
+    if periyot == "hafta":
+        return gun - timedelta(days=gun.weekday())
+    if periyot == "ay":
+        return gun.replace(day=1)
+    return gun
+
+
+def _sonraki(gun: date, periyot: str) -> date:
+    if periyot == "hafta":
+        return gun + timedelta(days=7)
+    if periyot == "ay":
+        return date(gun.year + gun.month // 12, gun.month % 12 + 1, 1)
+    return gun + timedelta(days=1)
+
+
+def zaman_serisi(periyot: str = "gun", baslangic: date | None = None, bitis: date | None = None,
+                 urun_ismi: str | None = None, kategori: str | None = None, grup: str | None = None):
+    """
+    Aktif şubenin satışları için dönem bazında (dönem_başı, ciro, kâr, adet) listesi, tarihe göre sıralı.
+    Filtre verilmezse tüm menü. Aralıktaki satışsız dönemler 0 ile yer alır.
+    """
+    donem = _donem_ifadesi(periyot, db.engine.dialect.name).label("donem")
+    stmt = sube_filtresi(
+        db.select(
+            donem,
+            func.coalesce(func.sum(SatisKaydi.toplam_tutar), 0.0),
+            func.coalesce(func.sum(SatisKaydi.hesaplanan_kar), 0.0),
+            func.coalesce(func.sum(SatisKaydi.adet), 0),
+        ),
+        SatisKaydi.sube_id,
+    )
+    if urun_ismi or kategori or grup:
+        stmt = stmt.join(Urun, Urun.id == SatisKaydi.urun_id)
+        if urun_ismi:
+            stmt = stmt.where(Urun.isim == urun_ismi)
+        if kategori:
+            stmt = stmt.where(Urun.kategori == kategori)
+        if grup:
+            stmt = stmt.where(Urun.kategori_grubu == grup)
+    # Aralık filtresi index'lenebilir kalsın (func.date(tarih) ile değil); bitis dahil
+    if baslangic:
+        stmt = stmt.where(SatisKaydi.tarih >= datetime.combine(baslangic, datetime.min.time()))
+    if bitis:
+        stmt = stmt.where(SatisKaydi.tarih < datetime.combine(bitis + timedelta(days=1), datetime.min.time()))
+    stmt = stmt.group_by(donem)
+
+    with replika_okuma():
+        satirlar = db.session.execute(stmt).all()
+
+    toplam: dict[date, list] = {}
+    for d, ciro, kar, adet in satirlar:
+        if d is None:
+            continue
+        t = toplam.setdefault(_donem_basi(_gune(d), periyot), [0.0, 0.0, 0])
+        t[0] += float(ciro or 0.0)
+        t[1] += float(kar or 0.0)
+        t[2] += int(adet or 0)
+    if not toplam:
+        return []
+
+    gun = _donem_basi(baslangic, periyot) if baslangic else min(toplam)
+    son = _donem_basi(bitis, periyot) if bitis else max(toplam)
+    seri = []
+    while gun <= son:
+        ciro, kar, adet = toplam.get(gun, (0.0, 0.0, 0))
+        seri.append((gun, ciro, kar, adet))
+        gun = _sonraki(gun, periyot)
+    return seri
+
+
+def lttb(degerler: list[float], hedef: int) -> list[int]:
+    """
+    Largest-Triangle-Three-Buckets: eşit aralıklı seriden korunacak `hedef` noktanın indeksleri.
+    İlk ve son nokta her zaman kalır; aradaki her kovadan, bir önceki seçilen nokta ile sonraki
+    kovanın ortalamasıyla en büyük üçgeni kuran nokta seçilir.
+    """
+    n = len(degerler)
+    if hedef >= n or hedef < 3:
+        return list(range(n))
+
+    kova = (n - 2) / (hedef - 2)
+    secilen = [0]
+    a = 0
+    for i in range(hedef - 2):
+        bas = int(i * kova) + 1
+        son = int((i + 1) * kova) + 1
+        sonraki_son = min(int((i + 2) * kova) + 1, n)
+        ort_x = (son + sonraki_son - 1) / 2.0
+        ort_y = sum(degerler[son:sonraki_son]) / (sonraki_son - son)
+
+        ax, ay = a, degerler[a]
+        en_iyi, en_buyuk = bas, -1.0
+        for j in range(bas, son):
+            alan = abs((ax - ort_x) * (degerler[j] - ay) - (ax - j) * (ort_y - ay))
+            if alan > en_buyuk:
+                en_iyi, en_buyuk = j, alan
+        secilen.append(en_iyi)
+        a = en_iyi
+    secilen.append(n - 1)
+    return secilen
+
+
+def seri_grafigi(periyot: str = "gun", hedef: int = VARSAYILAN_HEDEF, metrik: str = "ciro", **filtreler) -> dict:
+    """
+    Chart.js line verisi (labels + ciro / kâr / adet dataset'leri).
+    Nokta seçimi `metrik` serisine göre yapılır; diğer seriler aynı dönemlerden okunur.
+    """
+    seri = zaman_serisi(periyot, **filtreler)
+    hedef = max(MIN_HEDEF, min(int(hedef), MAKS_HEDEF))
+    sutun = 1 + METRIKLER.index(metrik)
+    secilen = [seri[i] for i in lttb([s[sutun] for s in seri], hedef)]
+
+    return {
+        "labels": [s[0].isoformat() for s in secilen],
+        "datasets": [
+            {"label": "Ciro (TL)", "data": [round(s[1], 2) for s in secilen]},
+            {"label": "Kâr (TL)", "data": [round(s[2], 2) for s in secilen]},
+            {"label": "Adet", "data": [s[3] for s in secilen], "yAxisID": "y1", "hidden": True},
+        ],
+        "periyot": periyot,
+        "ham_nokta": len(seri),
+        "nokta": len(secilen),
+    }
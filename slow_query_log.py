@@ -0,0 +1,122 @@
+# slow_query_log.py — Yavaş sorgu kaydı (opsiyonel, EXPLAIN yakalamalı)
+#
+# init_db, SLOW_QUERY_MS ortam değişkeni verildiğinde bu modülü engine'lere bağlar.
+# Eşiği aşan her ifade; parametreleri, süresi ve EXPLAIN çıktısıyla birlikte
+# dönen bir log dosyasına yazılır ve admin sayfası için bellekte tutulur.
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from sqlalchemy import event
+
+logger = logging.getLogger("restoprofit.slow_query")
+
+# Admin sayfası için son kayıtlar (süreç bazlı halka tampon)
+_son_kayitlar: deque = deque(maxlen=200)
+_kilit = threading.Lock()
+
+# EXPLAIN sadece planı anlamlı olan ifadelerde alınır (INSERT'ler hariç)
+_EXPLAIN_ONEKLERI = ("SELECT", "WITH", "UPDATE", "DELETE")
+
+
+def _kisalt(deger, limit: int = 500) -> str:
+    s = repr(deger)
+    return s if len(s) <= limit else s[:limit] + "…"
+
+
+def _explain_al(conn, statement: str, parameters) -> str | None:
+    """
+    Aynı DBAPI bağlantısı üzerinden EXPLAIN çalıştırır.
+    SQLAlchemy olaylarını tekrar tetiklememek için ham cursor kullanılır.
+    """
+    if not statement.lstrip().upper().startswith(_EXPLAIN_ONEKLERI):
+        return None
+
+    onek = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    try:
+        cur = conn.connection.dbapi_connection.cursor()
+        try:
+            cur.execute(onek + statement, parameters or ())
+            satirlar = cur.fetchall()
+        finally:
+            cur.close()
+    except Exception as e:
+        return f"(EXPLAIN alınamadı: {e})"
+
+    if conn.dialect.name == "sqlite":
+        # (id, parent, notused, detail)
+        return "\n".join(str(r[-1]) for r in satirlar)
+    return "\n".join(str(r[0]) for r in satirlar)
+
+
+def son_kayitlar(limit: int = 100) -> list[dict]:
+    """En yeni kayıt başta olacak şekilde son yavaş sorgular."""
+    with _kilit:
+        return list(reversed(_son_kayitlar))[:limit]
+
+
+def _dosya_handler_kur(log_path: str):
+    if any(isinstance(h, RotatingFileHandler) for h in logger.handlers):
+        return
+    klasor = os.path.dirname(log_path)
+    if klasor:
+        os.makedirs(klasor, exist_ok=True)
+    handler = RotatingFileHandler(log_path, maxBytes=5 * 1024 * 1024, backupCount=5, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def _listen(engine, esik_ms: float):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_rp_sorgu_baslangic", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        baslangiclar = conn.info.get("_rp_sorgu_baslangic")
+        if not baslangiclar:
+            return
+        sure_ms = (time.perf_counter() - baslangiclar.pop()) * 1000.0
+        if sure_ms < esik_ms:
+            return
+
+        # executemany (toplu insert vb.) için plan anlamsız
+        plan = None if executemany else _explain_al(conn, statement, parameters)
+
+        kayit = {
+            "zaman": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "sure_ms": round(sure_ms, 1),
+            "veritabani": conn.dialect.name,
+            "sorgu": statement.strip(),
+            "parametreler": _kisalt(parameters),
+            "plan": plan,
+        }
+        with _kilit:
+            _son_kayitlar.append(kayit)
+
+        logger.info(
+            "SLOW %.1f ms [%s]\n%s\nparams=%s\nplan:\n%s\n",
+            sure_ms, kayit["veritabani"], kayit["sorgu"], kayit["parametreler"], plan or "-"
+        )
+
+
+def init_slow_query_log(app, engines):
+    """
+    SLOW_QUERY_MS > 0 ise verilen engine'lere yavaş sorgu kaydedicisini bağlar.
+    SLOW_QUERY_LOG: log dosyası (varsayılan logs/slow_queries.log)
+    """
+    esik_ms = float(app.config.get("SLOW_QUERY_MS") or 0)
+    if esik_ms <= 0:
+        return False
+
+    _dosya_handler_kur(app.config.get("SLOW_QUERY_LOG") or "logs/slow_queries.log")
+    for engine in engines:
+        _listen(engine, esik_ms)
+    return True
@@ -0,0 +1,142 @@
+# sqlite_tuning.py — Tek sunuculu kurulumlar için SQLite performans profili
+#
+# init_db, SQLite engine'lerine bağlantı anında PRAGMA'ları uygular:
+#   WAL günlükleme (okuyucular yazarı beklemez), synchronous=NORMAL (WAL'da güvenli,
+#   her commit'te fsync yok), busy_timeout ("database is locked" yerine bekle),
+#   mmap_size, daha büyük cache_size ve temp_store=MEMORY.
+# Ayrıca belirli aralıklarla PRAGMA optimize çalıştırır; `flask sqlite-bakim` komutu
+# ANALYZE + optimize + WAL checkpoint yapar. Değerler /admin/diagnostics'te görünür.
+
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import event
+
+# Diagnostics sayfasında gösterilen PRAGMA'lar
+IZLENEN_PRAGMALAR = (
+    "journal_mode", "synchronous", "busy_timeout", "mmap_size",
+    "cache_size", "temp_store", "page_size", "wal_autocheckpoint",
+)
+
+_kilit = threading.Lock()
+# engine url -> zamanlayıcı referansı / gerçekten çalışan son optimize (epoch)
+_zamanlayici: dict[str, float] = {}
+_son_optimize: dict[str, float] = {}
+
+
+def _pragmalar(app) -> list[tuple[str, object]]:
+    return [
+        ("journal_mode", "WAL"),
+        ("synchronous", "NORMAL"),
+        ("busy_timeout", int(app.config["SQLITE_BUSY_TIMEOUT_MS"])),
+        ("mmap_size", int(app.config["SQLITE_MMAP_MB"]) * 1024 * 1024),
+        # Negatif değer = KiB cinsinden
+        ("cache_size", -int(app.config["SQLITE_CACHE_MB"]) * 1024),
+        ("temp_store", "MEMORY"),
+    ]
+
+
+def _optimize_zamani_mi(anahtar: str, aralik_sn: float) -> bool:
+    simdi = time.time()
+    with _kilit:
+        son = _zamanlayici.get(anahtar)
+        if son is None:
+            # İlk bağlantıda sayaç başlar; optimize bir sonraki aralıkta
+            _zamanlayici[anahtar] = simdi
+            return False
+        if simdi - son < aralik_sn:
+            return False
+        _zamanlayici[anahtar] = simdi
+        return True
+
+
+def _listen(engine, pragmalar, optimize_aralik_sn: float):
+    anahtar = str(engine.url)
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_conn, connection_record):
+        cur = dbapi_conn.cursor()
+        try:
+            for ad, deger in pragmalar:
+                cur.execute(f"PRAGMA {ad}={deger}")
+        finally:
+            cur.close()
+
+    if optimize_aralik_sn <= 0:
+        return
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_conn, connection_record):
+        # Havuza dönen bağlantı boşta; optimize'ı isteğin dışında çalıştırır
+        if dbapi_conn is None or not _optimize_zamani_mi(anahtar, optimize_aralik_sn):
+            return
+        try:
+            dbapi_conn.execute("PRAGMA optimize")
+        except Exception:
+            return
+        with _kilit:
+            _son_optimize[anahtar] = time.time()
+
+
+def init_sqlite_tuning(app, engines):
+    """
+    SQLite engine'lerine performans PRAGMA'larını bağlar.
+    SQLITE_TUNED=0 ile kapatılabilir. Dönüş: ayarlanan engine sayısı.
+    """
+    if not app.config.get("SQLITE_TUNED"):
+        return 0
+
+    pragmalar = _pragmalar(app)
+    aralik = float(app.config.get("SQLITE_OPTIMIZE_INTERVAL") or 0)
+    adet = 0
+    for engine in engines:
+        if engine.dialect.name != "sqlite":
+            continue
+        _listen(engine, pragmalar, aralik)
+        adet += 1
+    return adet
+
+
+def sqlite_bakim(engine) -> dict:
+    """ANALYZE + PRAGMA optimize + WAL checkpoint (CLI / manuel bakım)."""
+    t0 = time.perf_counter()
+    with engine.connect() as conn:
+        raw = conn.connection.dbapi_connection
+        raw.execute("ANALYZE")
+        raw.execute("PRAGMA optimize")
+        checkpoint = raw.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        raw.commit()
+    with _kilit:
+        _zamanlayici[str(engine.url)] = _son_optimize[str(engine.url)] = time.time()
+    return {
+        "sure_ms": round((time.perf_counter() - t0) * 1000.0, 1),
+        "checkpoint": tuple(checkpoint) if checkpoint else None,
+    }
+
+
+def sqlite_durumu(engine) -> dict | None:
+    """Diagnostics için canlı PRAGMA değerleri; SQLite değilse None."""
+    if engine.dialect.name != "sqlite":
+        return None
+
+    degerler = {}
+    with engine.connect() as conn:
+        raw = conn.connection.dbapi_connection
+        for ad in IZLENEN_PRAGMALAR:
+            try:
+                satir = raw.execute(f"PRAGMA {ad}").fetchone()
+                degerler[ad] = satir[0] if satir else None
+            except Exception as e:
+                degerler[ad] = f"(okunamadı: {e})"
+        sayfa = raw.execute("PRAGMA page_count").fetchone()[0]
+        bos = raw.execute("PRAGMA freelist_count").fetchone()[0]
+
+    with _kilit:
+        son = _son_optimize.get(str(engine.url))
+    return {
+        "pragmalar": degerler,
+        "boyut_mb": round(sayfa * (degerler.get("page_size") or 4096) / (1024 * 1024), 2),
+        "bos_sayfa": bos,
+        "son_optimize": datetime.fromtimestamp(son).strftime("%Y-%m-%d %H:%M:%S") if son else None,
+    }
@@ -0,0 +1,20 @@
+# value_parsing.py — Form / Excel değerleri için güvenli sayı çevirileri
+#
+# Hem app.py hem bulk_upload worker'ları (spawn: Flask yüklemeden) kullanır; bağımlılığı yoktur.
+
+
+def safe_int(value, default=None):
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return default
+
+
+def parse_decimal(value: str, default=None):
+    """Virgüllü/noktalı ondalıkları güvenle float'a çevirir."""
+    if value is None:
+        return default
+    try:
+        return float(str(value).strip().replace(',', '.'))
+    except (ValueError, TypeError):
+        return default